@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+
+from app.core.metrics import ALERT_QUEUE_DEPTH, ALERT_QUEUE_OLDEST, CONTENT_TYPE, HTTP_REQUEST_DURATION, render
+from app.db.session import get_db
+from app.services.alerts import queue_depth
+
+router = APIRouter(tags=["ops"])
+
+
+@router.get("/metrics", response_class=Response)
+def get_metrics(db: Session = Depends(get_db)):
+    """
+    Prometheus text format. Covers this API process; check, scheduler and
+    result-write metrics come from the workers' --metrics-port.
+    """
+    depth, oldest = queue_depth(db)
+    ALERT_QUEUE_DEPTH.set(depth)
+    ALERT_QUEUE_OLDEST.set((datetime.now(timezone.utc) - oldest).total_seconds() if oldest else 0.0)
+    return Response(render(), media_type=CONTENT_TYPE)
+
+
+class RequestMetricsMiddleware:
+    """
+    Times every HTTP request into HTTP_REQUEST_DURATION.
+
+    Plain ASGI (no BaseHTTPMiddleware task/queue per request). Labelled by
+    the matched route's template, e.g. /api/v1/monitors/{monitor_id}, so
+    ids don't blow up the label set; unknown paths share "unmatched".
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                getattr(route, "path", "unmatched"), scope["method"], f"{status // 100}xx"
+            ).observe(time.perf_counter() - started)
@@ -1,17 +1,27 @@
 from __future__ import annotations
 
+import json
 import uuid
+from typing import Any, AsyncIterator
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+from app.api.responses import FastJSONResponse, row_dicts
+from app.core.config import settings
 from app.core.security import require_api_key
 from app.db import crud
 from app.db.models import Monitor
-from app.db.session import get_db
-from app.schemas.monitor import MonitorCreate, MonitorOut, MonitorUpdate
+from app.db.session import get_async_db, get_db
+from app.schemas.monitor import BatchCheckIn, BulkResultOut, MonitorCreate, MonitorOut, MonitorUpdate
 from app.schemas.result import CheckResultOut
-from app.services.checker import run_check
+from app.services.batch_check import batch_checker
+from app.services.monitor_bulk import apply_batch, count_statuses
+from app.services.monitor_cache import MonitorConfig, monitor_cache
 
 router = APIRouter(prefix="/monitors", tags=["monitors"])
 
@@ -21,8 +31,8 @@ router = APIRouter(prefix="/monitors", tags=["monitors"])
     response_model=list[MonitorOut],
     dependencies=[Depends(require_api_key)],
 )
-def list_monitors(db: Session = Depends(get_db)):
-    return crud.list_monitors(db)
+async def list_monitors(db: AsyncSession = Depends(get_async_db)):
+    return FastJSONResponse(row_dicts(await db.execute(crud.monitors_query())))
 
 
 @router.post(
@@ -34,13 +44,132 @@ def create_monitor(payload: MonitorCreate, db: Session = Depends(get_db)):
     return crud.create_monitor(db, payload)
 
 
+async def _ndjson(request: Request) -> AsyncIterator[Any]:
+    """Decoded lines of a streamed NDJSON body (ValueError for a bad line); blank lines skipped."""
+    pending = b""
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as exc:
+                    yield exc
+    if pending.strip():
+        try:
+            yield json.loads(pending)
+        except ValueError as exc:
+            yield exc
+
+
+async def _json_array(request: Request) -> AsyncIterator[Any]:
+    try:
+        items = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array of operations")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array of operations")
+    for item in items:
+        yield item
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkResultOut,
+    dependencies=[Depends(require_api_key)],
+)
+async def bulk_monitors(request: Request, db: Session = Depends(get_db)):
+    """
+    Create, update, upsert and deactivate many monitors in one call.
+
+    - body: a JSON array, or NDJSON (Content-Type: application/x-ndjson)
+      read as it streams in
+    - each item is {"op": "create" | "upsert", <monitor fields>},
+      {"op": "update", "id": ..., <fields to change>} or
+      {"op": "deactivate", "id": ...}
+    - upsert matches on name and url: created if missing, updated if any
+      field differs, "unchanged" otherwise, so re-pushing a whole
+      inventory only writes what changed
+    - applied in transactions of MONITOR_BULK_BATCH_SIZE items, in order;
+      one result per item, in request order
+    """
+    content_type = request.headers.get("content-type", "")
+    items = _ndjson(request) if "ndjson" in content_type or "jsonl" in content_type else _json_array(request)
+
+    results = []
+    batch: list[tuple[int, Any]] = []
+    async for item in items:
+        batch.append((len(results) + len(batch), item))
+        if len(batch) >= settings.monitor_bulk_batch_size:
+            results.extend(await run_in_threadpool(apply_batch, db, batch))
+            batch = []
+    if batch:
+        results.extend(await run_in_threadpool(apply_batch, db, batch))
+
+    return {"counts": count_statuses(results), "results": results}
+
+
+@router.post(
+    "/check-now",
+    dependencies=[Depends(require_api_key)],
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+def batch_check_now(payload: BatchCheckIn, db: Session = Depends(get_db)):
+    """
+    check-now for many monitors at once, streamed back as NDJSON.
+
+    - selects active monitors by monitor_ids and/or name_prefix/url_prefix
+      (at most CHECK_NOW_BATCH_MAX_MONITORS)
+    - probes run concurrently; each line is a CheckResultOut, written when
+      that check completes and its result (and incident change) is saved
+    - requested ids that are missing or inactive come first, as
+      {"monitor_id": ..., "error": ...} lines
+    """
+    if not payload.monitor_ids and payload.name_prefix is None and payload.url_prefix is None:
+        raise HTTPException(status_code=400, detail="Give monitor_ids, name_prefix or url_prefix")
+
+    limit = settings.check_now_batch_max_monitors
+    q = select(Monitor).where(Monitor.is_active.is_(True))
+    if payload.monitor_ids:
+        q = q.where(Monitor.id.in_(payload.monitor_ids))
+    if payload.name_prefix is not None:
+        q = q.where(Monitor.name.startswith(payload.name_prefix, autoescape=True))
+    if payload.url_prefix is not None:
+        q = q.where(Monitor.url.startswith(payload.url_prefix, autoescape=True))
+    monitors = [MonitorConfig.from_monitor(m) for m in db.scalars(q.limit(limit + 1))]
+    if len(monitors) > limit:
+        raise HTTPException(status_code=400, detail=f"More than {limit} monitors selected; narrow the filter")
+
+    errors = []
+    if payload.monitor_ids:
+        found = {m.id for m in monitors}
+        for monitor_id in dict.fromkeys(payload.monitor_ids):
+            if monitor_id not in found:
+                # Filters may have excluded it too; only say why when they didn't
+                monitor = monitor_cache.get(db, monitor_id)
+                if monitor is None:
+                    errors.append({"monitor_id": str(monitor_id), "error": "Monitor not found"})
+                elif not monitor.is_active:
+                    errors.append({"monitor_id": str(monitor_id), "error": "Monitor is inactive"})
+
+    async def lines():
+        for error in errors:
+            yield json.dumps(error) + "\n"
+        async for result in batch_checker().stream(monitors):
+            yield CheckResultOut.model_validate(result).model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.get(
     "/{monitor_id}",
     response_model=MonitorOut,
     dependencies=[Depends(require_api_key)],
 )
-def get_monitor(monitor_id: uuid.UUID, db: Session = Depends(get_db)):
-    monitor = crud.get_monitor(db, monitor_id)
+async def get_monitor(monitor_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)):
+    monitor = await db.get(Monitor, monitor_id)
     if not monitor:
         raise HTTPException(status_code=404, detail="Monitor not found")
     return monitor
@@ -79,12 +208,12 @@ def delete_monitor(monitor_id: uuid.UUID, db: Session = Depends(get_db)):
     response_model=CheckResultOut,
     dependencies=[Depends(require_api_key)],
 )
-def check_now(monitor_id: uuid.UUID, db: Session = Depends(get_db)):
-    monitor = db.get(Monitor, monitor_id)
+async def check_now(monitor_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)):
+    monitor = await monitor_cache.get_async(db, monitor_id)
     if not monitor:
         raise HTTPException(status_code=404, detail="Monitor not found")
 
     if not monitor.is_active:
         raise HTTPException(status_code=400, detail="Monitor is inactive")
 
-    return run_check(db, monitor)
\ No newline at end of file
+    return await batch_checker().check(monitor)
\ No newline at end of file
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import csv
+import io
+from datetime import datetime
+from typing import Any, Iterable, Sequence
+
+import orjson
+from fastapi.responses import JSONResponse
+from sqlalchemy import Row
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON rendered by orjson, which encodes UUIDs and datetimes itself.
+
+    Routes return it directly, so FastAPI skips response_model validation
+    (the model still documents the route). Output matches Pydantic's: UTC
+    datetimes end in Z.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+def row_dicts(rows: Iterable[Row]) -> list[dict[str, Any]]:
+    """Rows of one of crud's projected list queries, keyed by column (= schema field) name."""
+    return [row._asdict() for row in rows]
+
+
+# ----------------------------
+# Streamed exports
+# ----------------------------
+def ndjson_chunk(rows: Iterable[Row]) -> bytes:
+    """One JSON object per row, newline-terminated; same encoding as FastJSONResponse."""
+    return b"".join(orjson.dumps(row._asdict(), option=orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE) for row in rows)
+
+
+def csv_chunk(rows: Iterable[Sequence[Any]]) -> bytes:
+    """CSV lines; datetimes in ISO 8601, None as an empty field."""
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row] for row in rows
+    )
+    return out.getvalue().encode()
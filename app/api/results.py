@@ -1,37 +1,157 @@
 from __future__ import annotations
 
 import uuid
+from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.responses import FastJSONResponse, csv_chunk, ndjson_chunk, row_dicts
+from app.core.config import settings
 from app.db import crud
-from app.db.session import get_db
-from app.schemas.result import CheckResultOut
+from app.db.session import AsyncSessionLocal, get_async_db
+from app.schemas.result import CheckResultListOut
+from app.services.monitor_cache import monitor_cache
+from app.services.response_cache import (
+    CACHE_CONTROL,
+    not_modified,
+    not_modified_response,
+    summary_cache,
+    version_etag,
+)
+from app.services.summary import get_monitor_summary, get_monitor_timeseries
 
 router = APIRouter(prefix="/monitors", tags=["results"])
 
 
-@router.get("/{monitor_id}/results", response_model=list[CheckResultOut])
-def get_results(
+@router.get("/{monitor_id}/results", response_model=CheckResultListOut)
+async def get_results(
     monitor_id: uuid.UUID,
+    request: Request,
     limit: int = Query(default=100, ge=1, le=500),
-    db: Session = Depends(get_db),
+    before: str | None = Query(default=None, description="next_cursor from the previous page"),
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    monitor = crud.get_monitor(db, monitor_id)
+    """
+    One page of results. The ETag is the monitor's results version, read
+    before the page: a poll with If-None-Match gets a 304 without the page
+    query until the next result is written.
+    """
+    monitor = await monitor_cache.get_async(db, monitor_id)
     if not monitor:
         raise HTTPException(status_code=404, detail="Monitor not found")
 
-    return crud.list_results_for_monitor(db, monitor_id, limit=limit)
+    q, limit = crud.results_query(monitor_id, limit=limit, before=before, since=since, until=until)
+    etag = version_etag(monitor_id, await db.scalar(crud.results_version_query(monitor_id)) or 0)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+
+    results, next_cursor = crud.results_page(list(await db.execute(q)), limit)
+    return FastJSONResponse(
+        {"results": row_dicts(results), "next_cursor": next_cursor},
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+_EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+@router.get(
+    "/{monitor_id}/results/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}}}},
+)
+async def export_results(
+    monitor_id: uuid.UUID,
+    since: datetime | None = Query(default=None, alias="from"),
+    until: datetime | None = Query(default=None, alias="to"),
+    format: str = Query(default="ndjson", description="ndjson or csv"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    A monitor's whole result history (checked_at >= from and < to), oldest
+    first, streamed as it's read.
+
+    - read through a server-side cursor, RESULTS_EXPORT_CHUNK_ROWS rows per
+      fetch and per chunk written, so memory stays flat in the API and in
+      Postgres however many rows there are
+    - rows are CheckResultOut fields; csv starts with a header line
+    - one snapshot (transaction) for the whole export: rows written while it
+      runs aren't in it
+    """
+    media_type = _EXPORT_MEDIA_TYPES.get(format)
+    if media_type is None:
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+
+    monitor = await monitor_cache.get_async(db, monitor_id)
+    if not monitor:
+        raise HTTPException(status_code=404, detail="Monitor not found")
+
+    q = crud.results_export_query(monitor_id, since=since, until=until)
+    render = csv_chunk if format == "csv" else ndjson_chunk
+
+    async def chunks():
+        if format == "csv":
+            # Sent before the query runs, so the response starts right away
+            yield csv_chunk([crud.RESULT_FIELDS])
+        # Its own session: the request's is closed once the route returns
+        async with AsyncSessionLocal() as export_db:
+            result = await export_db.stream(q.execution_options(yield_per=settings.results_export_chunk_rows))
+            async for rows in result.partitions():
+                yield render(rows)
+
+    return StreamingResponse(
+        chunks(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{monitor_id}-results.{format}"'},
+    )
+
 
 @router.get("/{monitor_id}/summary")
-def get_summary(
+async def get_summary(
+    monitor_id: uuid.UUID,
+    request: Request,
+    window: str = "24h",
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Served from summary_cache while the monitor's results version is
+    unchanged (and for at most SUMMARY_CACHE_TTL_SEC), with a content ETag.
+    """
+    monitor = await monitor_cache.get_async(db, monitor_id)
+    if not monitor:
+        raise HTTPException(status_code=404, detail="Monitor not found")
+
+    version = await db.scalar(crud.results_version_query(monitor_id)) or 0
+    entry = summary_cache.get(monitor_id, window, version)
+    if entry is None:
+        # The summary's few set-based queries are sync code; run_sync runs them on
+        # this session's async connection (greenlet, not a thread)
+        summary = await db.run_sync(get_monitor_summary, monitor_id, window=window)
+        entry = summary_cache.put(monitor_id, window, version, summary)
+
+    if not_modified(request, entry.etag):
+        return not_modified_response(entry.etag)
+    return Response(
+        content=entry.body,
+        media_type="application/json",
+        headers={"ETag": entry.etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+@router.get("/{monitor_id}/timeseries")
+async def get_timeseries(
     monitor_id: uuid.UUID,
     window: str = "24h",
-    db: Session = Depends(get_db),
+    step: str | None = Query(default=None, description="bucket width like 5m, 1h; coarsened if too fine"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    monitor = crud.get_monitor(db, monitor_id)
+    """Per-bucket checks, uptime and avg/p95/max latency over the window, for charts."""
+    monitor = await monitor_cache.get_async(db, monitor_id)
     if not monitor:
         raise HTTPException(status_code=404, detail="Monitor not found")
 
-    return crud.get_monitor_summary(db, monitor_id, window=window)
\ No newline at end of file
+    return FastJSONResponse(await db.run_sync(get_monitor_timeseries, monitor_id, window=window, step=step))
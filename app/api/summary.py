@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import uuid
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_async_db
+from app.services.summary import get_fleet_summary
+
+router = APIRouter(tags=["summary"])
+
+
+@router.get("/summary")
+async def get_summary(
+    window: str = "24h",
+    monitor_id: list[uuid.UUID] | None = Query(default=None),
+    is_active: bool | None = Query(default=None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Summary for every monitor (or the given monitor_id=...&monitor_id=...,
+    optionally only active/inactive ones) in one response.
+    """
+    return await db.run_sync(get_fleet_summary, window=window, monitor_ids=monitor_id, is_active=is_active)
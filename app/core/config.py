@@ -21,5 +21,86 @@ class Settings(BaseSettings):
     redis_url: str = "redis://redis:6379/0"
     slack_webhook_url: str | None = None
 
+    # Async engine for the API's read routes (the sync engine keeps SQLAlchemy's defaults)
+    db_async_pool_size: int = 10  # connections kept open per API process
+    db_async_max_overflow: int = 20  # extra connections under load, closed when idle
+    db_async_pool_timeout_sec: float = 30.0  # wait for a free connection before failing the request
+
+    # Worker / scheduler
+    scheduler_max_concurrency: int = 1000  # checks in progress, including ones waiting to retry
+    scheduler_poll_sec: float = 5.0  # upper bound on how long a worker sleeps between claims (monitor edits wake it sooner)
+    scheduler_claim_batch: int = 500  # monitors claimed per query
+    scheduler_lease_sec: float = 90.0  # keep above check_max_total_sec; a crashed worker's monitors resume after this
+    scheduler_jitter_sec: float = 0.0  # random delay (0..this) before each check, capped at interval/10; keep well under the lease
+
+    # Monitor config cache (API and worker), invalidated by LISTEN/NOTIFY
+    monitor_cache_size: int = 10000
+    monitor_cache_ttl_sec: float = 300.0  # backstop for changes made without NOTIFY
+    monitor_bulk_batch_size: int = 1000  # POST /monitors/bulk operations per transaction
+    phase_planner_max_age_sec: float = 60.0  # API process: how long single creates plan on cached phase counts
+
+    # Rendered GET /monitors/{id}/summary answers (API process); also dropped when a new result lands
+    summary_cache_size: int = 10000  # (monitor, window) entries; 0 = off
+    summary_cache_ttl_sec: float = 10.0  # upper bound on staleness from the window sliding
+
+    # GET /monitors/{id}/timeseries: a finer step is coarsened to stay under this
+    timeseries_max_points: int = 300
+
+    # GET /monitors/{id}/results/export: rows per server-side cursor fetch and per streamed chunk
+    results_export_chunk_rows: int = 5000
+
+    # worker_main.py --processes N
+    worker_ring_vnodes: int = 128  # points per process on the consistent-hash ring
+    worker_restart_backoff_max_sec: float = 60.0  # cap on the delay before restarting a crash-looping child
+    worker_stop_timeout_sec: float = 60.0  # how long children get to drain on shutdown before SIGKILL
+
+    # Worker /metrics (the API serves its own on /api/v1/metrics)
+    worker_metrics_host: str = "0.0.0.0"
+    worker_metrics_port: int = 9101  # 0 = off; with --processes N, child i listens on port + i
+
+    # Async check executor
+    check_latency_mode: str = "warm"  # warm (reused connection) / cold (new connection per probe)
+    http_max_connections: int = 1000
+    http_max_keepalive_connections: int = 200
+    http_keepalive_expiry_sec: float = 30.0
+    check_max_inflight: int = 200  # HTTP requests in flight; backoff waits don't hold a slot
+    check_max_total_sec: float = 30.0  # wall-clock cap for one check, retries included
+    check_max_per_host: int = 20  # requests in flight to one origin (scheme, host, port); 0 = no cap
+
+    # DNS cache for checks (getaddrinfo has no TTLs: keep these at or below your records')
+    dns_cache_ttl_sec: float = 60.0
+    dns_negative_ttl_sec: float = 15.0  # NXDOMAIN / no address
+    dns_cache_max_entries: int = 10000
+
+    # check-now (API process)
+    check_now_latency_mode: str = "cold"  # cold (new connection, as check-now always measured) / warm
+    check_now_batch_concurrency: int = 100  # probes in flight per API process, across batches
+    check_now_batch_max_monitors: int = 1000
+
+    # Batched result writes (worker)
+    result_sink_method: str = "insert"  # insert (multi-row INSERT) / copy (COPY FROM STDIN)
+    result_sink_max_batch: int = 500
+    result_sink_flush_interval_sec: float = 0.5
+    result_sink_max_pending: int = 10000
+    result_sink_max_retries: int = 5
+
+    # Alert outbox (dispatcher runs in the worker)
+    alert_dispatch_batch: int = 50
+    alert_dispatch_poll_sec: float = 1.0
+    alert_send_timeout_sec: float = 10.0
+    alert_max_attempts: int = 8
+    alert_retry_base_sec: float = 2.0  # doubles per attempt
+    alert_retry_max_sec: float = 600.0
+    alert_lease_sec: float = 60.0  # a claimed alert is retried after this if its dispatcher died
+    alert_outbox_retention_days: int = 7  # SENT/FAILED rows
+
+    # check_results partitions and retention (maintenance runs in the worker)
+    results_partition_days: int = 1  # 1 = daily, 7 = weekly (Monday to Monday) partitions
+    results_partitions_ahead: int = 3  # future partitions kept ready
+    results_retention_days: int = 30  # raw results; 0 keeps them forever
+    rollup_minute_retention_days: int = 30  # 0 = forever
+    rollup_hour_retention_days: int = 0  # 0 = forever
+    maintenance_interval_sec: float = 3600.0
+
 
 settings = Settings()
\ No newline at end of file
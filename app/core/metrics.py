@@ -0,0 +1,261 @@
+"""
+In-process metrics in the Prometheus text format.
+
+- Counter / Gauge / Histogram, optionally with labels
+- observe()/inc() take one uncontended lock per labelled child: cheap
+  enough for the check hot path (threads: sink flushes, API thread pool)
+- histogram buckets are counted individually and made cumulative when
+  rendered, so observe() is a bisect plus three additions
+- every process has its own registry: the API serves it on
+  /api/v1/metrics, workers on --metrics-port (see serve())
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# A scrape that hasn't sent its request line and headers by then is dropped
+REQUEST_READ_TIMEOUT_SEC = 5.0
+
+# Seconds; from a fast local probe to a check that hits the total budget
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Iterable[tuple[str, str]]) -> str:
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return f"{{{body}}}" if body else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    @abstractmethod
+    def _new_child(self):
+        """A fresh per-labels value."""
+
+    def labels(self, *values) -> object:
+        key = tuple("" if v is None else str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    @abstractmethod
+    def _samples(self) -> Iterable[str]:
+        """Exposition lines for every child."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self) -> Iterable[str]:
+        for key, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(zip(self.labelnames, key))} {_format_value(child.value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot: above every bound
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self) -> Iterable[str]:
+        for key, child in list(self._children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            pairs = list(zip(self.labelnames, key))
+
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = _format_labels(pairs + [("le", _format_value(bound))])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(pairs)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(pairs)} {cumulative}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# ----------------------------
+# Metrics
+# ----------------------------
+CHECK_DURATION = Histogram(
+    "shiptrack_check_duration_seconds",
+    "Wall time of a check, retries and backoff included.",
+    ("outcome", "error_type"),
+)
+SCHEDULER_LAG = Histogram(
+    "shiptrack_scheduler_lag_seconds",
+    "How late a check started relative to its due tick.",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+DB_WRITE_DURATION = Histogram(
+    "shiptrack_db_write_duration_seconds",
+    "Time spent writing a batch, by step (results incl. rollups, incidents incl. state and alerts, commit).",
+    ("step",),
+)
+RESULTS_WRITTEN = Counter(
+    "shiptrack_results_written_total",
+    "Check results committed.",
+)
+ALERT_SEND_DURATION = Histogram(
+    "shiptrack_alert_send_duration_seconds",
+    "Slack webhook call time, by outcome (sent, retry, rate_limited, failed).",
+    ("outcome",),
+)
+ALERT_QUEUE_DEPTH = Gauge(
+    "shiptrack_alert_queue_depth",
+    "Alerts waiting in alert_outbox (PENDING), sampled when scraped.",
+)
+ALERT_QUEUE_OLDEST = Gauge(
+    "shiptrack_alert_queue_oldest_seconds",
+    "Age of the oldest PENDING alert, sampled when scraped.",
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "shiptrack_http_request_duration_seconds",
+    "API request time by route template, method and status class.",
+    ("route", "method", "status"),
+)
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+# ----------------------------
+# Worker endpoint
+# ----------------------------
+async def _read_request(reader: asyncio.StreamReader) -> None:
+    # Any path, any method: this port only serves metrics
+    while (await reader.readline()).strip():
+        pass
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        await asyncio.wait_for(_read_request(reader), REQUEST_READ_TIMEOUT_SEC)
+        body = render().encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            + f"Content-Type: {CONTENT_TYPE}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError):
+        # ValueError: a header line over the reader's 64 KiB limit
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host: str, port: int) -> asyncio.AbstractServer:
+    """Serve render() over plain HTTP (for workers, which have no API)."""
+    server = await asyncio.start_server(_handle, host, port)
+    logger.info("Metrics on http://%s:%d/metrics", host, port)
+    return server
@@ -2,13 +2,35 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime, timedelta, timezone
-import statistics
 
 from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import Row, Select, select, tuple_
 from sqlalchemy.orm import Session
 
-from app.db.models import Monitor, CheckResult, Incident
-from app.schemas.monitor import MonitorCreate, MonitorUpdate
+from app.db.models import Monitor, CheckResult, Incident, MonitorState
+from app.schemas.incident import IncidentOut
+from app.schemas.monitor import MonitorCreate, MonitorOut, MonitorUpdate
+from app.schemas.result import CheckResultOut
+from app.services.monitor_cache import notify_changed
+from app.services.schedule_phase import planner_cache
+
+
+def _columns(model, schema: type[BaseModel]) -> list:
+    """
+    The table columns behind schema's fields, in field order. List queries
+    select these as plain rows: no ORM identity map or attribute tracking,
+    and the API serializes them without re-validating (api/responses.py).
+    """
+    return [model.__table__.c[name] for name in schema.model_fields]
+
+
+_MONITOR_COLUMNS = _columns(Monitor, MonitorOut)
+_RESULT_COLUMNS = _columns(CheckResult, CheckResultOut)
+_INCIDENT_COLUMNS = _columns(Incident, IncidentOut)
+
+# CSV header of results exports, in column order
+RESULT_FIELDS = list(CheckResultOut.model_fields)
 
 
 # ----------------------------
@@ -22,21 +44,34 @@ def create_monitor(db: Session, data: MonitorCreate) -> Monitor:
         expected_status=data.expected_status,
         interval_sec=data.interval_sec,
         timeout_ms=data.timeout_ms,
+        max_attempts=data.max_attempts,
+        retry_backoff_ms=data.retry_backoff_ms,
         is_active=data.is_active,
         headers_json=data.headers_json,
     )
+    monitor.id = uuid.uuid4()
+    # First run on the least-loaded second of its interval, so creates don't bunch checks up
+    monitor.next_run_at = planner_cache.assign(db, monitor.id, monitor.interval_sec, datetime.now(timezone.utc))
     db.add(monitor)
+    db.flush()
+    # Wakes the workers' schedulers, so the first run isn't late by a poll
+    notify_changed(db, monitor.id)
     db.commit()
     db.refresh(monitor)
     return monitor
 
 
-def list_monitors(db: Session) -> list[Monitor]:
-    return db.query(Monitor).order_by(Monitor.created_at.desc()).all()
+def monitors_query() -> Select:
+    """MonitorOut rows, newest first."""
+    return select(*_MONITOR_COLUMNS).order_by(Monitor.created_at.desc())
+
+
+def list_monitors(db: Session) -> list[Row]:
+    return list(db.execute(monitors_query()))
 
 
 def get_monitor(db: Session, monitor_id: uuid.UUID) -> Monitor | None:
-    return db.query(Monitor).filter(Monitor.id == monitor_id).first()
+    return db.get(Monitor, monitor_id)
 
 
 def update_monitor(db: Session, monitor: Monitor, data: MonitorUpdate) -> Monitor:
@@ -46,10 +81,19 @@ def update_monitor(db: Session, monitor: Monitor, data: MonitorUpdate) -> Monito
     if "url" in update_data and update_data["url"] is not None:
         update_data["url"] = str(update_data["url"])
 
+    interval_sec = update_data.get("interval_sec")
+    if interval_sec is not None and interval_sec != monitor.interval_sec:
+        # A new interval gets a new phase; the next run is within one (new) interval
+        replaces = (monitor.interval_sec, monitor.next_run_at) if monitor.is_active else None
+        monitor.next_run_at = planner_cache.assign(
+            db, monitor.id, interval_sec, datetime.now(timezone.utc), replaces=replaces
+        )
+
     for field, value in update_data.items():
         setattr(monitor, field, value)
 
     db.add(monitor)
+    notify_changed(db, monitor.id)
     db.commit()
     db.refresh(monitor)
     return monitor
@@ -58,6 +102,7 @@ def update_monitor(db: Session, monitor: Monitor, data: MonitorUpdate) -> Monito
 def soft_delete_monitor(db: Session, monitor: Monitor) -> Monitor:
     monitor.is_active = False
     db.add(monitor)
+    notify_changed(db, monitor.id)
     db.commit()
     db.refresh(monitor)
     return monitor
@@ -66,52 +111,140 @@ def soft_delete_monitor(db: Session, monitor: Monitor) -> Monitor:
 # ----------------------------
 # Check Results
 # ----------------------------
-def list_results_for_monitor(db: Session, monitor_id: uuid.UUID, limit: int = 100) -> list[CheckResult]:
+def _format_result_cursor(result: Row) -> str:
+    """'<checked_at>,<id>' with checked_at in UTC ('Z', so no '+' to escape in URLs)."""
+    checked_at = result.checked_at.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    return f"{checked_at},{result.id}"
+
+
+def _parse_result_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        checked_at, result_id = cursor.strip().split(",")
+        # An unescaped '+' in the offset arrives as a space
+        parsed = datetime.fromisoformat(checked_at.replace(" ", "+"))
+        if parsed.tzinfo is None:
+            raise ValueError("cursor timestamp needs a timezone")
+        return parsed, uuid.UUID(result_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor. Use before=<checked_at>,<id>")
+
+
+def results_query(
+    monitor_id: uuid.UUID,
+    limit: int = 100,
+    before: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> tuple[Select, int]:
+    """
+    SELECT for one page of results (CheckResultOut rows), newest first, and
+    the clamped limit; it fetches one row more than that, see results_page.
+
+    - before: keyset cursor from a previous page's next_cursor; every page is
+      an index range scan on (monitor_id, checked_at, id), however deep
+    - since / until: checked_at >= since and < until
+    """
     limit = max(1, min(limit, 500))
-    return (
-        db.query(CheckResult)
-        .filter(CheckResult.monitor_id == monitor_id)
-        .order_by(CheckResult.checked_at.desc())
-        .limit(limit)
-        .all()
-    )
+    q = select(*_RESULT_COLUMNS).where(CheckResult.monitor_id == monitor_id)
+
+    if before:
+        checked_at, result_id = _parse_result_cursor(before)
+        q = q.where(tuple_(CheckResult.checked_at, CheckResult.id) < tuple_(checked_at, result_id))
+    if since is not None:
+        q = q.where(CheckResult.checked_at >= since)
+    if until is not None:
+        q = q.where(CheckResult.checked_at < until)
+
+    # One extra row tells us whether there's another page
+    return q.order_by(CheckResult.checked_at.desc(), CheckResult.id.desc()).limit(limit + 1), limit
+
+
+def results_page(results: list[Row], limit: int) -> tuple[list[Row], str | None]:
+    """results_query's rows -> (page, next_cursor)."""
+    if len(results) > limit:
+        results = results[:limit]
+        return results, _format_result_cursor(results[-1])
+    return results, None
+
+
+def results_export_query(
+    monitor_id: uuid.UUID,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> Select:
+    """All of a monitor's results (CheckResultOut rows), oldest first; since/until as in results_query."""
+    q = select(*_RESULT_COLUMNS).where(CheckResult.monitor_id == monitor_id)
+    if since is not None:
+        q = q.where(CheckResult.checked_at >= since)
+    if until is not None:
+        q = q.where(CheckResult.checked_at < until)
+    return q.order_by(CheckResult.checked_at, CheckResult.id)
+
+
+def results_version_query(monitor_id: uuid.UUID) -> Select:
+    """
+    The monitor's results version: monitor_state.version, bumped in the same
+    transaction as every batch of its results (services/incident.py). No
+    row (None) reads as version 0.
+    """
+    return select(MonitorState.version).where(MonitorState.monitor_id == monitor_id)
+
+
+def list_results_for_monitor(
+    db: Session,
+    monitor_id: uuid.UUID,
+    limit: int = 100,
+    before: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> tuple[list[Row], str | None]:
+    """One page of results plus the cursor for the next page; see results_query."""
+    q, limit = results_query(monitor_id, limit=limit, before=before, since=since, until=until)
+    return results_page(list(db.execute(q)), limit)
 
 
 # ----------------------------
 # Incidents
 # ----------------------------
-def list_incidents(db: Session, status: str | None = None, limit: int = 100) -> list[Incident]:
+def incidents_query(status: str | None = None, limit: int = 100) -> Select:
     """
-    List incidents, optionally filtered by status (OPEN/RESOLVED).
+    IncidentOut rows, newest first, optionally filtered by status (OPEN/RESOLVED).
     """
     limit = max(1, min(limit, 500))
-    q = db.query(Incident)
+    q = select(*_INCIDENT_COLUMNS)
 
     if status:
         status_up = status.strip().upper()
         if status_up not in {"OPEN", "RESOLVED"}:
             raise HTTPException(status_code=400, detail="status must be OPEN or RESOLVED")
-        q = q.filter(Incident.status == status_up)
+        q = q.where(Incident.status == status_up)
 
-    return q.order_by(Incident.started_at.desc()).limit(limit).all()
+    return q.order_by(Incident.started_at.desc()).limit(limit)
 
 
-def list_incidents_for_monitor(
-    db: Session, monitor_id: uuid.UUID, limit: int = 100
-) -> list[Incident]:
+def monitor_incidents_query(monitor_id: uuid.UUID, limit: int = 100) -> Select:
     """
-    List incidents for a specific monitor.
+    IncidentOut rows for a specific monitor, newest first.
     """
     limit = max(1, min(limit, 500))
     return (
-        db.query(Incident)
-        .filter(Incident.monitor_id == monitor_id)
+        select(*_INCIDENT_COLUMNS)
+        .where(Incident.monitor_id == monitor_id)
         .order_by(Incident.started_at.desc())
         .limit(limit)
-        .all()
     )
 
 
+def list_incidents(db: Session, status: str | None = None, limit: int = 100) -> list[Row]:
+    return list(db.execute(incidents_query(status, limit)))
+
+
+def list_incidents_for_monitor(
+    db: Session, monitor_id: uuid.UUID, limit: int = 100
+) -> list[Row]:
+    return list(db.execute(monitor_incidents_query(monitor_id, limit)))
+
+
 def get_open_incident(db: Session, monitor_id: uuid.UUID) -> Incident | None:
     """
     Helper for incident state machine: one OPEN incident per monitor.
@@ -140,44 +273,3 @@ def _parse_window(window: str) -> timedelta:
     if window.endswith("m"):
         return timedelta(minutes=int(window[:-1]))
     raise ValueError("Invalid window format. Use like 24h, 7d, 60m")
-
-
-def get_monitor_summary(db: Session, monitor_id: uuid.UUID, window: str = "24h") -> dict:
-    try:
-        delta = _parse_window(window)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid window. Use like 24h, 7d, 60m")
-
-    since = datetime.now(timezone.utc) - delta
-
-    results = (
-        db.query(CheckResult)
-        .filter(CheckResult.monitor_id == monitor_id)
-        .filter(CheckResult.checked_at >= since)
-        .order_by(CheckResult.checked_at.desc())
-        .all()
-    )
-
-    total_checks = len(results)
-    success_checks = sum(1 for r in results if r.success)
-
-    uptime_percent = round((success_checks / total_checks) * 100, 2) if total_checks > 0 else 0.0
-
-    latencies = [r.latency_ms for r in results if r.latency_ms is not None]
-    avg_latency_ms = round(sum(latencies) / len(latencies), 2) if latencies else None
-    median_latency_ms = statistics.median(latencies) if latencies else None
-
-    current_status = "UP"
-    if results:
-        current_status = "UP" if results[0].success else "DOWN"
-
-    return {
-        "monitor_id": str(monitor_id),
-        "window": window,
-        "uptime_percent": uptime_percent,
-        "total_checks": total_checks,
-        "success_checks": success_checks,
-        "avg_latency_ms": avg_latency_ms,
-        "median_latency_ms": median_latency_ms,
-        "current_status": current_status,
-    }
\ No newline at end of file
@@ -1,10 +1,12 @@
-from app.db.session import Base, engine
-import app.db.models  
+from __future__ import annotations
+
+from app.db.models import Base
+from app.db.partitions import ensure_partitions
+from app.db.session import engine
 
 
 def init_db() -> None:
+    """Create missing tables, then the check_results partitions inserts need."""
     Base.metadata.create_all(bind=engine)
-
-
-if __name__ == "__main__":
-    init_db()
\ No newline at end of file
+    with engine.begin() as conn:
+        ensure_partitions(conn)
@@ -3,8 +3,8 @@ from __future__ import annotations
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, JSON, String, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import BigInteger, Boolean, Column, Computed, DateTime, ForeignKey, Index, Integer, JSON, String, Text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
@@ -23,9 +23,30 @@ class Monitor(Base):
     interval_sec = Column(Integer, nullable=False, default=60)
     timeout_ms = Column(Integer, nullable=False, default=3000)
 
+    # Retry policy: total attempts and base backoff (doubles per retry)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    retry_backoff_ms = Column(Integer, nullable=False, default=500)
+
     is_active = Column(Boolean, nullable=False, default=True)
     headers_json = Column(JSON, nullable=True)
 
+    # Work claiming (see services/scheduler.py): the next tick is due at
+    # next_run_at; leased_until/leased_by are set while a worker runs it
+    next_run_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+    leased_until = Column(DateTime(timezone=True), nullable=True)
+    leased_by = Column(String(255), nullable=True)
+
+    # Worker shard bucket: the first 12 bits of md5(id), as sharding.shard_key()
+    shard_key = Column(
+        Integer,
+        Computed("('x' || left(md5(id::text), 3))::bit(12)::integer", persisted=True),
+        nullable=False,
+    )
+
     created_at = Column(
         DateTime(timezone=True),
         nullable=False,
@@ -42,21 +63,31 @@ class Monitor(Base):
     results = relationship("CheckResult", back_populates="monitor", cascade="all, delete-orphan")
     incidents = relationship("Incident", back_populates="monitor", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_monitors_due", "next_run_at", postgresql_where=is_active.is_(True)),
+        # Claims with --processes: one shard's keys, then due order
+        Index("ix_monitors_shard_due", "shard_key", "next_run_at", postgresql_where=is_active.is_(True)),
+        # Bulk upserts match on (name, url); not unique, duplicates predate it
+        Index("ix_monitors_name_url", "name", "url"),
+    )
+
 
 class CheckResult(Base):
     __tablename__ = "check_results"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
+    # Indexed by ix_check_results_monitor_checked_at below
     monitor_id = Column(
         UUID(as_uuid=True),
         ForeignKey("monitors.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
 
+    # Part of the primary key because it's the partition key (see __table_args__)
     checked_at = Column(
         DateTime(timezone=True),
+        primary_key=True,
         nullable=False,
         default=lambda: datetime.now(timezone.utc),
         index=True,
@@ -69,8 +100,31 @@ class CheckResult(Base):
     error_type = Column(String(32), nullable=True)
     error_message = Column(String(1024), nullable=True)
 
+    # Where latency_ms went, for the final attempt (services/http_timing.py).
+    # NULL when the phase didn't happen: a reused connection has no
+    # dns/connect/tls, plain http no tls, a failed connect nothing after it.
+    dns_ms = Column(Integer, nullable=True)
+    connect_ms = Column(Integer, nullable=True)
+    tls_ms = Column(Integer, nullable=True)
+    ttfb_ms = Column(Integer, nullable=True)
+    body_ms = Column(Integer, nullable=True)
+
     monitor = relationship("Monitor", back_populates="results")
 
+    __table_args__ = (
+        # "Latest N for a monitor" and keyset pages (checked_at, id) < cursor
+        # come straight off this index, newest first.
+        Index(
+            "ix_check_results_monitor_checked_at",
+            "monitor_id",
+            checked_at.desc(),
+            id.desc(),
+        ),
+        # Range partitions by checked_at are created and dropped by
+        # app/db/partitions.py; retention drops whole partitions.
+        {"postgresql_partition_by": "RANGE (checked_at)"},
+    )
+
 
 class Incident(Base):
     __tablename__ = "incidents"
@@ -93,4 +147,111 @@ class Incident(Base):
     last_error_type = Column(String(50), nullable=True)
     last_error_message = Column(Text, nullable=True)
 
-    monitor = relationship("Monitor", back_populates="incidents")
\ No newline at end of file
+    monitor = relationship("Monitor", back_populates="incidents")
+
+
+class MonitorState(Base):
+    __tablename__ = "monitor_state"
+
+    # One row per monitor, written in the same transaction as each check result
+    # so incident evaluation never has to re-read check history.
+    monitor_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("monitors.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    fail_streak = Column(Integer, nullable=False, default=0)
+    success_streak = Column(Integer, nullable=False, default=0)
+    open_incident_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("incidents.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+
+    # Optimistic concurrency: writers update WHERE version = what they read
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+
+
+class _CheckRollupColumns:
+    # Pre-aggregated check_results per (monitor, bucket start). Every column
+    # merges by addition (min/max by least/greatest), so buckets can be
+    # updated incrementally and combined into any window.
+    monitor_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("monitors.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+
+    total_checks = Column(Integer, nullable=False, default=0)
+    success_checks = Column(Integer, nullable=False, default=0)
+
+    latency_count = Column(Integer, nullable=False, default=0)
+    latency_sum = Column(BigInteger, nullable=False, default=0)
+    latency_min = Column(Integer, nullable=True)
+    latency_max = Column(Integer, nullable=True)
+    latency_hist = Column(ARRAY(Integer), nullable=False)  # counts per summary.LATENCY_BOUNDS_MS bucket
+
+    # Per phase (http_timing.PHASES): sum and count of the checks that had it
+    dns_ms_sum = Column(BigInteger, nullable=False, default=0)
+    dns_count = Column(Integer, nullable=False, default=0)
+    connect_ms_sum = Column(BigInteger, nullable=False, default=0)
+    connect_count = Column(Integer, nullable=False, default=0)
+    tls_ms_sum = Column(BigInteger, nullable=False, default=0)
+    tls_count = Column(Integer, nullable=False, default=0)
+    ttfb_ms_sum = Column(BigInteger, nullable=False, default=0)
+    ttfb_count = Column(Integer, nullable=False, default=0)
+    body_ms_sum = Column(BigInteger, nullable=False, default=0)
+    body_count = Column(Integer, nullable=False, default=0)
+
+
+class CheckRollupMinute(_CheckRollupColumns, Base):
+    __tablename__ = "check_rollups_minute"
+
+
+class CheckRollupHour(_CheckRollupColumns, Base):
+    __tablename__ = "check_rollups_hour"
+
+
+class AlertOutbox(Base):
+    __tablename__ = "alert_outbox"
+
+    # Written in the same transaction as the incident transition it reports;
+    # app/services/alerts.py delivers it.
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    monitor_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("monitors.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    incident_id = Column(UUID(as_uuid=True), nullable=True)
+    transition = Column(String(20), nullable=False)  # OPENED / RESOLVED
+    payload = Column(JSON, nullable=False)  # snapshot of the check result that caused it
+
+    status = Column(String(20), nullable=False, default="PENDING")  # PENDING / SENT / FAILED
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_alert_outbox_pending",
+            "next_attempt_at",
+            postgresql_where=(status == "PENDING"),
+        ),
+    )
+
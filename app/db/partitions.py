@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.db.models import CheckResult
+
+logger = logging.getLogger(__name__)
+
+PARENT = CheckResult.__table__.name
+DEFAULT_PARTITION = f"{PARENT}_default"
+
+# Serializes partition DDL between the API, workers and scripts
+_LOCK_KEY = 0x5348_5054  # "SHPT"
+
+DDL_LOCK_TIMEOUT = "5s"
+
+# Weekly partitions run Monday to Monday
+_GRID_ORIGIN = date(2000, 1, 3)
+
+_RANGE_BOUND = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+@dataclass
+class Partition:
+    name: str
+    start: datetime | None  # None = MINVALUE
+    end: datetime | None  # None = MAXVALUE
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        return (self.start is None or self.start < end) and (self.end is None or start < self.end)
+
+
+def _parse_bound(value: str) -> datetime | None:
+    value = value.strip()
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(value.strip("'"))
+
+
+def _quote(conn: Connection, name: str) -> str:
+    return conn.dialect.identifier_preparer.quote(name)
+
+
+def _literal(ts: datetime) -> str:
+    return f"'{ts.astimezone(timezone.utc).isoformat()}'"
+
+
+def lock(conn: Connection) -> None:
+    """Transaction-scoped lock; released on commit/rollback."""
+    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+
+
+def is_partitioned(conn: Connection) -> bool:
+    return bool(
+        conn.execute(
+            text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:t))"),
+            {"t": PARENT},
+        ).scalar()
+    )
+
+
+def list_partitions(conn: Connection) -> list[Partition]:
+    """Range partitions of check_results, oldest first (the DEFAULT partition is left out)."""
+    # Bounds are rendered in the session time zone
+    conn.execute(text("SET LOCAL TIME ZONE 'UTC'"))
+    rows = conn.execute(
+        text(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(:t)
+            """
+        ),
+        {"t": PARENT},
+    )
+
+    out = []
+    for name, bound in rows:
+        m = _RANGE_BOUND.search(bound)
+        if m is None:
+            continue  # DEFAULT
+        out.append(Partition(name, _parse_bound(m.group(1)), _parse_bound(m.group(2))))
+
+    lowest = datetime.min.replace(tzinfo=timezone.utc)
+    return sorted(out, key=lambda p: p.start or lowest)
+
+
+def partition_start(ts: datetime, days: int) -> datetime:
+    """Start (UTC midnight) of the partition-grid slot holding ts."""
+    d = ts.astimezone(timezone.utc).date()
+    d -= timedelta(days=(d - _GRID_ORIGIN).days % days)
+    return datetime.combine(d, time.min, tzinfo=timezone.utc)
+
+
+def create_partition(conn: Connection, start: datetime, end: datetime) -> str:
+    """
+    Create [start, end) as a new partition.
+
+    Built standalone and then attached, after moving over any rows that
+    already landed in the DEFAULT partition for that range (ATTACH refuses
+    otherwise). The parent's indexes and FK are added on attach.
+    """
+    name = f"{PARENT}_p{start.astimezone(timezone.utc):%Y%m%d}"
+    parent, partition, default = _quote(conn, PARENT), _quote(conn, name), _quote(conn, DEFAULT_PARTITION)
+
+    conn.execute(text(f"CREATE TABLE {partition} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    conn.execute(
+        text(
+            f"WITH moved AS ("
+            f" DELETE FROM {default} WHERE checked_at >= :start AND checked_at < :end RETURNING *"
+            f") INSERT INTO {partition} SELECT * FROM moved"
+        ),
+        {"start": start, "end": end},
+    )
+    conn.execute(
+        text(f"ALTER TABLE {parent} ATTACH PARTITION {partition} FOR VALUES FROM ({_literal(start)}) TO ({_literal(end)})")
+    )
+    return name
+
+
+def drop_partition(conn: Connection, name: str) -> None:
+    """
+    Needs an ACCESS EXCLUSIVE lock on check_results; a queued DROP would
+    stall every query behind a long reader, so give up after DDL_LOCK_TIMEOUT.
+    """
+    conn.execute(text(f"SET LOCAL lock_timeout = '{DDL_LOCK_TIMEOUT}'"))
+    conn.execute(text(f"DROP TABLE {_quote(conn, name)}"))
+
+
+def ensure_partitions(conn: Connection, now: datetime | None = None) -> list[str]:
+    """
+    Make sure the DEFAULT partition and every partition from the current
+    slot through results_partitions_ahead slots ahead exist. Gaps between
+    existing partitions (e.g. after changing results_partition_days) are
+    filled up to the next existing bound. Returns the partitions created.
+
+    Does nothing (with a warning) if check_results predates partitioning;
+    see scripts/partition_check_results.py.
+    """
+    lock(conn)
+    if not is_partitioned(conn):
+        logger.warning("%s is not partitioned; run scripts/partition_check_results.py", PARENT)
+        return []
+
+    conn.execute(
+        text(f"CREATE TABLE IF NOT EXISTS {_quote(conn, DEFAULT_PARTITION)} PARTITION OF {_quote(conn, PARENT)} DEFAULT")
+    )
+
+    days = settings.results_partition_days
+    now = now or datetime.now(timezone.utc)
+    cursor = partition_start(now, days)
+    horizon = cursor + timedelta(days=days * (settings.results_partitions_ahead + 1))
+    existing = list_partitions(conn)
+
+    created = []
+    while cursor < horizon:
+        end = partition_start(cursor, days) + timedelta(days=days)
+        blocking = [p for p in existing if p.overlaps(cursor, end)]
+        if not blocking:
+            created.append(create_partition(conn, cursor, end))
+            cursor = end
+            continue
+
+        first = blocking[0]
+        if first.start is not None and first.start > cursor:
+            created.append(create_partition(conn, cursor, first.start))
+        if first.end is None:
+            break
+        cursor = first.end
+
+    if created:
+        logger.info("Created partitions: %s", ", ".join(created))
+    return created
@@ -1,28 +1,42 @@
 from fastapi import FastAPI
 
 from app.api.incidents import router as incidents_router
+from app.api.metrics import RequestMetricsMiddleware, router as metrics_router
 from app.api.monitors import router as monitors_router
 from app.api.results import router as results_router
+from app.api.summary import router as summary_router
 from app.core.config import settings
 from app.core.logging import configure_logging
-from app.db.models import Base
-from app.db.session import engine
+from app.db.init_db import init_db
+from app.db.session import async_engine
+from app.services.batch_check import close_batch_checker
+from app.services.monitor_cache import monitor_cache
 
 
 def create_app() -> FastAPI:
     configure_logging()
 
     app = FastAPI(title=settings.app_name)
+    app.add_middleware(RequestMetricsMiddleware)
 
    
     @app.on_event("startup")
     def _startup() -> None:
-        Base.metadata.create_all(bind=engine)
+        init_db()
+        monitor_cache.start()
+
+    @app.on_event("shutdown")
+    async def _shutdown() -> None:
+        monitor_cache.stop()
+        await close_batch_checker()
+        await async_engine.dispose()
 
     
     app.include_router(monitors_router, prefix="/api/v1")
     app.include_router(results_router, prefix="/api/v1")
     app.include_router(incidents_router, prefix="/api/v1")
+    app.include_router(summary_router, prefix="/api/v1")
+    app.include_router(metrics_router, prefix="/api/v1")
 
     @app.get("/api/v1/health", tags=["ops"])
     def health():
@@ -4,9 +4,9 @@ import uuid
 
 
 from datetime import datetime
-from typing import Any
+from typing import Annotated, Any, Literal, Union
 
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, TypeAdapter
 from pydantic import ConfigDict
 
 
@@ -17,6 +17,8 @@ class MonitorCreate(BaseModel):
     expected_status: int = Field(default=200, ge=100, le=599)
     interval_sec: int = Field(default=60, ge=5, le=86400)
     timeout_ms: int = Field(default=3000, ge=100, le=60000)
+    max_attempts: int = Field(default=3, ge=1, le=10)
+    retry_backoff_ms: int = Field(default=500, ge=0, le=60000)
     is_active: bool = True
     headers_json: dict[str, Any] | None = None
 
@@ -28,6 +30,8 @@ class MonitorUpdate(BaseModel):
     expected_status: int | None = Field(default=None, ge=100, le=599)
     interval_sec: int | None = Field(default=None, ge=5, le=86400)
     timeout_ms: int | None = Field(default=None, ge=100, le=60000)
+    max_attempts: int | None = Field(default=None, ge=1, le=10)
+    retry_backoff_ms: int | None = Field(default=None, ge=0, le=60000)
     is_active: bool | None = None
     headers_json: dict[str, Any] | None = None
 
@@ -42,8 +46,56 @@ class MonitorOut(BaseModel):
     expected_status: int
     interval_sec: int
     timeout_ms: int
+    max_attempts: int
+    retry_backoff_ms: int
     is_active: bool
     headers_json: dict[str, Any] | None
     created_at: datetime
     updated_at: datetime
 
+
+class BatchCheckIn(BaseModel):
+    # Which active monitors to check: these ids, and/or every monitor
+    # matching the prefixes (filters combine with AND)
+    monitor_ids: list[uuid.UUID] | None = None
+    name_prefix: str | None = Field(default=None, min_length=1)
+    url_prefix: str | None = Field(default=None, min_length=1)
+
+
+# ----------------------------
+# Bulk operations (POST /monitors/bulk)
+# ----------------------------
+class BulkCreate(MonitorCreate):
+    op: Literal["create"]
+
+
+class BulkUpsert(MonitorCreate):
+    # Matched on (name, url): updated if it differs, created if missing
+    op: Literal["upsert"]
+
+
+class BulkUpdate(MonitorUpdate):
+    op: Literal["update"]
+    id: uuid.UUID
+
+
+class BulkDeactivate(BaseModel):
+    op: Literal["deactivate"]
+    id: uuid.UUID
+
+
+BulkOperation = Annotated[Union[BulkCreate, BulkUpsert, BulkUpdate, BulkDeactivate], Field(discriminator="op")]
+bulk_operation_adapter: TypeAdapter[BulkOperation] = TypeAdapter(BulkOperation)
+
+
+class BulkItemResult(BaseModel):
+    index: int  # position in the request
+    op: str | None = None
+    status: str  # created / updated / unchanged / deactivated / not_found / error
+    id: uuid.UUID | None = None
+    error: str | None = None
+
+
+class BulkResultOut(BaseModel):
+    counts: dict[str, int]
+    results: list[BulkItemResult]
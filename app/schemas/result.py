@@ -21,7 +21,16 @@ class CheckResultOut(BaseModel):
     error_type: str | None
     error_message: str | None
 
+    # Phase breakdown of latency_ms; null when the phase didn't happen
+    dns_ms: int | None = None
+    connect_ms: int | None = None
+    tls_ms: int | None = None
+    ttfb_ms: int | None = None
+    body_ms: int | None = None
+
 from typing import List
 
 class CheckResultListOut(BaseModel):
-    results: List[CheckResultOut]
\ No newline at end of file
+    results: List[CheckResultOut]
+    # Pass as ?before= to get the next (older) page; null on the last page
+    next_cursor: str | None = None
\ No newline at end of file
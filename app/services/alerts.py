@@ -0,0 +1,406 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+import httpx
+from sqlalchemy import bindparam, exists, func, insert, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.core.metrics import ALERT_SEND_DURATION
+from app.db.models import AlertOutbox, CheckResult, Monitor
+from app.db.session import SessionLocal
+from app.services.notifier import slack_webhook_url
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "PENDING"
+STATUS_SENT = "SENT"
+STATUS_FAILED = "FAILED"
+
+ALERT_TRANSITIONS = ("OPENED", "RESOLVED")
+
+# Used when a 429 comes back without a usable Retry-After
+DEFAULT_RETRY_AFTER_SEC = 30.0
+
+_outbox = AlertOutbox.__table__
+
+
+def _now_utc() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# ----------------------------
+# Enqueue (check path)
+# ----------------------------
+def _snapshot(result: CheckResult) -> dict[str, Any]:
+    return {
+        "check_id": str(result.id),
+        "checked_at": result.checked_at.isoformat() if result.checked_at else None,
+        "status_code": result.status_code,
+        "latency_ms": result.latency_ms,
+        "error_type": result.error_type,
+        "error_message": result.error_message,
+    }
+
+
+def queue_alerts(db: Session, results: list[CheckResult], events: list[dict]) -> int:
+    """
+    Add an outbox row for every OPENED/RESOLVED event, in the caller's
+    transaction: the alert exists if and only if the transition committed.
+    Nothing is queued while Slack alerts are disabled.
+    """
+    if slack_webhook_url() is None:
+        return 0
+
+    now = _now_utc()
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "monitor_id": result.monitor_id,
+            "incident_id": uuid.UUID(event["incident_id"]) if event["incident_id"] else None,
+            "transition": event["transition"],
+            "payload": _snapshot(result),
+            "status": STATUS_PENDING,
+            "attempts": 0,
+            "next_attempt_at": now,
+            # Strictly increasing within the batch: created_at orders delivery
+            "created_at": now + timedelta(microseconds=i),
+        }
+        for i, (result, event) in enumerate(zip(results, events))
+        if event.get("transition") in ALERT_TRANSITIONS
+    ]
+    if rows:
+        db.execute(insert(_outbox), rows)
+    return len(rows)
+
+
+# ----------------------------
+# Slack message
+# ----------------------------
+def build_slack_message(transition: str, incident_id, monitor, check: dict[str, Any]) -> dict[str, Any]:
+    """
+    Webhook payload for an incident OPEN/RESOLVE.
+
+    Uses:
+    - attachments.color for the nice colored bar
+    - blocks for a clean, human-readable layout
+
+    IMPORTANT: Slack webhook payload must include non-empty "text".
+    """
+    monitor_id = str(monitor.id)
+
+    # Color via attachment
+    color = "#E01E5A" if transition == "OPENED" else "#2EB67D"
+    title = "🚨 Incident OPENED" if transition == "OPENED" else "✅ Incident RESOLVED"
+
+    observed = check["status_code"] if check["status_code"] is not None else "—"
+    latency = f"{check['latency_ms']} ms" if check["latency_ms"] is not None else "—"
+
+    # Always non-empty fallback string
+    text = f"{title}: {monitor.name} ({monitor.url})"
+
+    blocks: list[dict[str, Any]] = [
+        {"type": "header", "text": {"type": "plain_text", "text": title}},
+        {
+            "type": "section",
+            "fields": [
+                {"type": "mrkdwn", "text": f"*Monitor:*\n<{monitor.url}|{monitor.name}>"},
+                {"type": "mrkdwn", "text": f"*Monitor ID:*\n`{monitor_id}`"},
+                {"type": "mrkdwn", "text": f"*Expected:*\n`{monitor.expected_status}`"},
+                {"type": "mrkdwn", "text": f"*Observed:*\n`{observed}`"},
+                {"type": "mrkdwn", "text": f"*Latency:*\n`{latency}`"},
+                {"type": "mrkdwn", "text": f"*Error:*\n`{check['error_type'] or '—'}`"},
+            ],
+        },
+    ]
+
+    if check["error_message"]:
+        blocks.append(
+            {"type": "section", "text": {"type": "mrkdwn", "text": f"*Details:*\n```{check['error_message']}```"}}
+        )
+
+    blocks.extend(
+        [
+            {"type": "divider"},
+            {
+                "type": "context",
+                "elements": [
+                    {"type": "mrkdwn", "text": f"*Incident:* `{incident_id}`"},
+                    {"type": "mrkdwn", "text": f"*Check:* `{check['check_id']}`"},
+                    {"type": "mrkdwn", "text": f"*When:* `{check['checked_at'] or '—'}`"},
+                ],
+            },
+        ]
+    )
+
+    return {"text": text, "attachments": [{"color": color, "blocks": blocks}]}
+
+
+# ----------------------------
+# Outbox rows (run in a thread)
+# ----------------------------
+@dataclass
+class _Claimed:
+    id: uuid.UUID
+    attempts: int
+    message: dict[str, Any]
+
+
+_earlier = aliased(AlertOutbox)
+
+_CLAIM_IDS = (
+    select(AlertOutbox.id)
+    .where(AlertOutbox.status == STATUS_PENDING)
+    .where(AlertOutbox.next_attempt_at <= bindparam("b_now"))
+    # Per monitor, alerts go out in order: nothing overtakes one that's retrying
+    .where(
+        ~exists()
+        .where(_earlier.monitor_id == AlertOutbox.monitor_id)
+        .where(_earlier.status == STATUS_PENDING)
+        .where(_earlier.created_at < AlertOutbox.created_at)
+    )
+    .order_by(AlertOutbox.next_attempt_at, AlertOutbox.created_at)
+    .limit(bindparam("b_limit"))
+    .with_for_update(skip_locked=True)
+)
+
+_RESCHEDULE = (
+    update(_outbox)
+    .where(_outbox.c.id == bindparam("b_id"))
+    .values(
+        next_attempt_at=bindparam("b_at"),
+        attempts=bindparam("b_attempts"),
+        last_error=bindparam("b_error"),
+    )
+)
+
+
+def _claim(limit: int) -> list[_Claimed]:
+    """
+    Lease up to limit due alerts: push their next_attempt_at past the lease
+    so no other dispatcher picks them up, and count the attempt. A
+    dispatcher that dies mid-send leaves them to be retried after the lease.
+    """
+    now = _now_utc()
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            update(AlertOutbox)
+            .where(AlertOutbox.id.in_(_CLAIM_IDS.scalar_subquery()))
+            .values(
+                next_attempt_at=now + timedelta(seconds=settings.alert_lease_sec),
+                attempts=AlertOutbox.attempts + 1,
+            )
+            .returning(
+                AlertOutbox.id,
+                AlertOutbox.attempts,
+                AlertOutbox.monitor_id,
+                AlertOutbox.incident_id,
+                AlertOutbox.transition,
+                AlertOutbox.payload,
+                AlertOutbox.created_at,
+            ),
+            {"b_now": now, "b_limit": limit},
+        ).all()
+
+        monitors = {}
+        if rows:
+            monitor_ids = {r.monitor_id for r in rows}
+            monitors = {m.id: m for m in db.query(Monitor).filter(Monitor.id.in_(monitor_ids))}
+        db.commit()
+
+        rows.sort(key=lambda r: r.created_at)
+        return [
+            _Claimed(r.id, r.attempts, build_slack_message(r.transition, r.incident_id, monitors[r.monitor_id], r.payload))
+            for r in rows
+        ]
+    finally:
+        db.close()
+
+
+def _mark_sent(alert_id: uuid.UUID) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(AlertOutbox)
+            .where(AlertOutbox.id == alert_id)
+            .values(status=STATUS_SENT, sent_at=_now_utc(), last_error=None)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _mark_failed(alert_id: uuid.UUID, error: str) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(AlertOutbox)
+            .where(AlertOutbox.id == alert_id)
+            .values(status=STATUS_FAILED, last_error=error)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _reschedule(changes: list[dict]) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(_RESCHEDULE, changes)
+        db.commit()
+    finally:
+        db.close()
+
+
+def queue_depth(db: Session) -> tuple[int, datetime | None]:
+    """PENDING alerts, and when the oldest of them was queued."""
+    count, oldest = db.execute(
+        select(func.count(), func.min(AlertOutbox.created_at)).where(AlertOutbox.status == STATUS_PENDING)
+    ).one()
+    return count, oldest
+
+
+# ----------------------------
+# Dispatcher (worker)
+# ----------------------------
+def _retry_after_sec(resp: httpx.Response) -> float:
+    value = resp.headers.get("Retry-After", "").strip()
+    if not value:
+        return DEFAULT_RETRY_AFTER_SEC
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - _now_utc()).total_seconds())
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER_SEC
+
+
+def _send_outcome(status_code: int) -> str:
+    if 200 <= status_code < 300:
+        return "sent"
+    if status_code == 429:
+        return "rate_limited"
+    if status_code >= 500:
+        return "retry"
+    return "failed"
+
+
+def _backoff_sec(attempts: int) -> float:
+    return min(settings.alert_retry_max_sec, settings.alert_retry_base_sec * (2 ** max(0, attempts - 1)))
+
+
+class AlertDispatcher:
+    """
+    Drains alert_outbox to the Slack webhook.
+
+    - due alerts are leased in batches (FOR UPDATE SKIP LOCKED), so several
+      workers can run a dispatcher side by side
+    - one pooled AsyncClient; alerts go out in the order they were queued,
+      and a monitor's later alerts wait while an earlier one is retrying
+    - network errors and 5xx retry with exponential backoff; other 4xx
+      (bad payload, revoked webhook) fail the alert right away
+    - 429 pushes the alert and the rest of the batch back by Retry-After and
+      pauses the dispatcher for as long, without counting an attempt
+    - alerts that run out of alert_max_attempts are marked FAILED
+    """
+
+    def __init__(self, *, batch_size: int | None = None, poll_sec: float | None = None) -> None:
+        self._batch_size = batch_size or settings.alert_dispatch_batch
+        self._poll_sec = poll_sec or settings.alert_dispatch_poll_sec
+        self._client: httpx.AsyncClient | None = None
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def _sleep(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _retry_later(self, alert: _Claimed, error: str) -> None:
+        if alert.attempts >= settings.alert_max_attempts:
+            logger.error("Alert %s failed after %d attempts: %s", alert.id, alert.attempts, error)
+            await asyncio.to_thread(_mark_failed, alert.id, error)
+            return
+
+        delay = _backoff_sec(alert.attempts)
+        logger.warning("Alert %s attempt %d failed (%s), retrying in %.0fs", alert.id, alert.attempts, error, delay)
+        change = {
+            "b_id": alert.id,
+            "b_at": _now_utc() + timedelta(seconds=delay),
+            "b_attempts": alert.attempts,
+            "b_error": error,
+        }
+        await asyncio.to_thread(_reschedule, [change])
+
+    async def _rate_limited(self, pending: list[_Claimed], retry_after: float) -> None:
+        at = _now_utc() + timedelta(seconds=retry_after)
+        changes = [
+            {"b_id": a.id, "b_at": at, "b_attempts": a.attempts - 1, "b_error": "429 rate limited"}
+            for a in pending
+        ]
+        await asyncio.to_thread(_reschedule, changes)
+        logger.warning("Slack rate limited, pausing alerts for %.0fs", retry_after)
+        await self._sleep(retry_after)
+
+    async def _deliver(self, url: str, alerts: list[_Claimed]) -> None:
+        for i, alert in enumerate(alerts):
+            started = time.perf_counter()
+            try:
+                resp = await self._client.post(url, json=alert.message)
+            except httpx.HTTPError as exc:
+                ALERT_SEND_DURATION.labels("retry").observe(time.perf_counter() - started)
+                await self._retry_later(alert, f"{type(exc).__name__}: {exc}")
+                continue
+            ALERT_SEND_DURATION.labels(_send_outcome(resp.status_code)).observe(time.perf_counter() - started)
+
+            if 200 <= resp.status_code < 300:
+                await asyncio.to_thread(_mark_sent, alert.id)
+                logger.info("Alert %s sent", alert.id)
+            elif resp.status_code == 429:
+                await self._rate_limited(alerts[i:], _retry_after_sec(resp))
+                return
+            elif resp.status_code >= 500:
+                await self._retry_later(alert, f"HTTP {resp.status_code}: {resp.text.strip()[:200]}")
+            else:
+                error = f"HTTP {resp.status_code}: {resp.text.strip()[:200]}"
+                logger.error("Alert %s rejected: %s", alert.id, error)
+                await asyncio.to_thread(_mark_failed, alert.id, error)
+
+    async def run(self) -> None:
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.alert_send_timeout_sec),
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+        )
+        try:
+            while not self._stopping.is_set():
+                url = slack_webhook_url()
+                if url is None:
+                    await self._sleep(self._poll_sec)
+                    continue
+
+                try:
+                    alerts = await asyncio.to_thread(_claim, self._batch_size)
+                    if alerts:
+                        await self._deliver(url, alerts)
+                except Exception:
+                    logger.exception("Alert dispatch failed")
+                    alerts = []
+
+                if len(alerts) < self._batch_size:
+                    await self._sleep(self._poll_sec)
+        finally:
+            await self._client.aclose()
@@ -1,16 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
 import time
 from datetime import datetime, timezone
-from typing import Any
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlsplit
 
 import httpx
-from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.metrics import CHECK_DURATION
 from app.db.models import CheckResult, Monitor
-from app.services.incident import apply_incident_rules
-from app.services.notifier import send_slack
+from app.db.session import SessionLocal
+from app.services.dns_cache import DNSError
+from app.services.http_timing import PhaseTimer, async_transport, empty_columns
+from app.services.incident import IncidentTracker
+
+if TYPE_CHECKING:
+    from app.services.monitor_cache import MonitorConfig
+    from app.services.result_sink import ResultSink
 
 logger = logging.getLogger(__name__)
 
@@ -25,21 +35,26 @@ def _now_utc() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def _dns_failure(exc: BaseException) -> DNSError | None:
+    # httpx re-raises transport errors as its own types, from the original
+    while exc is not None:
+        if isinstance(exc, DNSError):
+            return exc
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
 def _classify_error(exc: Exception) -> tuple[str, str]:
     msg = str(exc)
 
+    # Before timeouts: a resolver that doesn't answer is a DNS problem
+    if _dns_failure(exc) is not None:
+        return ERR_DNS, msg
+
     if isinstance(exc, httpx.TimeoutException):
         return ERR_TIMEOUT, msg
 
     if isinstance(exc, httpx.ConnectError):
-        low = msg.lower()
-        # common DNS substrings across OSes
-        if (
-            "getaddrinfo" in low
-            or "name or service not known" in low
-            or "nodename nor servname" in low
-        ):
-            return ERR_DNS, msg
         return ERR_CONNECTION, msg
 
     if isinstance(exc, httpx.NetworkError):
@@ -53,158 +68,238 @@ def _should_retry(exc: Exception) -> bool:
     return isinstance(exc, (httpx.TimeoutException, httpx.NetworkError, httpx.ConnectError))
 
 
-def _try_send_slack(event: dict, monitor: Monitor, result: CheckResult) -> None:
+def _retry_delay_sec(monitor: Monitor, attempt: int) -> float:
     """
-    Sends Slack alerts when incidents OPEN/RESOLVE.
+    Backoff before the given 0-based attempt: 0, b, 2b, 4b, ...
+    where b = monitor.retry_backoff_ms (default 500ms -> 0.5s, 1s).
+    """
+    if attempt == 0:
+        return 0.0
+    return (monitor.retry_backoff_ms / 1000.0) * (2 ** (attempt - 1))
 
-    Uses:
-    - attachments.color for the nice colored bar
-    - blocks for a clean, human-readable layout
 
-    IMPORTANT: Slack webhook payload must include non-empty "text".
+def _can_retry(monitor: Monitor, attempt: int, deadline: float) -> bool:
     """
-    transition = event.get("transition")
-    if transition not in ("OPENED", "RESOLVED"):
-        return
-
-    incident_id = event.get("incident_id")
-    monitor_id = str(monitor.id)
-    check_id = str(result.id)
-
-    # Color via attachment
-    color = "#E01E5A" if transition == "OPENED" else "#2EB67D"
-    title = "🚨 Incident OPENED" if transition == "OPENED" else "✅ Incident RESOLVED"
-
-    observed = result.status_code if result.status_code is not None else "—"
-    latency = f"{result.latency_ms} ms" if result.latency_ms is not None else "—"
-
-    # Always non-empty fallback string
-    text = f"{title}: {monitor.name} ({monitor.url})"
-
-    blocks: list[dict[str, Any]] = [
-        {"type": "header", "text": {"type": "plain_text", "text": title}},
-        {
-            "type": "section",
-            "fields": [
-                {"type": "mrkdwn", "text": f"*Monitor:*\n<{monitor.url}|{monitor.name}>"},
-                {"type": "mrkdwn", "text": f"*Monitor ID:*\n`{monitor_id}`"},
-                {"type": "mrkdwn", "text": f"*Expected:*\n`{monitor.expected_status}`"},
-                {"type": "mrkdwn", "text": f"*Observed:*\n`{observed}`"},
-                {"type": "mrkdwn", "text": f"*Latency:*\n`{latency}`"},
-                {"type": "mrkdwn", "text": f"*Error:*\n`{result.error_type or '—'}`"},
-            ],
-        },
-    ]
-
-    if result.error_message:
-        blocks.append(
-            {"type": "section", "text": {"type": "mrkdwn", "text": f"*Details:*\n```{result.error_message}```"}}
-        )
+    Another attempt is allowed if the monitor has attempts left and its
+    backoff still starts inside the check's total wall-clock budget.
+    """
+    next_attempt = attempt + 1
+    if next_attempt >= monitor.max_attempts:
+        return False
+    return time.monotonic() + _retry_delay_sec(monitor, next_attempt) < deadline
+
+
+def _observe_check(started: float, success: bool, error_type: str | None) -> None:
+    CHECK_DURATION.labels("success" if success else "failure", error_type).observe(time.perf_counter() - started)
+
+
+def _outcome_for_status(monitor: Monitor, status_code: int) -> tuple[bool, str | None, str | None]:
+    if status_code == monitor.expected_status:
+        return True, None, None
+    return False, ERR_HTTP_UNEXPECTED, f"Expected {monitor.expected_status} got {status_code}"
+
+
+LATENCY_WARM = "warm"
+LATENCY_COLD = "cold"
 
-    blocks.extend(
-        [
-            {"type": "divider"},
-            {
-                "type": "context",
-                "elements": [
-                    {"type": "mrkdwn", "text": f"*Incident:* `{incident_id}`"},
-                    {"type": "mrkdwn", "text": f"*Check:* `{check_id}`"},
-                    {"type": "mrkdwn", "text": f"*When:* `{result.checked_at.isoformat() if result.checked_at else '—'}`"},
-                ],
-            },
-        ]
-    )
-
-    attachments = [{"color": color, "blocks": blocks}]
-
-    logger.info(
-        "Slack alert attempt: transition=%s incident_id=%s monitor_id=%s",
-        transition,
-        incident_id,
-        monitor_id,
-    )
-
-    ok = send_slack(text, attachments=attachments)
-    if not ok:
-        logger.warning("Slack send returned false (see notifier logs for status/body)")
-
-
-def run_check(db: Session, monitor: Monitor) -> CheckResult:
+
+def _latency_mode(value: str | None) -> str:
+    mode = (value or settings.check_latency_mode).strip().lower()
+    if mode not in {LATENCY_WARM, LATENCY_COLD}:
+        raise ValueError("latency_mode must be warm or cold")
+    return mode
+
+
+def _request_headers(monitor: Monitor | MonitorConfig, latency_mode: str) -> dict[str, Any]:
+    headers = dict(monitor.headers_json or {})
+    if latency_mode == LATENCY_COLD:
+        headers["Connection"] = "close"
+    return headers
+
+
+# ----------------------------
+# Async executor (worker)
+# ----------------------------
+
+class AsyncCheckExecutor:
     """
+    Runs checks for the worker and check-now.
+
     Strict rules:
     - httpx
     - timeout = monitor.timeout_ms
     - success if status_code == expected_status
-    - 3 total attempts
-    - backoff: 0.5s -> 1s
+    - monitor.max_attempts total attempts (default 3)
+    - backoff: monitor.retry_backoff_ms, doubling (default 0.5s -> 1s)
     - retry only network/timeouts
-    - store final outcome only
+    - whole check capped at max_total_sec (CHECK_MAX_TOTAL_SEC)
+    - store final outcome only (phase timings too: the last attempt's)
+
+    - one long-lived httpx.AsyncClient (timeouts are per request), so every
+      probe to an origin reuses the same pooled keep-alive connections
+      instead of a new TCP+TLS handshake each time; names resolve through
+      the shared DNS cache (services/dns_cache.py)
+    - latency_mode="warm" (the worker's default) measures on a reused
+      connection (request only); latency_mode="cold" sends "Connection:
+      close" so every probe pays for a fresh connection, like check-now
+      (CHECK_NOW_LATENCY_MODE) does by default
+    - per-phase timings (dns, connect, tls, ttfb, body) of the final attempt
+      are stored with the result; see services/http_timing.py
+    - at most max_inflight HTTP requests at once (backoff waits don't count),
+      and at most max_per_host to one origin, so many monitors on one
+      backend don't hit it all at once (0 = no per-host cap)
+    - with a ResultSink, results are handed off for batched writes; without
+      one, each result is written in a thread (sync Session) via IncidentTracker
     """
 
-    timeout = httpx.Timeout(monitor.timeout_ms / 1000.0)
-    headers = monitor.headers_json or {}
-
-    status_code: int | None = None
-    latency_ms: int | None = None
-    success = False
-    error_type: str | None = None
-    error_message: str | None = None
-
-    backoffs = [0.0, 0.5, 1.0]  # attempt1 no sleep, attempt2 0.5s, attempt3 1s
-
-    for attempt in range(3):
-        if backoffs[attempt] > 0:
-            time.sleep(backoffs[attempt])
+    def __init__(
+        self,
+        *,
+        max_connections: int | None = None,
+        max_keepalive_connections: int | None = None,
+        keepalive_expiry: float | None = None,
+        latency_mode: str | None = None,
+        max_inflight: int | None = None,
+        max_per_host: int | None = None,
+        max_total_sec: float | None = None,
+        sink: ResultSink | None = None,
+    ) -> None:
+        self._limits = httpx.Limits(
+            max_connections=max_connections or settings.http_max_connections,
+            max_keepalive_connections=max_keepalive_connections or settings.http_max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry or settings.http_keepalive_expiry_sec,
+        )
+        self._latency_mode = _latency_mode(latency_mode)
+        self._client: httpx.AsyncClient | None = None
+        self._requests = asyncio.Semaphore(max_inflight or settings.check_max_inflight)
+        self._max_per_host = max_per_host if max_per_host is not None else settings.check_max_per_host
+        self._hosts: dict[tuple, asyncio.Semaphore] = {}
+        self._max_total_sec = max_total_sec or settings.check_max_total_sec
+        self._incidents = IncidentTracker()
+        self._sink = sink
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(transport=async_transport(limits=self._limits), follow_redirects=True)
+        return self._client
+
+    def _host_slot(self, url: str):
+        if self._max_per_host <= 0:
+            return contextlib.nullcontext()
+        try:
+            parts = urlsplit(url)
+            origin = (parts.scheme, parts.hostname, parts.port)
+        except ValueError:
+            origin = (url,)
+        slot = self._hosts.get(origin)
+        if slot is None:
+            slot = self._hosts[origin] = asyncio.Semaphore(self._max_per_host)
+        return slot
+
+    async def probe(self, monitor: Monitor) -> CheckResult:
+        """
+        HTTP part only: returns an unsaved CheckResult.
+
+        Backoff is an awaited sleep taken outside the request slot, so a
+        failing endpoint waiting to retry doesn't hold capacity other checks
+        need. The budget (max_total_sec) starts with the first attempt and
+        hard-cancels whatever attempt is running when it runs out.
+        """
+        started = time.perf_counter()
+        client = self._http()
+        headers = _request_headers(monitor, self._latency_mode)
+        timeout = httpx.Timeout(monitor.timeout_ms / 1000.0)
+        host_slot = self._host_slot(monitor.url)
+
+        status_code: int | None = None
+        latency_ms: int | None = None
+        success = False
+        error_type: str | None = None
+        error_message: str | None = None
+        phases = empty_columns()
+
+        deadline: float | None = None
+
+        for attempt in range(monitor.max_attempts):
+            delay = _retry_delay_sec(monitor, attempt)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            # Host first: a probe waiting on a busy backend doesn't hold a global slot
+            async with host_slot, self._requests:
+                if deadline is None:
+                    deadline = time.monotonic() + self._max_total_sec
+
+                start = time.perf_counter()
+                timer = PhaseTimer()
+                try:
+                    async with asyncio.timeout(max(0.0, deadline - time.monotonic())):
+                        with timer:
+                            resp = await client.request(
+                                monitor.method,
+                                monitor.url,
+                                headers=headers,
+                                timeout=timeout,
+                                extensions=timer.async_extensions,
+                            )
+
+                    latency_ms = int((time.perf_counter() - start) * 1000)
+                    status_code = resp.status_code
+                    success, error_type, error_message = _outcome_for_status(monitor, status_code)
+                    break
+
+                except TimeoutError:
+                    # asyncio.timeout fired: the total budget is spent, no more attempts
+                    latency_ms = int((time.perf_counter() - start) * 1000)
+                    error_type = ERR_TIMEOUT
+                    error_message = f"Check exceeded total budget of {self._max_total_sec:g}s"
+                    success = False
+                    status_code = None
+                    break
+
+                except Exception as exc:
+                    latency_ms = int((time.perf_counter() - start) * 1000)
+
+                    if _should_retry(exc) and _can_retry(monitor, attempt, deadline):
+                        continue
+
+                    error_type, error_message = _classify_error(exc)
+                    success = False
+                    status_code = None
+                    break
+
+                finally:
+                    phases = timer.columns()
+
+        _observe_check(started, success, error_type)
+        return CheckResult(
+            monitor_id=monitor.id,
+            checked_at=_now_utc(),
+            success=success,
+            status_code=status_code,
+            latency_ms=latency_ms,
+            error_type=error_type,
+            error_message=error_message,
+            **phases,
+        )
 
-        start = time.perf_counter()
+    def _record_blocking(self, monitor: Monitor, result: CheckResult) -> CheckResult:
+        # No expiry on commit: the result is never read back from the DB
+        db = SessionLocal(expire_on_commit=False)
         try:
-            with httpx.Client(timeout=timeout, follow_redirects=True) as client:
-                resp = client.request(monitor.method, monitor.url, headers=headers)
-
-            latency_ms = int((time.perf_counter() - start) * 1000)
-            status_code = resp.status_code
-
-            if status_code == monitor.expected_status:
-                success = True
-                error_type = None
-                error_message = None
-            else:
-                success = False
-                error_type = ERR_HTTP_UNEXPECTED
-                error_message = f"Expected {monitor.expected_status} got {status_code}"
-
-            # Don't retry on HTTP response mismatch
-            break
-
-        except Exception as exc:
-            latency_ms = int((time.perf_counter() - start) * 1000)
-
-            if _should_retry(exc) and attempt < 2:
-                continue
-
-            error_type, error_message = _classify_error(exc)
-            success = False
-            status_code = None
-            break
-
-    result = CheckResult(
-        monitor_id=monitor.id,
-        checked_at=_now_utc(),
-        success=success,
-        status_code=status_code,
-        latency_ms=latency_ms,
-        error_type=error_type,
-        error_message=error_message,
-    )
-
-    db.add(result)
-    db.commit()
-    db.refresh(result)
-
-    # Incident transitions (OPEN/RESOLVE) happen here:
-    event = apply_incident_rules(db, result)
-
-    # Slack alerts should fire ONLY on OPEN/RESOLVE transitions:
-    _try_send_slack(event, monitor, result)
-
-    return result
\ No newline at end of file
+            self._incidents.record(db, result)
+        finally:
+            db.close()
+        return result
+
+    async def run(self, monitor: Monitor) -> CheckResult:
+        result = await self.probe(monitor)
+        if self._sink is not None:
+            await self._sink.submit(monitor, result)
+            return result
+        return await asyncio.to_thread(self._record_blocking, monitor, result)
+
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
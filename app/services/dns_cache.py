@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import socket
+import threading
+import time
+
+import httpcore
+
+from app.core.config import settings
+
+# getaddrinfo answers that mean "this name doesn't exist", cached as such;
+# anything else (EAI_AGAIN, EAI_FAIL, ...) is retried on the next lookup
+_NEGATIVE = {socket.EAI_NONAME} | ({socket.EAI_NODATA} if hasattr(socket, "EAI_NODATA") else set())
+
+
+class DNSError(Exception):
+    """Marks a resolver failure; _classify_error looks for it in the exception chain."""
+
+
+class DNSLookupError(httpcore.ConnectError, DNSError):
+    def __init__(self, host: str, code: int | None, message: str) -> None:
+        super().__init__(f"DNS lookup for {host} failed: {message}")
+        self.host = host
+        self.code = code  # socket.EAI_* from getaddrinfo
+
+
+class DNSLookupTimeout(httpcore.ConnectTimeout, DNSError):
+    def __init__(self, host: str) -> None:
+        super().__init__(f"DNS lookup for {host} timed out")
+        self.host = host
+
+
+def _addresses(infos) -> list[str]:
+    # Keep getaddrinfo's (RFC 6724) order, drop duplicates
+    seen: list[str] = []
+    for *_, sockaddr in infos:
+        if sockaddr[0] not in seen:
+            seen.append(sockaddr[0])
+    return seen
+
+
+class DnsCache:
+    """
+    Process-wide cache of getaddrinfo answers, for the check clients.
+
+    - getaddrinfo doesn't report record TTLs, so answers are kept for
+      ttl_sec (DNS_CACHE_TTL_SEC); keep it at or below the TTLs of the
+      names you monitor
+    - "no such name" answers are cached for negative_ttl_sec, so a
+      misconfigured monitor doesn't hit the resolver on every retry
+    - async lookups of the same name share one getaddrinfo call
+    - resolve methods return (addresses, looked_up): looked_up is False on
+      a cache hit, so the caller only reports DNS time for real lookups
+    """
+
+    def __init__(
+        self,
+        ttl_sec: float | None = None,
+        negative_ttl_sec: float | None = None,
+        max_entries: int | None = None,
+    ) -> None:
+        self._ttl_sec = ttl_sec if ttl_sec is not None else settings.dns_cache_ttl_sec
+        self._negative_ttl_sec = negative_ttl_sec if negative_ttl_sec is not None else settings.dns_negative_ttl_sec
+        self._max_entries = max_entries or settings.dns_cache_max_entries
+        # host -> (expires, addresses) or (expires, (EAI_* code, message)) for a missing name
+        self._entries: dict[str, tuple[float, list[str] | tuple[int, str]]] = {}
+        self._lock = threading.Lock()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def _cached(self, host: str) -> list[str] | None:
+        with self._lock:
+            entry = self._entries.get(host)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        if isinstance(entry[1], tuple):
+            raise DNSLookupError(host, *entry[1])
+        return entry[1]
+
+    def _store(self, host: str, answer: list[str] | tuple[int, str]) -> None:
+        ttl = self._negative_ttl_sec if isinstance(answer, tuple) else self._ttl_sec
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries.pop(host, None)
+            self._entries[host] = (time.monotonic() + ttl, answer)
+            while len(self._entries) > self._max_entries:
+                del self._entries[next(iter(self._entries))]
+
+    def _failed(self, host: str, exc: OSError) -> DNSLookupError:
+        code = exc.errno if isinstance(exc, socket.gaierror) else None
+        message = exc.strerror or str(exc)
+        if code in _NEGATIVE:
+            self._store(host, (code, message))
+        return DNSLookupError(host, code, message)
+
+    async def resolve_async(self, host: str, port: int, timeout: float | None) -> tuple[list[str], bool]:
+        cached = self._cached(host)
+        if cached is not None:
+            return cached, False
+
+        future = self._inflight.get(host)
+        if future is None:
+            future = asyncio.ensure_future(self._lookup(host, port))
+            self._inflight[host] = future
+            future.add_done_callback(lambda f: self._done(host, f))
+        try:
+            # shield: one caller timing out doesn't cancel the lookup for the others
+            async with asyncio.timeout(timeout):
+                return await asyncio.shield(future), True
+        except TimeoutError as exc:
+            raise DNSLookupTimeout(host) from exc
+
+    def _done(self, host: str, future: asyncio.Future) -> None:
+        self._inflight.pop(host, None)
+        if not future.cancelled():
+            future.exception()  # retrieved: every waiter may have timed out already
+
+    async def _lookup(self, host: str, port: int) -> list[str]:
+        loop = asyncio.get_running_loop()
+        try:
+            addresses = _addresses(await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM))
+        except OSError as exc:
+            raise self._failed(host, exc) from exc
+        self._store(host, addresses)
+        return addresses
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+dns_cache = DnsCache()
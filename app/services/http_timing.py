@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import contextvars
+import ipaddress
+import time
+from typing import Any, Iterable
+
+import httpcore
+import httpx
+
+from app.services.dns_cache import DNSError, dns_cache
+
+# Stored as CheckResult.<phase>_ms, in this order everywhere
+PHASES = ("dns", "connect", "tls", "ttfb", "body")
+
+# httpcore trace step -> phase timed from its .started to its .complete/.failed
+_TRACED_STEPS = {
+    "connect_tcp": "connect",
+    "start_tls": "tls",
+    "receive_response_body": "body",
+}
+
+_current: contextvars.ContextVar[PhaseTimer | None] = contextvars.ContextVar("phase_timer", default=None)
+
+
+class PhaseTimer:
+    """
+    Phase timings for one request attempt.
+
+    - connect, tls, ttfb and body come from httpcore trace events (pass
+      extensions=timer.async_extensions to the request)
+    - ttfb runs from sending the request headers to the response headers
+      being in, i.e. request upload plus server think time
+    - dns isn't a trace event (httpcore resolves inside connect_tcp), so the
+      TimedAsyncBackend below resolves first and reports it here; connect is
+      the rest of connect_tcp
+    - a phase that didn't happen (reused connection, plain http, DNS cache
+      hit) stays None
+    - times add up across redirects
+    - used as a context manager around the request, so the backend can
+      find it (contextvar: same task / thread as the request)
+    """
+
+    __slots__ = ("_ms", "_started", "_dns_failed", "_token")
+
+    def __init__(self) -> None:
+        self._ms: dict[str, float] = {}
+        self._started: dict[str, float] = {}
+        self._dns_failed = False
+        self._token: contextvars.Token | None = None
+
+    def __enter__(self) -> PhaseTimer:
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _current.reset(self._token)
+
+    def add(self, phase: str, seconds: float) -> None:
+        self._ms[phase] = self._ms.get(phase, 0.0) + seconds * 1000.0
+
+    def on_event(self, name: str, info: dict[str, Any]) -> None:
+        # e.g. "connection.connect_tcp.started", "http11.receive_response_headers.complete"
+        head, _, state = name.rpartition(".")
+        step = head.rpartition(".")[2]
+        now = time.perf_counter()
+
+        if state == "started":
+            self._started[step] = now
+            return
+
+        if step == "receive_response_headers":
+            sent = self._started.pop("send_request_headers", None)
+            if sent is not None:
+                self.add("ttfb", now - sent)
+            return
+
+        phase = _TRACED_STEPS.get(step)
+        if phase is None:
+            return
+        started = self._started.pop(step, None)
+        if started is not None:
+            self.add(phase, now - started)
+
+    def record_dns(self, seconds: float, ok: bool) -> None:
+        self.add("dns", seconds)
+        self._dns_failed = self._dns_failed or not ok
+
+    async def _async_trace(self, name: str, info: dict[str, Any]) -> None:
+        self.on_event(name, info)
+
+    @property
+    def async_extensions(self) -> dict[str, Any]:
+        return {"trace": self._async_trace}
+
+    def columns(self) -> dict[str, int | None]:
+        """{"dns_ms": ..., "connect_ms": ..., ...} for CheckResult."""
+        ms = dict(self._ms)
+        if self._dns_failed:
+            # connect_tcp only ran the lookup
+            ms.pop("connect", None)
+        elif "connect" in ms and "dns" in ms:
+            ms["connect"] = max(0.0, ms["connect"] - ms["dns"])
+        return {f"{p}_ms": (round(ms[p]) if p in ms else None) for p in PHASES}
+
+
+def empty_columns() -> dict[str, None]:
+    return {f"{p}_ms": None for p in PHASES}
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+def _report_dns(started: float, ok: bool) -> None:
+    timer = _current.get()
+    if timer is not None:
+        timer.record_dns(time.perf_counter() - started, ok)
+
+
+# ----------------------------
+# Network backends
+# ----------------------------
+class TimedAsyncBackend(httpcore.AsyncNetworkBackend):
+    """
+    httpcore's default backend, but names are resolved through dns_cache
+    first, so lookups are cached and timed, and failures carry the
+    resolver's answer (DNSLookupError). Addresses are tried in order; TLS
+    still verifies and sends SNI for the original hostname.
+    """
+
+    def __init__(self) -> None:
+        self._inner = httpcore.AnyIOBackend()
+
+    async def _resolve(self, host: str, port: int, timeout: float | None) -> list[str]:
+        started = time.perf_counter()
+        try:
+            addresses, looked_up = await dns_cache.resolve_async(host, port, timeout)
+        except DNSError:
+            _report_dns(started, ok=False)
+            raise
+        if looked_up:
+            _report_dns(started, ok=True)
+        return addresses
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options: Iterable | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        if _is_ip(host):
+            return await self._inner.connect_tcp(host, port, timeout, local_address, socket_options)
+
+        last: Exception | None = None
+        for address in await self._resolve(host, port, timeout):
+            try:
+                return await self._inner.connect_tcp(address, port, timeout, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as exc:
+                last = exc
+        raise last or httpcore.ConnectError(f"No addresses for {host}")
+
+    async def connect_unix_socket(self, path: str, timeout: float | None = None, socket_options=None):
+        return await self._inner.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._inner.sleep(seconds)
+
+
+# ----------------------------
+# Transports
+# ----------------------------
+def async_transport(limits: httpx.Limits) -> httpx.AsyncHTTPTransport:
+    transport = httpx.AsyncHTTPTransport(limits=limits)
+    # httpx doesn't take a network backend; its pool hands this to every new connection
+    transport._pool._network_backend = TimedAsyncBackend()
+    return transport
+
@@ -1,132 +1,456 @@
 from __future__ import annotations
 
+import time
+import uuid
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Callable
 
+from sqlalchemy import bindparam, insert, select, true, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
-from app.db.models import CheckResult, Incident
+from app.core.metrics import DB_WRITE_DURATION, RESULTS_WRITTEN
+from app.db.models import CheckResult, Incident, Monitor, MonitorState
+from app.services.alerts import queue_alerts
+from app.services.summary import record_rollups
 
 DOWN_THRESHOLD = 2
 RECOVERY_THRESHOLD = 2
 
+# Writes a batch of results into the caller's transaction (ORM add, multi-row INSERT, COPY...)
+ResultWriter = Callable[[Session, list[CheckResult]], None]
 
-def _now_utc() -> datetime:
-    return datetime.now(timezone.utc)
 
+class StaleMonitorStateError(Exception):
+    """monitor_state changed between read and write (another writer got there first)."""
 
-def get_open_incident(db: Session, monitor_id) -> Optional[Incident]:
-    return (
-        db.query(Incident)
-        .filter(Incident.monitor_id == monitor_id)
-        .filter(Incident.status == "OPEN")
-        .order_by(Incident.started_at.desc())
-        .first()
-    )
+    def __init__(self, monitor_ids: set[uuid.UUID]) -> None:
+        super().__init__(", ".join(str(m) for m in monitor_ids))
+        self.monitor_ids = monitor_ids
 
 
-def count_recent_consecutive(db: Session, monitor_id, success_value: bool, limit: int) -> int:
+@dataclass
+class MonitorStreaks:
     """
-    Count how many most-recent check_results are consecutively success==success_value.
-    Stops early when it hits the opposite value.
+    In-memory mirror of a monitor_state row.
+
+    version=0 means the row doesn't exist yet; every write bumps it by one.
     """
-    rows = (
-        db.query(CheckResult)
-        .filter(CheckResult.monitor_id == monitor_id)
-        .order_by(CheckResult.checked_at.desc())
-        .limit(limit)
-        .all()
-    )
 
+    fail_streak: int = 0
+    success_streak: int = 0
+    open_incident_id: uuid.UUID | None = None
+    version: int = 0
+
+
+def _now_utc() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _leading(values: list[bool], want: bool) -> int:
+    """How many of the newest-first values equal want before the first that doesn't."""
     count = 0
-    for r in rows:
-        if r.success == success_value:
-            count += 1
-        else:
+    for v in values:
+        if v != want:
             break
+        count += 1
     return count
 
 
-def apply_incident_rules(db: Session, result: CheckResult) -> dict:
+# ----------------------------
+# monitor_state persistence
+# ----------------------------
+_state = MonitorState.__table__
+_state_insert = pg_insert(_state)
+
+# executemany-friendly (insertmanyvalues): one multi-row statement per batch
+_UPSERT_STATE = (
+    _state_insert.on_conflict_do_update(
+        index_elements=[_state.c.monitor_id],
+        set_={
+            "fail_streak": _state_insert.excluded.fail_streak,
+            "success_streak": _state_insert.excluded.success_streak,
+            "open_incident_id": _state_insert.excluded.open_incident_id,
+            "version": _state_insert.excluded.version,
+            "updated_at": _state_insert.excluded.updated_at,
+        },
+        where=_state.c.version == _state_insert.excluded.version - 1,
+    ).returning(_state.c.monitor_id)
+)
+
+
+def _bootstrap_states(db: Session, monitor_ids: list[uuid.UUID]) -> dict[uuid.UUID, MonitorStreaks]:
     """
-    Apply incident transitions based on latest stored result.
+    Monitors without a monitor_state row yet (new, or created before it
+    existed) are bootstrapped once from history: the newest few results per
+    monitor and any OPEN incident, two queries for the whole set. Streaks
+    are capped at the thresholds, which is all the rules look at.
+    """
+    depth = max(DOWN_THRESHOLD, RECOVERY_THRESHOLD)
 
-    Return shape (standardized):
-      - transition: "OPENED" | "RESOLVED" | None
-      - incident_id: str | None
-      - event: str (optional legacy label)
+    ids = select(Monitor.id.label("monitor_id")).where(Monitor.id.in_(monitor_ids)).subquery()
+    newest = (
+        select(CheckResult.success, CheckResult.checked_at)
+        .where(CheckResult.monitor_id == ids.c.monitor_id)
+        .order_by(CheckResult.checked_at.desc())
+        .limit(depth)
+        .lateral()
+    )
+    recent: dict[uuid.UUID, list[bool]] = {m: [] for m in monitor_ids}
+    rows = db.execute(
+        select(ids.c.monitor_id, newest.c.success)
+        .join(newest, true())
+        .order_by(ids.c.monitor_id, newest.c.checked_at.desc())
+    )
+    for monitor_id, success in rows:
+        recent[monitor_id].append(success)
+
+    open_incidents = dict(
+        db.execute(
+            select(Incident.monitor_id, Incident.id)
+            .where(Incident.monitor_id.in_(monitor_ids))
+            .where(Incident.status == "OPEN")
+            .order_by(Incident.monitor_id, Incident.started_at.desc())
+            .distinct(Incident.monitor_id)
+        ).all()
+    )
+
+    return {
+        m: MonitorStreaks(
+            fail_streak=_leading(recent[m], False),
+            success_streak=_leading(recent[m], True),
+            open_incident_id=open_incidents.get(m),
+            version=0,
+        )
+        for m in monitor_ids
+    }
+
+
+def load_states(db: Session, monitor_ids, *, for_update: bool = False) -> dict[uuid.UUID, MonitorStreaks]:
     """
-    monitor_id = result.monitor_id
-    open_incident = get_open_incident(db, monitor_id)
+    Read monitor_state for several monitors in one query.
 
-    checked_at = result.checked_at or _now_utc()
+    Rows are locked in monitor_id order when for_update is set, so
+    concurrent batches can't deadlock on each other.
+    """
+    q = (
+        select(MonitorState)
+        .where(MonitorState.monitor_id.in_(list(monitor_ids)))
+        .order_by(MonitorState.monitor_id)
+    )
+    if for_update:
+        q = q.with_for_update()
 
-    # If no open incident, check if we should OPEN one
-    if open_incident is None:
-        consecutive_failures = count_recent_consecutive(
-            db, monitor_id, success_value=False, limit=DOWN_THRESHOLD
+    states = {
+        row.monitor_id: MonitorStreaks(
+            fail_streak=row.fail_streak,
+            success_streak=row.success_streak,
+            open_incident_id=row.open_incident_id,
+            version=row.version,
         )
+        for row in db.execute(q).scalars()
+    }
 
-        if consecutive_failures >= DOWN_THRESHOLD:
-            inc = Incident(
-                monitor_id=monitor_id,
-                status="OPEN",
-                started_at=checked_at,
-                last_failure_at=checked_at,
-                resolved_at=None,
-                failure_count=consecutive_failures,
-                last_error_type=result.error_type,
-                last_error_message=result.error_message,
-            )
-            db.add(inc)
-            db.commit()
-            db.refresh(inc)
-            return {
-                "transition": "OPENED",
-                "incident_id": str(inc.id),
-                "event": "INCIDENT_OPENED",
-            }
+    missing = [m for m in monitor_ids if m not in states]
+    if missing:
+        states.update(_bootstrap_states(db, missing))
+    return states
 
-        return {
-            "transition": None,
-            "incident_id": None,
-            "event": "NO_CHANGE",
+
+def _save_states(
+    db: Session,
+    final: dict[uuid.UUID, MonitorStreaks],
+    base: dict[uuid.UUID, MonitorStreaks],
+) -> set[uuid.UUID]:
+    """
+    Upsert final states in one statement, each guarded by the version it
+    was computed from: a row is only written if its version is still
+    base.version (final.version is always base.version + 1).
+
+    Returns the monitor_ids whose row had moved on (nothing written for those).
+    """
+    now = _now_utc()
+    rows = [
+        {
+            "monitor_id": monitor_id,
+            "fail_streak": state.fail_streak,
+            "success_streak": state.success_streak,
+            "open_incident_id": state.open_incident_id,
+            "version": state.version,
+            "updated_at": now,
         }
+        for monitor_id, state in final.items()
+    ]
+
+    # Rows failing the WHERE are neither updated nor returned
+    written = set(db.execute(_UPSERT_STATE, rows).scalars())
+    return set(final) - written
+
+
+# ----------------------------
+# State machine
+# ----------------------------
+_incidents = Incident.__table__
+
+_MARK_FAILURE = (
+    update(_incidents)
+    .where(_incidents.c.id == bindparam("b_incident_id"))
+    .values(
+        last_failure_at=bindparam("b_at"),
+        failure_count=_incidents.c.failure_count + 1,
+        last_error_type=bindparam("b_error_type"),
+        last_error_message=bindparam("b_error_message"),
+    )
+)
+
+_MARK_RESOLVED = (
+    update(_incidents)
+    .where(_incidents.c.id == bindparam("b_incident_id"))
+    .values(status="RESOLVED", resolved_at=bindparam("b_at"))
+)
+
+
+def _event(transition: str | None, incident_id) -> dict:
+    labels = {"OPENED": "INCIDENT_OPENED", "RESOLVED": "INCIDENT_RESOLVED"}
+    return {
+        "transition": transition,
+        "incident_id": str(incident_id) if incident_id else None,
+        "event": labels.get(transition, "NO_CHANGE"),
+    }
+
+
+def _evaluate(state: MonitorStreaks, result: CheckResult) -> tuple[MonitorStreaks, dict, tuple[str, dict] | None]:
+    """
+    Same OPEN/RESOLVED rules as before, driven by streak counters:
+    - no open incident: OPEN after DOWN_THRESHOLD consecutive failures
+    - open incident + success: RESOLVE after RECOVERY_THRESHOLD consecutive successes
+    - open incident + failure: bump failure_count / last_* fields
+
+    Pure: returns the next state, the event, and the incident write to make
+    ("open" | "fail" | "resolve", params) if any.
+    """
+    monitor_id = result.monitor_id
+    checked_at = result.checked_at or _now_utc()
 
-    # If there IS an open incident, update + possibly resolve
     if result.success:
-        consecutive_success = count_recent_consecutive(
-            db, monitor_id, success_value=True, limit=RECOVERY_THRESHOLD
-        )
+        new = MonitorStreaks(0, state.success_streak + 1, state.open_incident_id, state.version)
+    else:
+        new = MonitorStreaks(state.fail_streak + 1, 0, state.open_incident_id, state.version)
 
-        if consecutive_success >= RECOVERY_THRESHOLD:
-            open_incident.status = "RESOLVED"
-            open_incident.resolved_at = checked_at
-            db.add(open_incident)
-            db.commit()
-            db.refresh(open_incident)
-            return {
-                "transition": "RESOLVED",
-                "incident_id": str(open_incident.id),
-                "event": "INCIDENT_RESOLVED",
+    # If no open incident, check if we should OPEN one
+    if state.open_incident_id is None:
+        if new.fail_streak >= DOWN_THRESHOLD:
+            incident_id = uuid.uuid4()
+            new.open_incident_id = incident_id
+            row = {
+                "id": incident_id,
+                "monitor_id": monitor_id,
+                "status": "OPEN",
+                "started_at": checked_at,
+                "last_failure_at": checked_at,
+                "resolved_at": None,
+                "failure_count": min(new.fail_streak, DOWN_THRESHOLD),
+                "last_error_type": result.error_type,
+                "last_error_message": result.error_message,
             }
+            return new, _event("OPENED", incident_id), ("open", row)
 
-        return {
-            "transition": None,
-            "incident_id": str(open_incident.id),
-            "event": "NO_CHANGE",
-        }
+        return new, _event(None, None), None
+
+    # If there IS an open incident, update + possibly resolve
+    if result.success:
+        if new.success_streak >= RECOVERY_THRESHOLD:
+            new.open_incident_id = None
+            params = {"b_incident_id": state.open_incident_id, "b_at": checked_at}
+            return new, _event("RESOLVED", state.open_incident_id), ("resolve", params)
+
+        return new, _event(None, state.open_incident_id), None
 
     # Latest result is a failure and incident already open
-    open_incident.last_failure_at = checked_at
-    open_incident.failure_count = (open_incident.failure_count or 0) + 1
-    open_incident.last_error_type = result.error_type
-    open_incident.last_error_message = result.error_message
-    db.add(open_incident)
+    params = {
+        "b_incident_id": state.open_incident_id,
+        "b_at": checked_at,
+        "b_error_type": result.error_type,
+        "b_error_message": result.error_message,
+    }
+    return new, _event(None, state.open_incident_id), ("fail", params)
+
+
+def _apply_changes(db: Session, changes: list[tuple[str, dict]]) -> None:
+    """
+    One executemany per kind. Opens go first: a later failure/resolve in the
+    same batch may target an incident opened earlier in it.
+    """
+    opens = [params for kind, params in changes if kind == "open"]
+    fails = [params for kind, params in changes if kind == "fail"]
+    resolves = [params for kind, params in changes if kind == "resolve"]
+
+    if opens:
+        db.execute(insert(_incidents), opens)
+    if fails:
+        db.execute(_MARK_FAILURE, fails)
+    if resolves:
+        db.execute(_MARK_RESOLVED, resolves)
+
+
+def _assign_defaults(results: list[CheckResult]) -> None:
+    # Python-side defaults aren't applied by COPY (or before an ORM flush);
+    # set them up front so rollups and alerts see the final values.
+    for r in results:
+        if r.id is None:
+            r.id = uuid.uuid4()
+        if r.checked_at is None:
+            r.checked_at = _now_utc()
+
+
+def _write_batch(
+    db: Session,
+    results: list[CheckResult],
+    base: dict[uuid.UUID, MonitorStreaks],
+    write_results: ResultWriter,
+) -> tuple[dict[uuid.UUID, MonitorStreaks], list[dict]]:
+    """
+    Results, their rollups, incident changes, queued alerts and monitor_state
+    in one transaction.
+
+    base must hold the starting state of every monitor in results; results
+    for the same monitor are applied in list order. Returns the final
+    states and one event per result. Raises StaleMonitorStateError (nothing
+    committed) if any base state was outdated.
+    """
+    final = dict(base)
+    events: list[dict] = []
+    changes: list[tuple[str, dict]] = []
+
+    for result in results:
+        new, event, change = _evaluate(final[result.monitor_id], result)
+        final[result.monitor_id] = new
+        events.append(event)
+        if change is not None:
+            changes.append(change)
+
+    touched = {r.monitor_id for r in results}
+    for monitor_id in touched:
+        final[monitor_id].version = base[monitor_id].version + 1
+
+    _assign_defaults(results)
+    t0 = time.perf_counter()
+    write_results(db, results)
+    record_rollups(db, results)
+    t1 = time.perf_counter()
+    _apply_changes(db, changes)
+    queue_alerts(db, results, events)
+
+    stale = _save_states(db, {m: final[m] for m in touched}, base)
+    if stale:
+        raise StaleMonitorStateError(stale)
+    t2 = time.perf_counter()
+
     db.commit()
-    db.refresh(open_incident)
-    return {
-        "transition": None,
-        "incident_id": str(open_incident.id),
-        "event": "NO_CHANGE",
-    }
\ No newline at end of file
+    DB_WRITE_DURATION.labels("results").observe(t1 - t0)
+    DB_WRITE_DURATION.labels("incidents").observe(t2 - t1)
+    DB_WRITE_DURATION.labels("commit").observe(time.perf_counter() - t2)
+    RESULTS_WRITTEN.inc(len(results))
+    return final, events
+
+
+def add_results(db: Session, results: list[CheckResult]) -> None:
+    """ResultWriter for the ORM path: results stay attached and refreshable."""
+    db.add_all(results)
+
+
+def _apply_locked(db: Session, result: CheckResult) -> dict:
+    base = load_states(db, [result.monitor_id], for_update=True)
+    _, events = _write_batch(db, [result], base, add_results)
+    return events[0]
+
+
+def apply_incident_rules(db: Session, result: CheckResult) -> dict:
+    """
+    Store a result and apply incident transitions in one transaction.
+
+    State is read under a row lock, so concurrent writers for the same
+    monitor serialize instead of losing a streak update.
+
+    Return shape (standardized):
+      - transition: "OPENED" | "RESOLVED" | None
+      - incident_id: str | None
+      - event: str (optional legacy label)
+    """
+    try:
+        return _apply_locked(db, result)
+    except StaleMonitorStateError:
+        # Lost the race to create the monitor_state row; it exists now
+        db.rollback()
+        return _apply_locked(db, result)
+
+
+class IncidentTracker:
+    """
+    Incident evaluation for the worker's batched writes.
+
+    Evaluation is O(1): no history or open-incident queries. Results,
+    incident changes and a version-checked monitor_state update go out in
+    one transaction.
+
+    - streaks are kept in memory between batches (cache=True, the worker):
+      a batch of monitors this tracker has written before needs no
+      monitor_state read at all
+    - monitors it hasn't seen yet are read in one locked query per batch
+    - a cached state is only trusted until its write: if something else
+      (check-now, another worker that claimed the monitor) wrote the row in
+      between, the version check fails, those entries are dropped and the
+      batch is redone once from the locked rows
+    - cache=False (check-now, where most of a monitor's results come from
+      the worker) always reads the rows
+    """
+
+    def __init__(self, cache: bool = True) -> None:
+        self._cache = cache
+        self._states: dict[uuid.UUID, MonitorStreaks] = {}
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def forget(self, monitor_id: uuid.UUID) -> None:
+        self._states.pop(monitor_id, None)
+
+    def _record_once(self, db: Session, results: list[CheckResult], write_results: ResultWriter) -> list[dict]:
+        monitor_ids = {r.monitor_id for r in results}
+        base = {m: self._states[m] for m in monitor_ids if m in self._states}
+        try:
+            missing = monitor_ids - base.keys()
+            if missing:
+                base.update(load_states(db, missing, for_update=True))
+            final, events = _write_batch(db, results, base, write_results)
+        except StaleMonitorStateError as exc:
+            db.rollback()
+            for monitor_id in exc.monitor_ids:
+                self.forget(monitor_id)
+            raise
+        except Exception:
+            db.rollback()
+            # The commit itself may have failed half-way; reload next time
+            for monitor_id in monitor_ids:
+                self.forget(monitor_id)
+            raise
+
+        if self._cache:
+            for monitor_id in monitor_ids:
+                self._states[monitor_id] = final[monitor_id]
+        return events
+
+    def record_batch(self, db: Session, results: list[CheckResult], write_results: ResultWriter) -> list[dict]:
+        """
+        Write a batch and return one incident event per result, in order.
+        """
+        try:
+            return self._record_once(db, results, write_results)
+        except StaleMonitorStateError:
+            # A cached state was outdated, or we lost the race to create a
+            # monitor_state row; either way the row is read (locked) now
+            return self._record_once(db, results, write_results)
+
+    def record(self, db: Session, result: CheckResult) -> dict:
+        return self.record_batch(db, [result], add_results)[0]
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import logging
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, func, insert, or_, select, tuple_, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db.models import Monitor
+from app.schemas.monitor import (
+    BulkCreate,
+    BulkDeactivate,
+    BulkItemResult,
+    BulkUpdate,
+    BulkUpsert,
+    MonitorCreate,
+    bulk_operation_adapter,
+)
+from app.services.monitor_cache import notify_changed
+from app.services.schedule_phase import PhasePlanner
+
+logger = logging.getLogger(__name__)
+
+_table = Monitor.__table__
+
+# Settable through the API, in MonitorCreate order
+_FIELDS = list(MonitorCreate.model_fields)
+
+# Serializes upsert batches: (name, url) isn't unique in the schema, so two
+# sync jobs pushing the same inventory at once could both create a monitor
+_UPSERT_LOCK = 0x5348_4950  # "SHIP"
+
+_UPDATE = (
+    update(_table)
+    .where(_table.c.id == bindparam("b_id"))
+    .values(
+        {name: bindparam(f"b_{name}", type_=_table.c[name].type) for name in _FIELDS + ["next_run_at", "updated_at"]}
+    )
+)
+
+
+def _error(index: int, op: str | None, message: str) -> BulkItemResult:
+    return BulkItemResult(index=index, op=op, status="error", error=message)
+
+
+def _validation_message(exc: ValidationError) -> str:
+    err = exc.errors()[0]
+    where = ".".join(str(p) for p in err["loc"])
+    return f"{where}: {err['msg']}" if where else err["msg"]
+
+
+def _fields(op) -> dict[str, Any]:
+    if isinstance(op, BulkUpdate):
+        values = op.model_dump(exclude_unset=True, exclude={"op", "id"})
+        # Only headers_json can be cleared; null elsewhere means "leave as is"
+        values = {k: v for k, v in values.items() if v is not None or k == "headers_json"}
+    else:
+        values = op.model_dump(exclude={"op"})
+    if values.get("url") is not None:
+        values["url"] = str(values["url"])
+    return values
+
+
+class _Batch:
+    """
+    One batch's monitors, loaded once and changed in memory in request
+    order, so later items see earlier ones (an upsert after a create of the
+    same name and url updates it instead of creating a second one).
+    New and re-timed monitors are phased by one PhasePlanner for the batch.
+    """
+
+    def __init__(self, now: datetime) -> None:
+        self.now = now
+        self.planner = PhasePlanner()
+        self.rows: dict[uuid.UUID, dict[str, Any]] = {}
+        self.by_key: dict[tuple[str, str], list[uuid.UUID]] = {}
+        self.created: list[uuid.UUID] = []
+        self.dirty: set[uuid.UUID] = set()
+
+    def load(self, db: Session, ids: set[uuid.UUID], keys: set[tuple[str, str]]) -> None:
+        conditions = []
+        if ids:
+            conditions.append(_table.c.id.in_(ids))
+        if keys:
+            db.execute(select(func.pg_advisory_xact_lock(_UPSERT_LOCK)))
+            conditions.append(tuple_(_table.c.name, _table.c.url).in_(keys))
+        self.planner = PhasePlanner.load(db)
+        if not conditions:
+            return
+
+        q = (
+            select(_table.c.id, _table.c.next_run_at, *(_table.c[name] for name in _FIELDS))
+            .where(or_(*conditions))
+            .with_for_update()
+        )
+        for row in db.execute(q).mappings():
+            self._add(dict(row))
+
+    def _add(self, row: dict[str, Any]) -> None:
+        self.rows[row["id"]] = row
+        self.by_key.setdefault((row["name"], row["url"]), []).append(row["id"])
+
+    def create(self, values: dict[str, Any]) -> uuid.UUID:
+        monitor_id = uuid.uuid4()
+        row = {
+            **values,
+            "id": monitor_id,
+            "next_run_at": self.planner.assign(monitor_id, values["interval_sec"], self.now),
+            "created_at": self.now,
+            "updated_at": self.now,
+        }
+        self._add(row)
+        self.created.append(row["id"])
+        return row["id"]
+
+    def change(self, monitor_id: uuid.UUID, values: dict[str, Any]) -> bool:
+        """Apply values to a loaded or created row; False if nothing changed."""
+        row = self.rows[monitor_id]
+        changed = {k: v for k, v in values.items() if row[k] != v}
+        if not changed:
+            return False
+
+        if "interval_sec" in changed:
+            self.planner.release(row["interval_sec"], row["next_run_at"])
+            row["next_run_at"] = self.planner.assign(monitor_id, changed["interval_sec"], self.now)
+        if "name" in changed or "url" in changed:
+            self.by_key[(row["name"], row["url"])].remove(monitor_id)
+            self.by_key.setdefault((changed.get("name", row["name"]), changed.get("url", row["url"])), []).append(
+                monitor_id
+            )
+
+        row.update(changed)
+        row["updated_at"] = self.now
+        self.dirty.add(monitor_id)
+        return True
+
+    def write(self, db: Session) -> None:
+        if self.created:
+            db.execute(insert(_table), [self.rows[i] for i in self.created])
+
+        # Rows created in this batch went out with their final values already
+        created = set(self.created)
+        updated = [self.rows[i] for i in self.dirty if i not in created]
+        if updated:
+            params = [
+                {"b_id": row["id"], **{f"b_{k}": row[k] for k in _FIELDS + ["next_run_at", "updated_at"]}}
+                for row in updated
+            ]
+            db.execute(_UPDATE, params)
+
+        if self.created or self.dirty:
+            # One notification for the batch: every cache drops everything
+            notify_changed(db, None)
+
+
+def _apply(batch: _Batch, index: int, op) -> BulkItemResult:
+    if isinstance(op, BulkCreate):
+        return BulkItemResult(index=index, op=op.op, status="created", id=batch.create(_fields(op)))
+
+    if isinstance(op, BulkUpsert):
+        values = _fields(op)
+        matches = batch.by_key.get((values["name"], values["url"]), [])
+        if len(matches) > 1:
+            return _error(index, op.op, f"{len(matches)} monitors have this name and url")
+        if not matches:
+            return BulkItemResult(index=index, op=op.op, status="created", id=batch.create(values))
+        status = "updated" if batch.change(matches[0], values) else "unchanged"
+        return BulkItemResult(index=index, op=op.op, status=status, id=matches[0])
+
+    if op.id not in batch.rows:
+        return BulkItemResult(index=index, op=op.op, status="not_found", id=op.id)
+
+    if isinstance(op, BulkDeactivate):
+        status = "deactivated" if batch.change(op.id, {"is_active": False}) else "unchanged"
+        return BulkItemResult(index=index, op=op.op, status=status, id=op.id)
+
+    status = "updated" if batch.change(op.id, _fields(op)) else "unchanged"
+    return BulkItemResult(index=index, op=op.op, status=status, id=op.id)
+
+
+def apply_batch(db: Session, items: list[tuple[int, Any]]) -> list[BulkItemResult]:
+    """
+    Validate and apply one batch of bulk operations in one transaction.
+
+    - items are (index, decoded JSON) pairs; a ValueError instead of JSON
+      marks a line that didn't parse
+    - invalid items get an error result and don't affect the rest
+    - every monitor the batch touches is read in one locked query; then
+      one multi-row INSERT for creates and one executemany UPDATE for
+      changes, whatever the batch size
+    - a database error fails (and rolls back) the whole batch
+    """
+    results: dict[int, BulkItemResult] = {}
+    ops = []
+    for index, raw in items:
+        op_name = raw.get("op") if isinstance(raw, dict) else None
+        if isinstance(raw, ValueError):
+            results[index] = _error(index, None, f"Invalid JSON: {raw}")
+            continue
+        try:
+            ops.append((index, bulk_operation_adapter.validate_python(raw)))
+        except ValidationError as exc:
+            results[index] = _error(index, op_name, _validation_message(exc))
+
+    if ops:
+        batch = _Batch(datetime.now(timezone.utc))
+        try:
+            batch.load(
+                db,
+                ids={op.id for _, op in ops if isinstance(op, (BulkUpdate, BulkDeactivate))},
+                keys={(op.name, str(op.url)) for _, op in ops if isinstance(op, BulkUpsert)},
+            )
+            for index, op in ops:
+                results[index] = _apply(batch, index, op)
+            batch.write(db)
+            db.commit()
+        except SQLAlchemyError as exc:
+            db.rollback()
+            logger.exception("Bulk monitor batch failed")
+            message = f"Batch failed: {exc.__class__.__name__}"
+            for index, op in ops:
+                results[index] = _error(index, op.op, message)
+
+    return [results[index] for index, _ in items]
+
+
+def count_statuses(results: list[BulkItemResult]) -> dict[str, int]:
+    return dict(Counter(r.status for r in results))
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Any, Callable
+
+import psycopg
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Monitor
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY channel; the payload is the monitor id, or "*" for many at once
+CHANNEL = "monitor_changed"
+
+
+@dataclass(frozen=True, slots=True)
+class MonitorConfig:
+    """Read-only copy of a monitor's settings; enough for check-now and the API's existence checks."""
+
+    id: uuid.UUID
+    name: str
+    url: str
+    method: str
+    expected_status: int
+    interval_sec: int
+    timeout_ms: int
+    max_attempts: int
+    retry_backoff_ms: int
+    is_active: bool
+    headers_json: dict[str, Any] | None
+    updated_at: datetime
+
+    @classmethod
+    def from_monitor(cls, monitor: Monitor) -> MonitorConfig:
+        return cls(**{f.name: getattr(monitor, f.name) for f in fields(cls)})
+
+
+def notify_changed(db: Session, monitor_id: uuid.UUID | None) -> None:
+    """
+    Queue a change notification in db's transaction. Postgres delivers it
+    on commit (and drops it on rollback), so listeners never see a change
+    before it's readable. None ("*") means any monitor may have changed.
+    """
+    db.execute(select(func.pg_notify(CHANNEL, str(monitor_id) if monitor_id is not None else "*")))
+
+
+class MonitorCache:
+    """
+    Per-process LRU of MonitorConfig by id, kept fresh by LISTEN/NOTIFY.
+
+    - crud writes send NOTIFY monitor_changed (notify_changed); a listener
+      thread on its own connection drops the entry as soon as it arrives
+    - entries also expire after ttl_sec, a backstop for anything that
+      changes monitors without notifying (manual SQL)
+    - until start() has connected the listener, and whenever it's
+      reconnecting, get() reads through to the DB: without notifications a
+      cached row could be stale for the whole TTL
+    - on (re)connect the cache is emptied, notifications may have been missed
+    - a fill that raced an invalidation isn't stored (generation counter),
+      so a row read just before a change can't outlive it
+    - on_change() callbacks run in the listener thread for every
+      notification (the worker uses it to wake the scheduler)
+    """
+
+    def __init__(self, max_size: int | None = None, ttl_sec: float | None = None) -> None:
+        self._max_size = max_size or settings.monitor_cache_size
+        self._ttl_sec = ttl_sec or settings.monitor_cache_ttl_sec
+        self._entries: OrderedDict[uuid.UUID, tuple[float, MonitorConfig]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+        self._callbacks: list[Callable[[uuid.UUID | None], None]] = []
+        self._listening = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # ----------------------------
+    # Lookups
+    # ----------------------------
+    def _cached(self, monitor_id: uuid.UUID) -> tuple[MonitorConfig | None, int]:
+        """(entry or None, generation to fill it at)."""
+        with self._lock:
+            entry = self._entries.get(monitor_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(monitor_id)
+                return entry[1], self._generation
+            return None, self._generation
+
+    def _fill(self, monitor_id: uuid.UUID, monitor: Monitor | None, generation: int) -> MonitorConfig | None:
+        if monitor is None:
+            return None
+        config = MonitorConfig.from_monitor(monitor)
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[monitor_id] = (time.monotonic() + self._ttl_sec, config)
+                self._entries.move_to_end(monitor_id)
+                while len(self._entries) > self._max_size:
+                    self._entries.popitem(last=False)
+        return config
+
+    def get(self, db: Session, monitor_id: uuid.UUID) -> MonitorConfig | None:
+        if not self._listening.is_set():
+            monitor = db.get(Monitor, monitor_id)
+            return MonitorConfig.from_monitor(monitor) if monitor is not None else None
+
+        config, generation = self._cached(monitor_id)
+        if config is not None:
+            return config
+        return self._fill(monitor_id, db.get(Monitor, monitor_id), generation)
+
+    async def get_async(self, db: AsyncSession, monitor_id: uuid.UUID) -> MonitorConfig | None:
+        """get() for the async read routes; a miss awaits the row instead of blocking."""
+        if not self._listening.is_set():
+            monitor = await db.get(Monitor, monitor_id)
+            return MonitorConfig.from_monitor(monitor) if monitor is not None else None
+
+        config, generation = self._cached(monitor_id)
+        if config is not None:
+            return config
+        return self._fill(monitor_id, await db.get(Monitor, monitor_id), generation)
+
+    def invalidate(self, monitor_id: uuid.UUID | None = None) -> None:
+        """Drop one entry, or everything with None."""
+        with self._lock:
+            self._generation += 1
+            if monitor_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(monitor_id, None)
+
+    def on_change(self, callback: Callable[[uuid.UUID | None], None]) -> None:
+        """callback(monitor_id) on every notification; None after a reconnect (anything may have changed)."""
+        self._callbacks.append(callback)
+
+    def _changed(self, monitor_id: uuid.UUID | None) -> None:
+        self.invalidate(monitor_id)
+        for callback in self._callbacks:
+            try:
+                callback(monitor_id)
+            except Exception:
+                logger.exception("Monitor change callback failed")
+
+    # ----------------------------
+    # Listener
+    # ----------------------------
+    def _listen_once(self) -> None:
+        conninfo = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        with psycopg.connect(conninfo, autocommit=True) as conn:
+            conn.execute(f"LISTEN {CHANNEL}")
+            # Anything cached so far was filled without notifications
+            self._changed(None)
+            self._listening.set()
+            logger.info("Monitor cache listening on %s", CHANNEL)
+
+            while not self._stopping.is_set():
+                for notify in conn.notifies(timeout=1.0):
+                    try:
+                        monitor_id = uuid.UUID(notify.payload)
+                    except ValueError:
+                        monitor_id = None
+                    self._changed(monitor_id)
+
+    def _listen(self) -> None:
+        delay = 0.5
+        while not self._stopping.is_set():
+            try:
+                self._listen_once()
+            except Exception as exc:
+                # A quick reconnect after a long healthy run, backoff while the DB stays away
+                delay = 1.0 if self._listening.is_set() else min(delay * 2, 30.0)
+                self._listening.clear()
+                if not self._stopping.is_set():
+                    logger.warning("Monitor cache listener disconnected (%s); retrying in %.0fs", exc, delay)
+            self._listening.clear()
+            if self._stopping.wait(delay):
+                break
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._listen, name="monitor-cache-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        self.invalidate()
+
+
+monitor_cache = MonitorCache()
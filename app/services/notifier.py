@@ -14,6 +14,13 @@ def _env_bool(name: str, default: bool = False) -> bool:
     return val in {"1", "true", "yes", "y", "on"}
 
 
+def slack_webhook_url() -> str | None:
+    """The webhook to post alerts to, or None if Slack alerts are off or unconfigured."""
+    if not _env_bool("SLACK_ALERTS_ENABLED", False):
+        return None
+    return os.getenv("SLACK_WEBHOOK_URL", "").strip() or None
+
+
 def send_slack(
     text: str,
     *,
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import hashlib
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+
+# Revalidate on every use: a 304 is cheap, and the version moves with each check
+CACHE_CONTROL = "no-cache"
+
+
+# ----------------------------
+# ETags
+# ----------------------------
+def version_etag(monitor_id: uuid.UUID, version: int) -> str:
+    """ETag for a response that only changes when the monitor's results version does."""
+    return f'W/"{monitor_id.hex}-{version}"'
+
+
+def content_etag(body: bytes) -> str:
+    return f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """If-None-Match lists etag (weak comparison, as RFC 9110 asks for GET) or is *."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+# ----------------------------
+# Rendered summaries
+# ----------------------------
+@dataclass(frozen=True, slots=True)
+class CachedSummary:
+    version: int
+    expires_at: float
+    body: bytes  # rendered JSON, served as-is
+    etag: str
+
+
+class SummaryCache:
+    """
+    Per-process LRU of rendered per-monitor summaries by (monitor_id, window).
+
+    - an entry is used only while its results version is still current (a
+      new result for the monitor misses) and for at most ttl_sec (the window
+      keeps sliding even when no results land, and rollups get rebuilt)
+    - size-bounded: least recently used entries go first; max_size 0 turns
+      the cache off
+    - the ETag is a hash of the body, so a re-render that came out the same
+      still answers If-None-Match with a 304
+    - only used from the event loop, so no lock
+    """
+
+    def __init__(self, max_size: int | None = None, ttl_sec: float | None = None) -> None:
+        self._max_size = settings.summary_cache_size if max_size is None else max_size
+        self._ttl_sec = settings.summary_cache_ttl_sec if ttl_sec is None else ttl_sec
+        self._entries: OrderedDict[tuple[uuid.UUID, str], CachedSummary] = OrderedDict()
+
+    def get(self, monitor_id: uuid.UUID, window: str, version: int) -> CachedSummary | None:
+        key = (monitor_id, window)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.version != version or entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, monitor_id: uuid.UUID, window: str, version: int, summary: dict) -> CachedSummary:
+        body = JSONResponse(summary).body
+        entry = CachedSummary(version, time.monotonic() + self._ttl_sec, body, content_etag(body))
+        if self._max_size > 0:
+            key = (monitor_id, window)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+summary_cache = SummaryCache()
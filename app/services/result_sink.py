@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from sqlalchemy import insert
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import CheckResult, Monitor
+from app.db.session import SessionLocal
+from app.services.incident import IncidentTracker, ResultWriter
+
+logger = logging.getLogger(__name__)
+
+SINK_INSERT = "insert"
+SINK_COPY = "copy"
+
+_table = CheckResult.__table__
+_columns = [c.name for c in _table.columns]
+
+
+def insert_results(db: Session, results: list[CheckResult]) -> None:
+    """Multi-row INSERT (SQLAlchemy batches executemany into VALUES pages)."""
+    db.execute(insert(_table), [{c: getattr(r, c) for c in _columns} for r in results])
+
+
+def copy_results(db: Session, results: list[CheckResult]) -> None:
+    """COPY FROM STDIN on the session's own connection (same transaction)."""
+    raw = db.connection().connection.driver_connection
+    with raw.cursor() as cur:
+        with cur.copy(f"COPY {_table.name} ({', '.join(_columns)}) FROM STDIN") as copy:
+            for r in results:
+                copy.write_row([getattr(r, c) for c in _columns])
+
+
+_WRITERS: dict[str, ResultWriter] = {
+    SINK_INSERT: insert_results,
+    SINK_COPY: copy_results,
+}
+
+
+class ResultSink:
+    """
+    Buffers CheckResults from the worker and writes them in batches.
+
+    - a batch is flushed when it reaches max_batch rows or flush_interval_sec
+      after its first row, whichever comes first
+    - each batch is one transaction: results (multi-row INSERT or COPY),
+      incident changes, queued alerts and monitor_state, via IncidentTracker
+    - incident streaks stay in memory between batches, so monitor_state
+      is only read for monitors the sink hasn't written yet
+    - submit() blocks once max_pending results are waiting (DB is behind)
+    - connection errors retry the batch with backoff; any other error falls
+      back to row-by-row writes so one bad row doesn't sink the rest
+
+    check-now doesn't go through here: BatchChecker writes its results
+    itself, right away, with its own IncidentTracker.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_batch: int | None = None,
+        flush_interval_sec: float | None = None,
+        max_pending: int | None = None,
+        method: str | None = None,
+    ) -> None:
+        method = (method or settings.result_sink_method).strip().lower()
+        if method not in _WRITERS:
+            raise ValueError("method must be insert or copy")
+
+        self._write_results = _WRITERS[method]
+        self._max_batch = max_batch or settings.result_sink_max_batch
+        self._flush_interval_sec = flush_interval_sec or settings.result_sink_flush_interval_sec
+        self._queue: asyncio.Queue[tuple[Monitor, CheckResult] | None] = asyncio.Queue(
+            max_pending or settings.result_sink_max_pending
+        )
+        self._incidents = IncidentTracker()
+        self._runner: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    async def submit(self, monitor: Monitor, result: CheckResult) -> None:
+        await self._queue.put((monitor, result))
+
+    # ----------------------------
+    # Flusher
+    # ----------------------------
+    async def _next_batch(self, first: tuple[Monitor, CheckResult]) -> tuple[list, bool]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._flush_interval_sec
+        batch = [first]
+
+        while len(batch) < self._max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+            if item is None:
+                return batch, True  # closing: write what we have and stop
+            batch.append(item)
+
+        return batch, False
+
+    async def _run(self) -> None:
+        while True:
+            first = await self._queue.get()
+            if first is None:
+                return
+            batch, closing = await self._next_batch(first)
+            await self._write_with_retry(batch)
+            if closing:
+                return
+
+    def start(self) -> None:
+        self._runner = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Flush everything submitted so far and stop."""
+        if self._runner is None:
+            return
+        await self._queue.put(None)
+        await self._runner
+        self._runner = None
+
+    # ----------------------------
+    # Writes (run in a thread)
+    # ----------------------------
+    def _write_rows_one_by_one(self, results: list[CheckResult]) -> None:
+        for result in results:
+            db = SessionLocal(expire_on_commit=False)
+            try:
+                self._incidents.record_batch(db, [result], self._write_results)
+            except Exception:
+                logger.exception("Dropping check result: monitor_id=%s", result.monitor_id)
+            finally:
+                db.close()
+
+    def _write_blocking(self, batch: list[tuple[Monitor, CheckResult]]) -> None:
+        results = [result for _, result in batch]
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            self._incidents.record_batch(db, results, self._write_results)
+        except (OperationalError, InterfaceError):
+            raise
+        except Exception:
+            logger.exception("Batch write failed, retrying %d results one by one", len(batch))
+            self._write_rows_one_by_one(results)
+        finally:
+            db.close()
+
+    async def _write_with_retry(self, batch: list[tuple[Monitor, CheckResult]]) -> None:
+        delay = 1.0
+        for attempt in range(settings.result_sink_max_retries + 1):
+            try:
+                await asyncio.to_thread(self._write_blocking, batch)
+                return
+            except (OperationalError, InterfaceError):
+                if attempt == settings.result_sink_max_retries:
+                    break
+                logger.warning("DB unavailable, retrying batch of %d in %.0fs", len(batch), delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+        logger.error("Dropping batch of %d check results after %d retries", len(batch), attempt)
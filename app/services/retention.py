@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.db import partitions
+from app.db.models import AlertOutbox, CheckRollupHour, CheckRollupMinute
+from app.db.session import SessionLocal, engine
+from app.services.alerts import STATUS_PENDING
+
+logger = logging.getLogger(__name__)
+
+
+def _expire_partitions(now: datetime) -> list[str]:
+    """
+    Drop every check_results partition that ends before the retention
+    cutoff, one at a time. Nothing to fold in first: every result went into
+    the rollups in the transaction that wrote it (services/incident.py), so
+    summaries keep covering the dropped history.
+    """
+    cutoff = now - timedelta(days=settings.results_retention_days)
+    with engine.begin() as conn:
+        expired = [p for p in partitions.list_partitions(conn) if p.end is not None and p.end <= cutoff]
+
+    dropped = []
+    for partition in expired:
+        try:
+            with engine.begin() as conn:
+                partitions.lock(conn)
+                partitions.drop_partition(conn, partition.name)
+        except OperationalError:
+            logger.warning("Could not lock %s to drop it, retrying next run", partition.name)
+            continue
+        dropped.append(partition.name)
+        logger.info("Dropped expired partition %s", partition.name)
+
+    # Rows that fell into the DEFAULT partition were rolled up when written
+    with engine.begin() as conn:
+        res = conn.execute(
+            text(f"DELETE FROM {partitions.DEFAULT_PARTITION} WHERE checked_at < :cutoff"), {"cutoff": cutoff}
+        )
+    if res.rowcount:
+        logger.info("Deleted %d expired results from %s", res.rowcount, partitions.DEFAULT_PARTITION)
+
+    return dropped
+
+
+def _trim_rollups(now: datetime) -> dict[str, int]:
+    trimmed = {}
+    db = SessionLocal()
+    try:
+        for model, days in (
+            (CheckRollupMinute, settings.rollup_minute_retention_days),
+            (CheckRollupHour, settings.rollup_hour_retention_days),
+        ):
+            if days > 0:
+                res = db.execute(delete(model).where(model.bucket < now - timedelta(days=days)))
+                trimmed[model.__tablename__] = res.rowcount
+        db.commit()
+    finally:
+        db.close()
+    return trimmed
+
+
+def _trim_outbox(now: datetime) -> int:
+    if settings.alert_outbox_retention_days <= 0:
+        return 0
+    db = SessionLocal()
+    try:
+        res = db.execute(
+            delete(AlertOutbox)
+            .where(AlertOutbox.status != STATUS_PENDING)
+            .where(AlertOutbox.created_at < now - timedelta(days=settings.alert_outbox_retention_days))
+        )
+        db.commit()
+        return res.rowcount
+    finally:
+        db.close()
+
+
+def run_maintenance(now: datetime | None = None) -> dict:
+    """
+    Partition upkeep and retention:
+    - create the partitions the next few days will need
+    - drop partitions past results_retention_days
+    - delete rollup rows past their own retention
+    - delete delivered/failed alerts past alert_outbox_retention_days
+    """
+    now = now or datetime.now(timezone.utc)
+
+    with engine.begin() as conn:
+        created = partitions.ensure_partitions(conn, now)
+        partitioned = partitions.is_partitioned(conn)
+
+    dropped = _expire_partitions(now) if partitioned and settings.results_retention_days > 0 else []
+    trimmed = _trim_rollups(now)
+    alerts = _trim_outbox(now)
+
+    return {"created": created, "dropped": dropped, "rollups_trimmed": trimmed, "alerts_trimmed": alerts}
+
+
+async def maintenance_loop() -> None:
+    """Worker task: run_maintenance every maintenance_interval_sec."""
+    while True:
+        try:
+            await asyncio.to_thread(run_maintenance)
+        except Exception:
+            logger.exception("Partition maintenance failed")
+        await asyncio.sleep(settings.maintenance_interval_sec)
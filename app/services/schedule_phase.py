@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import BigInteger, cast, extract, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Monitor
+from app.services.sharding import monitor_hash
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def phase_of(next_run_at: datetime, interval_sec: int) -> int:
+    """Second of its interval a monitor runs at, counted from the Unix epoch."""
+    return math.floor((next_run_at - _EPOCH).total_seconds()) % interval_sec
+
+
+def next_tick(phase: int, interval_sec: int, now: datetime) -> datetime:
+    """First time >= now (whole seconds) that's phase seconds into an interval."""
+    start = math.ceil((now - _EPOCH).total_seconds())
+    return _EPOCH + timedelta(seconds=start + (phase - start) % interval_sec)
+
+
+class PhasePlanner:
+    """
+    Picks the phase (second of the interval) for new and re-timed monitors,
+    so checks spread evenly over time instead of bunching up.
+
+    - a monitor's phase lives in next_run_at: claims advance it by whole
+      intervals, so once it starts on its phase it stays there
+    - the load a candidate phase p of interval I sees from a monitor with
+      interval J and phase q: they coincide iff p = q (mod gcd(I, J)), once
+      every lcm(I, J) seconds, i.e. on gcd(I, J) / J of p's ticks. The
+      planner picks the p with the least total, from (interval, phase)
+      counts of the active monitors (one GROUP BY, not a scan of future ticks)
+    - ties go to the phase closest after hash(id) % I, so equal loads still
+      spread deterministically
+    - assign() counts its own picks, so one planner can place a whole batch;
+      release() takes back a monitor that's about to be re-phased
+    """
+
+    def __init__(self, counts: Counter[tuple[int, int]] | None = None) -> None:
+        self._counts: Counter[tuple[int, int]] = counts or Counter()
+        self._loads: dict[int, list[float]] = {}
+
+    @classmethod
+    def load(cls, db: Session) -> PhasePlanner:
+        phase = func.mod(cast(func.floor(extract("epoch", Monitor.next_run_at)), BigInteger), Monitor.interval_sec)
+        q = select(Monitor.interval_sec, phase, func.count()).where(Monitor.is_active.is_(True))
+        rows = db.execute(q.group_by(Monitor.interval_sec, phase))
+        return cls(Counter({(interval, int(p)): n for interval, p, n in rows}))
+
+    def _load(self, interval: int) -> list[float]:
+        load = self._loads.get(interval)
+        if load is None:
+            # Group by gcd first: one pass over the interval per distinct gcd
+            by_gcd: dict[int, list[float]] = {}
+            for (other, phase), n in self._counts.items():
+                g = math.gcd(interval, other)
+                weights = by_gcd.setdefault(g, [0.0] * g)
+                weights[phase % g] += n * g / other
+            load = [0.0] * interval
+            for g, weights in by_gcd.items():
+                for r, w in enumerate(weights):
+                    if w:
+                        for p in range(r, interval, g):
+                            load[p] += w
+            self._loads[interval] = load
+        return load
+
+    def _add(self, interval: int, phase: int, n: int) -> None:
+        self._counts[(interval, phase)] += n
+        for other, load in self._loads.items():
+            g = math.gcd(other, interval)
+            w = n * g / interval
+            for p in range(phase % g, other, g):
+                load[p] += w
+
+    def release(self, interval_sec: int, next_run_at: datetime) -> None:
+        """Stop counting a monitor that was loaded (or assigned) with this schedule."""
+        phase = phase_of(next_run_at, interval_sec)
+        if self._counts[(interval_sec, phase)] > 0:
+            self._add(interval_sec, phase, -1)
+
+    def assign(self, monitor_id: uuid.UUID, interval_sec: int, now: datetime) -> datetime:
+        """next_run_at for monitor_id on the least-loaded phase of interval_sec."""
+        load = self._load(interval_sec)
+        lowest = min(load)
+        preferred = monitor_hash(monitor_id) % interval_sec
+        phase = next(
+            p % interval_sec
+            for p in range(preferred, preferred + interval_sec)
+            if load[p % interval_sec] <= lowest + 1e-9
+        )
+        self._add(interval_sec, phase, 1)
+        return next_tick(phase, interval_sec, now)
+
+
+class PlannerCache:
+    """
+    One PhasePlanner per process for single creates and interval changes
+    (crud), so each one isn't a GROUP BY over every monitor plus a fresh
+    pass over its interval's phases.
+
+    - counts are reloaded at most every max_age_sec
+      (PHASE_PLANNER_MAX_AGE_SEC); in between, this process's own picks
+      update them incrementally and other processes' show up at the next
+      reload. Phases only need to be spread, not exact
+    - per-interval loads stay with the counts, so a create with an interval
+      seen before only looks for the least-loaded phase
+    - bulk operations plan a whole batch with their own PhasePlanner
+    """
+
+    def __init__(self, max_age_sec: float | None = None) -> None:
+        self._max_age_sec = max_age_sec if max_age_sec is not None else settings.phase_planner_max_age_sec
+        self._planner: PhasePlanner | None = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def assign(
+        self,
+        db: Session,
+        monitor_id: uuid.UUID,
+        interval_sec: int,
+        now: datetime,
+        replaces: tuple[int, datetime] | None = None,
+    ) -> datetime:
+        """
+        PhasePlanner.assign on the cached counts. replaces is the
+        (interval_sec, next_run_at) an active monitor is moving off.
+        """
+        with self._lock:
+            if self._planner is None or time.monotonic() - self._loaded_at >= self._max_age_sec:
+                self._planner = PhasePlanner.load(db)
+                self._loaded_at = time.monotonic()
+            if replaces is not None:
+                self._planner.release(*replaces)
+            return self._planner.assign(monitor_id, interval_sec, now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._planner = None
+
+
+planner_cache = PlannerCache()
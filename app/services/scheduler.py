@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import socket
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from sqlalchemy import DateTime, extract, func, literal, or_, select, true, update
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+from app.core.metrics import SCHEDULER_LAG
+from app.db.models import Monitor
+from app.db.session import SessionLocal
+from app.services.sharding import Shard
+
+logger = logging.getLogger(__name__)
+
+CheckFn = Callable[[Monitor], Awaitable[object]]
+
+
+def default_worker_id() -> str:
+    # The suffix tells a restarted worker apart from its crashed predecessor (same pid in a container)
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+@dataclass
+class _Claimed:
+    monitors: list[Monitor]  # detached
+    released: int
+    next_due: datetime | None
+
+
+def _claim_due(
+    worker_id: str,
+    limit: int,
+    release_ids: list[uuid.UUID],
+    lease_sec: float,
+    in_shard: ColumnElement,
+) -> _Claimed:
+    """
+    Runs in a thread; one transaction.
+
+    - releases the leases on release_ids still held by worker_id
+    - claims up to limit due, unleased monitors: FOR UPDATE SKIP LOCKED, so
+      concurrent workers never claim the same row and never wait on each other
+    - a claim moves next_run_at to the next fixed-rate tick after now (missed
+      ticks are skipped, not burst) and leases the row for lease_sec
+    - only monitors matching in_shard are claimed
+    - next_due is the earliest not-yet-due tick, for the caller's sleep
+    """
+    now = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        released = 0
+        if release_ids:
+            released = db.execute(
+                update(Monitor.__table__)
+                .where(Monitor.__table__.c.id.in_(release_ids))
+                .where(Monitor.__table__.c.leased_by == worker_id)
+                .values(leased_until=None, leased_by=None, updated_at=Monitor.__table__.c.updated_at)
+            ).rowcount
+
+        monitors: list[Monitor] = []
+        if limit > 0:
+            b_now = literal(now, DateTime(timezone=True))
+            due = (
+                select(Monitor.id)
+                .where(Monitor.is_active.is_(True))
+                .where(Monitor.next_run_at <= b_now)
+                .where(or_(Monitor.leased_until.is_(None), Monitor.leased_until <= b_now))
+                .where(in_shard)
+                .order_by(Monitor.next_run_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            ticks = func.floor(extract("epoch", b_now - Monitor.next_run_at) / Monitor.interval_sec) + 1
+            claim = (
+                update(Monitor)
+                .where(Monitor.id.in_(due.scalar_subquery()))
+                .values(
+                    next_run_at=Monitor.next_run_at + func.make_interval(0, 0, 0, 0, 0, 0, Monitor.interval_sec * ticks),
+                    leased_until=now + timedelta(seconds=lease_sec),
+                    leased_by=worker_id,
+                    # Claims aren't edits
+                    updated_at=Monitor.updated_at,
+                )
+                .returning(Monitor)
+                .execution_options(synchronize_session=False)
+            )
+            monitors = list(db.scalars(claim))
+
+        next_due = db.scalar(
+            select(Monitor.next_run_at)
+            .where(Monitor.is_active.is_(True))
+            .where(Monitor.next_run_at > now)
+            .where(in_shard)
+            .order_by(Monitor.next_run_at)
+            .limit(1)
+        )
+        # Detach before commit expires them; the loaded attributes stay readable
+        db.expunge_all()
+        db.commit()
+        return _Claimed(monitors, released, next_due)
+    finally:
+        db.close()
+
+
+class Scheduler:
+    """
+    Runs every active monitor on its interval_sec, sharing the work with any
+    number of other worker processes through the monitors table.
+
+    - a monitor is due when next_run_at <= now and it isn't leased
+    - each loop releases the leases of finished checks and claims due
+      monitors for the free slots, in one round trip (see _claim_due)
+    - ticks are fixed-rate (next_run_at + interval), so slow checks don't
+      drift the grid; a monitor never has two checks in flight, a tick that
+      comes due while the lease is held runs once the lease is released
+    - where on the grid a monitor sits (its phase) is picked when it's
+      created or re-timed (services/schedule_phase.py); jitter_sec adds a
+      random delay on top, capped at a tenth of the interval, for targets
+      that shouldn't see the same second every time
+    - if a worker dies, its leases expire after lease_sec and the monitors
+      are claimed by whoever is left
+    - at most max_concurrency checks run at once per worker
+    - with a shard, only that slice of the monitors is claimed (see
+      services/sharding.py); processes on one host split the monitors by
+      consistent hashing instead of racing each other for every tick
+    - monitor edits are picked up on the next claim; between claims the
+      loop sleeps until the next tick, at most poll_sec; wake() cuts the
+      sleep short (the worker calls it on monitor change notifications, so
+      new and edited monitors don't wait for the poll)
+    """
+
+    def __init__(
+        self,
+        check: CheckFn,
+        *,
+        max_concurrency: int | None = None,
+        poll_sec: float | None = None,
+        lease_sec: float | None = None,
+        jitter_sec: float | None = None,
+        claim_batch: int | None = None,
+        worker_id: str | None = None,
+        shard: Shard | None = None,
+    ) -> None:
+        self._check = check
+        self._max_concurrency = max_concurrency or settings.scheduler_max_concurrency
+        self._poll_sec = poll_sec or settings.scheduler_poll_sec
+        self._lease_sec = lease_sec or settings.scheduler_lease_sec
+        self._jitter_sec = jitter_sec if jitter_sec is not None else settings.scheduler_jitter_sec
+        self._claim_batch = claim_batch or settings.scheduler_claim_batch
+        self.worker_id = worker_id or default_worker_id()
+        self._shard = shard
+        self._in_shard = shard.filter(Monitor.shard_key) if shard is not None else true()
+
+        self._inflight: set[uuid.UUID] = set()
+        self._finished: list[uuid.UUID] = []
+        self._tasks: set[asyncio.Task] = set()
+
+        self._wakeup: asyncio.Event | None = None
+        self._stopping = False
+
+    # ----------------------------
+    # Claims
+    # ----------------------------
+    async def _sync(self, limit: int) -> tuple[int, datetime | None]:
+        release, self._finished = self._finished, []
+        try:
+            claimed = await asyncio.to_thread(
+                _claim_due, self.worker_id, limit, release, self._lease_sec, self._in_shard
+            )
+        except Exception:
+            self._finished.extend(release)
+            raise
+
+        if claimed.released < len(release):
+            logger.warning(
+                "%d lease(s) expired before their check finished; raise SCHEDULER_LEASE_SEC",
+                len(release) - claimed.released,
+            )
+        for monitor in claimed.monitors:
+            self._start(monitor)
+        return len(claimed.monitors), claimed.next_due
+
+    # ----------------------------
+    # Dispatch
+    # ----------------------------
+    def _start(self, monitor: Monitor) -> None:
+        # The claim moved next_run_at one interval past the tick being run
+        due = monitor.next_run_at - timedelta(seconds=monitor.interval_sec)
+        SCHEDULER_LAG.observe(max(0.0, (datetime.now(timezone.utc) - due).total_seconds()))
+
+        self._inflight.add(monitor.id)
+        task = asyncio.create_task(self._run_one(monitor))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_one(self, monitor: Monitor) -> None:
+        try:
+            if self._jitter_sec > 0:
+                await asyncio.sleep(random.uniform(0, min(self._jitter_sec, monitor.interval_sec / 10)))
+            await self._check(monitor)
+        except Exception:
+            logger.exception("Check failed: monitor_id=%s", monitor.id)
+        finally:
+            self._inflight.discard(monitor.id)
+            self._finished.append(monitor.id)
+            self._wakeup.set()
+
+    async def _sleep(self, next_due: datetime | None) -> None:
+        timeout = self._poll_sec
+        if next_due is not None:
+            timeout = min(timeout, max(0.0, (next_due - datetime.now(timezone.utc)).total_seconds()))
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run(self) -> None:
+        self._wakeup = asyncio.Event()
+        logger.info("Scheduler started: worker_id=%s shard=%s", self.worker_id, self._shard)
+        try:
+            while not self._stopping:
+                self._wakeup.clear()
+                free = min(self._max_concurrency - len(self._inflight), self._claim_batch)
+                try:
+                    claimed, next_due = await self._sync(free)
+                except Exception:
+                    logger.exception("Claiming monitors failed")
+                    claimed, next_due = 0, None
+                if claimed and claimed == free:
+                    continue  # a full batch: more may be due already
+                await self._sleep(next_due)
+        finally:
+            if self._tasks:
+                logger.info("Waiting for %d in-flight checks", len(self._tasks))
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+            try:
+                await self._sync(0)
+            except Exception:
+                logger.exception("Releasing leases failed; they expire in %ss", self._lease_sec)
+
+    def wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def stop(self) -> None:
+        self._stopping = True
+        self.wake()
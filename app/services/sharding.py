@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import bisect
+import hashlib
+import uuid
+from dataclasses import dataclass
+from functools import cached_property
+
+from sqlalchemy import Integer, any_, literal
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+
+HASH_SPACE = 2**32
+
+# Monitors are bucketed by the first SHARD_KEY_BITS of their hash (stored
+# as monitors.shard_key); shards own whole buckets
+SHARD_KEY_BITS = 12
+SHARD_KEYS = 2**SHARD_KEY_BITS
+_KEY_SHIFT = 32 - SHARD_KEY_BITS
+
+
+def _hash(value: str) -> int:
+    """First 32 bits of md5, as an unsigned int."""
+    return int(hashlib.md5(value.encode()).hexdigest()[:8], 16)
+
+
+def monitor_hash(monitor_id: uuid.UUID) -> int:
+    return _hash(str(monitor_id))
+
+
+def shard_key(monitor_id: uuid.UUID) -> int:
+    """The monitor's bucket; matches the generated monitors.shard_key column."""
+    return monitor_hash(monitor_id) >> _KEY_SHIFT
+
+
+def node_name(index: int) -> str:
+    return f"worker-{index}"
+
+
+class HashRing:
+    """
+    Consistent hashing of monitor ids onto worker processes.
+
+    - every node gets vnodes points on a 32-bit ring (md5 of "<node>#<i>")
+    - a key belongs to the first point at or after it, wrapping
+    - adding or removing a node only moves the keys between its points
+      and their predecessors, ~1/N of them; the rest keep their owner
+    """
+
+    def __init__(self, nodes: list[str], vnodes: int | None = None) -> None:
+        if not nodes:
+            raise ValueError("HashRing needs at least one node")
+        vnodes = vnodes or settings.worker_ring_vnodes
+        points = sorted((_hash(f"{node}#{i}"), node) for node in nodes for i in range(vnodes))
+        self._keys = [p for p, _ in points]
+        self._nodes = [n for _, n in points]
+
+    def node_for(self, key: int) -> str:
+        i = bisect.bisect_left(self._keys, key)
+        return self._nodes[i % len(self._nodes)]
+
+
+@dataclass(frozen=True)
+class Shard:
+    """
+    One worker process's slice of the monitors: index of count.
+
+    A bucket (shard_key) goes to the ring node owning the start of its hash
+    range, so a shard is a plain set of keys and is claimed with one
+    indexed shard_key = ANY(...) predicate.
+    """
+
+    index: int
+    count: int
+
+    @cached_property
+    def keys(self) -> frozenset[int]:
+        ring = HashRing([node_name(i) for i in range(self.count)])
+        node = node_name(self.index)
+        return frozenset(k for k in range(SHARD_KEYS) if ring.node_for(k << _KEY_SHIFT) == node)
+
+    def filter(self, column) -> ColumnElement:
+        """WHERE clause matching the rows whose shard key (column) is in this shard."""
+        return column == any_(literal(sorted(self.keys), ARRAY(Integer)))
@@ -0,0 +1,625 @@
+from __future__ import annotations
+
+import math
+import uuid
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import Integer, cast, delete, func, literal, literal_column, or_, select, true, union_all
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.db.crud import _parse_window
+from app.core.config import settings
+from app.db.models import CheckResult, CheckRollupHour, CheckRollupMinute, Monitor
+from app.services.http_timing import PHASES
+
+MINUTE = timedelta(minutes=1)
+HOUR = timedelta(hours=1)
+
+# Upper bounds (exclusive) of the latency histogram buckets, in ms. Bucket i
+# holds latencies in [LATENCY_BOUNDS_MS[i-1], LATENCY_BOUNDS_MS[i]); the last
+# one holds everything >= 60s. Roughly 25% wide, so medians come out within
+# a few percent of the exact value.
+LATENCY_BOUNDS_MS = [
+    1, 2, 3, 4, 5, 6, 8, 10, 12, 15, 20, 25, 30, 40, 50, 60, 80, 100,
+    120, 150, 200, 250, 300, 400, 500, 600, 800, 1000, 1200, 1500, 2000,
+    2500, 3000, 4000, 5000, 6000, 8000, 10000, 15000, 20000, 30000, 60000,
+]
+HIST_SIZE = len(LATENCY_BOUNDS_MS) + 1
+
+# CheckResult columns per phase, and the rollup sum/count columns they fold into
+_PHASE_COLUMNS = [f"{p}_ms" for p in PHASES]
+_PHASE_SUMS = [f"{p}_ms_sum" for p in PHASES]
+_PHASE_COUNTS = [f"{p}_count" for p in PHASES]
+
+
+def _floor(ts: datetime, step: timedelta) -> datetime:
+    ts = ts.astimezone(timezone.utc)
+    if step == HOUR:
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(second=0, microsecond=0)
+
+
+def _ceil(ts: datetime, step: timedelta) -> datetime:
+    floor = _floor(ts, step)
+    return floor if floor == ts else floor + step
+
+
+class _Agg:
+    """Running totals for one bucket (or a whole window); merges like the rollup columns."""
+
+    __slots__ = (
+        "total",
+        "success",
+        "latency_count",
+        "latency_sum",
+        "latency_min",
+        "latency_max",
+        "hist",
+        "phase_sum",
+        "phase_count",
+    )
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.success = 0
+        self.latency_count = 0
+        self.latency_sum = 0
+        self.latency_min: int | None = None
+        self.latency_max: int | None = None
+        self.hist = [0] * HIST_SIZE
+        self.phase_sum = [0] * len(PHASES)
+        self.phase_count = [0] * len(PHASES)
+
+    def add(self, success: bool, latency_ms: int | None, phases=()) -> None:
+        self.total += 1
+        self.success += 1 if success else 0
+        for i, ms in enumerate(phases):
+            if ms is not None:
+                self.phase_sum[i] += ms
+                self.phase_count[i] += 1
+        if latency_ms is None:
+            return
+        self.latency_count += 1
+        self.latency_sum += latency_ms
+        self.latency_min = latency_ms if self.latency_min is None else min(self.latency_min, latency_ms)
+        self.latency_max = latency_ms if self.latency_max is None else max(self.latency_max, latency_ms)
+        self.hist[bisect_right(LATENCY_BOUNDS_MS, latency_ms)] += 1
+
+    def as_row(self, monitor_id: uuid.UUID, bucket: datetime) -> dict:
+        return {
+            "monitor_id": monitor_id,
+            "bucket": bucket,
+            "total_checks": self.total,
+            "success_checks": self.success,
+            "latency_count": self.latency_count,
+            "latency_sum": self.latency_sum,
+            "latency_min": self.latency_min,
+            "latency_max": self.latency_max,
+            "latency_hist": self.hist,
+            **dict(zip(_PHASE_SUMS, self.phase_sum)),
+            **dict(zip(_PHASE_COUNTS, self.phase_count)),
+        }
+
+    def phase_averages(self) -> dict[str, float | None]:
+        return {
+            f"avg_{name}": round(total / count, 2) if count else None
+            for name, total, count in zip(_PHASE_COLUMNS, self.phase_sum, self.phase_count)
+        }
+
+    def median(self) -> float | None:
+        return self.quantile(0.5)
+
+    def quantile(self, q: float) -> float | None:
+        """Latency quantile interpolated inside its histogram bucket, clamped to the observed min/max."""
+        if self.latency_count == 0:
+            return None
+
+        rank = self.latency_count * q
+        seen = 0
+        for i, n in enumerate(self.hist):
+            if n and seen + n >= rank:
+                lo = LATENCY_BOUNDS_MS[i - 1] if i > 0 else 0
+                hi = LATENCY_BOUNDS_MS[i] if i < len(LATENCY_BOUNDS_MS) else self.latency_max
+                estimate = lo + (hi - lo) * (rank - seen) / n
+                return round(min(max(estimate, self.latency_min), self.latency_max), 2)
+            seen += n
+        return float(self.latency_max)
+
+
+# ----------------------------
+# Incremental maintenance
+# ----------------------------
+def _upsert(model):
+    table = model.__table__
+    stmt = pg_insert(table)
+    ex = stmt.excluded
+    # Element-wise sum of the two histograms
+    merged_hist = literal_column(
+        f"ARRAY(SELECT x.a + x.b FROM unnest({table.name}.latency_hist, excluded.latency_hist)"
+        " WITH ORDINALITY AS x(a, b, n) ORDER BY x.n)"
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.monitor_id, table.c.bucket],
+        set_={
+            "total_checks": table.c.total_checks + ex.total_checks,
+            "success_checks": table.c.success_checks + ex.success_checks,
+            "latency_count": table.c.latency_count + ex.latency_count,
+            "latency_sum": table.c.latency_sum + ex.latency_sum,
+            "latency_min": func.least(table.c.latency_min, ex.latency_min),
+            "latency_max": func.greatest(table.c.latency_max, ex.latency_max),
+            "latency_hist": merged_hist,
+            **{name: table.c[name] + ex[name] for name in _PHASE_SUMS + _PHASE_COUNTS},
+        },
+    )
+
+
+_ROLLUPS = [
+    (MINUTE, CheckRollupMinute, _upsert(CheckRollupMinute)),
+    (HOUR, CheckRollupHour, _upsert(CheckRollupHour)),
+]
+
+
+def _aggregate(rows) -> list[dict[tuple[uuid.UUID, datetime], _Agg]]:
+    """(monitor_id, checked_at, success, latency_ms, *phase ms) rows -> buckets per rollup, in one pass."""
+    buckets: list[dict[tuple[uuid.UUID, datetime], _Agg]] = [{} for _ in _ROLLUPS]
+    for monitor_id, checked_at, success, latency_ms, *phases in rows:
+        for (step, _, _), table_buckets in zip(_ROLLUPS, buckets):
+            key = (monitor_id, _floor(checked_at, step))
+            agg = table_buckets.get(key)
+            if agg is None:
+                agg = table_buckets[key] = _Agg()
+            agg.add(success, latency_ms, phases)
+    return buckets
+
+
+def _write_rollups(db: Session, stmt, buckets: dict[tuple[uuid.UUID, datetime], _Agg]) -> None:
+    # Sorted keys: concurrent writers lock rollup rows in the same order
+    rows = [buckets[key].as_row(*key) for key in sorted(buckets)]
+    if rows:
+        db.execute(stmt, rows)
+
+
+def record_rollups(db: Session, results: list[CheckResult]) -> None:
+    """
+    Fold a batch of results into the minute and hour rollups, in the
+    caller's transaction. One multi-row upsert per table.
+    """
+    rows = [
+        (r.monitor_id, r.checked_at, r.success, r.latency_ms, *(getattr(r, name) for name in _PHASE_COLUMNS))
+        for r in results
+    ]
+    for (_, _, stmt), buckets in zip(_ROLLUPS, _aggregate(rows)):
+        _write_rollups(db, stmt, buckets)
+
+
+def rebuild_rollups(db: Session, since: datetime, until: datetime | None = None) -> int:
+    """
+    Recompute rollups from check_results for every bucket from since's hour
+    up to until's hour (rounded up; open-ended by default), for backfills
+    and repairs (scripts/rebuild_rollups.py). Run open-ended
+    rebuilds with the worker stopped: results written meanwhile would be
+    counted twice.
+
+    Returns the number of check results read.
+    """
+    start = _floor(since, HOUR)
+    end = _ceil(until, HOUR) if until is not None else None
+
+    for _, model, _ in _ROLLUPS:
+        q = delete(model).where(model.bucket >= start)
+        if end is not None:
+            q = q.where(model.bucket < end)
+        db.execute(q)
+
+    q = select(
+        CheckResult.monitor_id,
+        CheckResult.checked_at,
+        CheckResult.success,
+        CheckResult.latency_ms,
+        *(CheckResult.__table__.c[name] for name in _PHASE_COLUMNS),
+    ).where(CheckResult.checked_at >= start)
+    if end is not None:
+        q = q.where(CheckResult.checked_at < end)
+    rows = db.execute(q.execution_options(yield_per=10000))
+    per_table = _aggregate(rows)
+    for (_, _, stmt), buckets in zip(_ROLLUPS, per_table):
+        _write_rollups(db, stmt, buckets)
+    db.commit()
+    return sum(agg.total for agg in per_table[0].values())
+
+
+# ----------------------------
+# Summary
+# ----------------------------
+def _before_minute_rollups(since: datetime, now: datetime) -> bool:
+    """since is older than the oldest minute rollups retention keeps."""
+    days = settings.rollup_minute_retention_days
+    return days > 0 and since < now - timedelta(days=days)
+
+
+def _before_results(since: datetime, now: datetime) -> bool:
+    """since is older than the oldest raw results retention keeps."""
+    days = settings.results_retention_days
+    return days > 0 and since < now - timedelta(days=days)
+
+
+def _plan(since: datetime, now: datetime):
+    """
+    Split [since, now] into whole hours, whole minutes and raw edges:
+
+        raw | minutes | hours ... hours | minutes | raw (open-ended)
+
+    Returns (hour ranges, minute ranges, raw ranges) as (start, end) pairs;
+    the last raw range has end=None so results newer than now still count.
+
+    When since is older than what retention keeps of the minute rollups or
+    the raw results, the leading edge starts at since's whole hour instead,
+    as the timeseries buckets do: the partial hour would otherwise come
+    from rows that have been deleted.
+    """
+    hours, minutes, raw = [], [], []
+    if _before_minute_rollups(since, now) or _before_results(since, now):
+        since = _floor(since, HOUR)
+
+    def split_minutes(lo: datetime, hi: datetime | None) -> None:
+        m0, m1 = _ceil(lo, MINUTE), _floor(hi or now, MINUTE)
+        if m0 >= m1:
+            raw.append((lo, hi))
+            return
+        minutes.append((m0, m1))
+        if lo < m0:
+            raw.append((lo, m0))
+        if hi is None or m1 < hi:
+            raw.append((m1, hi))
+
+    h0, h1 = _ceil(since, HOUR), _floor(now, HOUR)
+    if h0 < h1:
+        hours.append((h0, h1))
+        if since < h0:
+            split_minutes(since, h0)
+        split_minutes(h1, None)
+    else:
+        split_minutes(since, None)
+
+    return hours, minutes, raw
+
+
+def _in_ranges(col, ranges):
+    return or_(*[(col >= lo) & (col < hi) if hi is not None else col >= lo for lo, hi in ranges])
+
+
+def _monitor_parts(model, ranges, ids):
+    return (
+        select(
+            model.monitor_id,
+            model.total_checks,
+            model.success_checks,
+            model.latency_count,
+            model.latency_sum,
+            model.latency_min,
+            model.latency_max,
+            *(model.__table__.c[name] for name in _PHASE_SUMS + _PHASE_COUNTS),
+        )
+        .where(model.monitor_id.in_(ids))
+        .where(_in_ranges(model.bucket, ranges))
+    )
+
+
+def _hist_parts(model, ranges, ids):
+    cells = func.unnest(model.latency_hist).table_valued("n", with_ordinality="i").render_derived()
+    return (
+        select(model.monitor_id, cells.c.i, cells.c.n)
+        .join_from(model, cells, true())
+        .where(model.monitor_id.in_(ids))
+        .where(_in_ranges(model.bucket, ranges))
+    )
+
+
+def _summarize(db: Session, ids, since: datetime, now: datetime) -> dict[uuid.UUID, tuple[_Agg, bool | None]]:
+    """
+    Window totals for every monitor id selected by ids (a SELECT of monitor
+    ids), in three set-based queries: totals, merged histograms and the
+    latest result in the window. Monitors without results are left out.
+    """
+    hours, minutes, raw = _plan(since, now)
+    rollups = [(model, ranges) for model, ranges in ((CheckRollupHour, hours), (CheckRollupMinute, minutes)) if ranges]
+    in_raw = (CheckResult.monitor_id.in_(ids), _in_ranges(CheckResult.checked_at, raw))
+    has_latency = CheckResult.latency_ms.is_not(None)
+    raw_phases = [CheckResult.__table__.c[name] for name in _PHASE_COLUMNS]
+
+    # Totals
+    raw_totals = select(
+        CheckResult.monitor_id,
+        literal(1).label("total_checks"),
+        cast(CheckResult.success, Integer).label("success_checks"),
+        cast(has_latency, Integer).label("latency_count"),
+        func.coalesce(CheckResult.latency_ms, 0).label("latency_sum"),
+        CheckResult.latency_ms.label("latency_min"),
+        CheckResult.latency_ms.label("latency_max"),
+        *(func.coalesce(phase, 0).label(name) for phase, name in zip(raw_phases, _PHASE_SUMS)),
+        *(cast(phase.is_not(None), Integer).label(name) for phase, name in zip(raw_phases, _PHASE_COUNTS)),
+    ).where(*in_raw)
+    parts = union_all(*[_monitor_parts(model, ranges, ids) for model, ranges in rollups], raw_totals).subquery()
+
+    out: dict[uuid.UUID, tuple[_Agg, bool | None]] = {}
+    rows = db.execute(
+        select(
+            parts.c.monitor_id,
+            func.sum(parts.c.total_checks),
+            func.sum(parts.c.success_checks),
+            func.sum(parts.c.latency_count),
+            func.sum(parts.c.latency_sum),
+            func.min(parts.c.latency_min),
+            func.max(parts.c.latency_max),
+            *(func.sum(parts.c[name]) for name in _PHASE_SUMS + _PHASE_COUNTS),
+        ).group_by(parts.c.monitor_id)
+    )
+    for monitor_id, total, success, latency_count, latency_sum, latency_min, latency_max, *phases in rows:
+        agg = _Agg()
+        agg.total, agg.success = int(total), int(success)
+        agg.latency_count, agg.latency_sum = int(latency_count), int(latency_sum)
+        agg.latency_min, agg.latency_max = latency_min, latency_max
+        agg.phase_sum = [int(v) for v in phases[: len(PHASES)]]
+        agg.phase_count = [int(v) for v in phases[len(PHASES) :]]
+        out[monitor_id] = (agg, None)
+
+    if not out:
+        return out
+
+    # Histograms (bucket numbers are 1-based, like width_bucket and WITH ORDINALITY)
+    raw_hist = select(
+        CheckResult.monitor_id,
+        (func.width_bucket(CheckResult.latency_ms, literal(LATENCY_BOUNDS_MS, ARRAY(Integer))) + 1).label("i"),
+        literal(1).label("n"),
+    ).where(*in_raw, has_latency)
+    cells = union_all(*[_hist_parts(model, ranges, ids) for model, ranges in rollups], raw_hist).subquery()
+
+    rows = db.execute(
+        select(cells.c.monitor_id, cells.c.i, func.sum(cells.c.n))
+        .group_by(cells.c.monitor_id, cells.c.i)
+        .having(func.sum(cells.c.n) > 0)
+    )
+    for monitor_id, i, n in rows:
+        out[monitor_id][0].hist[i - 1] = int(n)
+
+    # Latest result in the window, per monitor
+    ids_q = select(Monitor.id.label("monitor_id")).where(Monitor.id.in_(ids)).subquery()
+    latest = (
+        select(CheckResult.success)
+        .where(CheckResult.monitor_id == ids_q.c.monitor_id)
+        .where(CheckResult.checked_at >= since)
+        .order_by(CheckResult.checked_at.desc())
+        .limit(1)
+        .lateral()
+    )
+    for monitor_id, success in db.execute(select(ids_q.c.monitor_id, latest.c.success).join(latest, true())):
+        if monitor_id in out:
+            out[monitor_id] = (out[monitor_id][0], success)
+
+    return out
+
+
+def _summary_dict(monitor_id: uuid.UUID, window: str, agg: _Agg, latest: bool | None) -> dict:
+    uptime_percent = round((agg.success / agg.total) * 100, 2) if agg.total > 0 else 0.0
+    avg_latency_ms = round(agg.latency_sum / agg.latency_count, 2) if agg.latency_count else None
+
+    return {
+        "monitor_id": str(monitor_id),
+        "window": window,
+        "uptime_percent": uptime_percent,
+        "total_checks": agg.total,
+        "success_checks": agg.success,
+        "avg_latency_ms": avg_latency_ms,
+        "median_latency_ms": agg.median(),
+        **agg.phase_averages(),
+        "current_status": "DOWN" if latest is False else "UP",
+    }
+
+
+def _window_bounds(window: str) -> tuple[datetime, datetime]:
+    try:
+        delta = _parse_window(window)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid window. Use like 24h, 7d, 60m")
+
+    now = datetime.now(timezone.utc)
+    return now - delta, now
+
+
+def get_monitor_summary(db: Session, monitor_id: uuid.UUID, window: str = "24h") -> dict:
+    """
+    Uptime and latency over the window, from rollups.
+
+    - whole hours come from check_rollups_hour, whole minutes at the edges
+      from check_rollups_minute, and only the partial minutes at either end
+      from check_results, so cost follows window size, not check count
+    - a window reaching back past ROLLUP_MINUTE_RETENTION_DAYS or
+      RESULTS_RETENTION_DAYS starts at its first whole hour bucket (which
+      may begin a little before the window)
+    - median_latency_ms is estimated from the merged latency histogram
+    - avg_<phase>_ms averages only the checks that had the phase (e.g.
+      avg_tls_ms over new TLS connections), so phases don't add up to
+      avg_latency_ms
+    """
+    since, now = _window_bounds(window)
+    agg, latest = _summarize(db, [monitor_id], since, now).get(monitor_id, (_Agg(), None))
+    return _summary_dict(monitor_id, window, agg, latest)
+
+
+def get_fleet_summary(
+    db: Session,
+    window: str = "24h",
+    monitor_ids: list[uuid.UUID] | None = None,
+    is_active: bool | None = None,
+) -> dict:
+    """
+    get_monitor_summary for many monitors at once (all of them by default),
+    with the same few queries whatever the monitor count.
+    """
+    since, now = _window_bounds(window)
+
+    q = select(Monitor.id, Monitor.name)
+    if monitor_ids:
+        q = q.where(Monitor.id.in_(monitor_ids))
+    if is_active is not None:
+        q = q.where(Monitor.is_active.is_(is_active))
+    monitors = db.execute(q.order_by(Monitor.created_at.desc())).all()
+
+    ids = q.with_only_columns(Monitor.id).scalar_subquery()
+    summaries = _summarize(db, ids, since, now) if monitors else {}
+
+    items = []
+    for monitor_id, name in monitors:
+        agg, latest = summaries.get(monitor_id, (_Agg(), None))
+        items.append({**_summary_dict(monitor_id, window, agg, latest), "name": name})
+
+    return {"window": window, "count": len(items), "monitors": items}
+
+
+# ----------------------------
+# Time series
+# ----------------------------
+# Steps picked when the requested one (or none) would give too many points;
+# all divide a day or are whole days, so buckets line up across windows
+_STEPS = [
+    timedelta(minutes=m) for m in (1, 2, 5, 10, 15, 30)
+] + [
+    timedelta(hours=h) for h in (1, 2, 3, 6, 12)
+] + [
+    timedelta(days=d) for d in (1, 2, 7, 14, 30)
+]
+
+# Buckets are aligned to this (a Monday, so weekly buckets run Monday to Monday)
+_BUCKET_ORIGIN = datetime(2000, 1, 3, tzinfo=timezone.utc)
+
+
+def _parse_step(step: str) -> timedelta:
+    try:
+        delta = _parse_window(step)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid step. Use like 1m, 5m, 1h, 1d")
+    if delta <= timedelta(0):
+        raise HTTPException(status_code=400, detail="step must be positive")
+    return delta
+
+
+def _format_step(step: timedelta) -> str:
+    minutes = int(step / MINUTE)
+    if minutes % (24 * 60) == 0:
+        return f"{minutes // (24 * 60)}d"
+    if minutes % 60 == 0:
+        return f"{minutes // 60}h"
+    return f"{minutes}m"
+
+
+def _series_step(window: timedelta, step: timedelta | None, *, whole_hours: bool = False) -> timedelta:
+    """
+    step, or the smallest of _STEPS giving at most TIMESERIES_MAX_POINTS
+    buckets when step is missing or finer than that. A window starting
+    mid-bucket takes one extra bucket, hence max_points - 1.
+
+    whole_hours (the window reaches past the minute rollups' retention):
+    the step must also be a whole number of hours; a step that isn't is
+    widened to the next of _STEPS that is.
+    """
+    finest = window / max(settings.timeseries_max_points - 1, 1)
+    if whole_hours:
+        finest = max(finest, HOUR)
+    if step is not None and step >= finest and (not whole_hours or step % HOUR == timedelta(0)):
+        return step
+    floor = max(finest, step) if step is not None else finest
+    for candidate in _STEPS:
+        if candidate >= floor and (not whole_hours or candidate % HOUR == timedelta(0)):
+            return candidate
+    return timedelta(days=math.ceil(floor / timedelta(days=1)))
+
+
+def get_monitor_timeseries(db: Session, monitor_id: uuid.UUID, window: str = "24h", step: str | None = None) -> dict:
+    """
+    Per-bucket checks, uptime and latency (avg, p95, max) over the window,
+    for charts.
+
+    - bucketed in SQL with date_bin over the hour rollups when the step is
+      whole hours, else the minute ones; no raw results are read
+    - a window reaching back past ROLLUP_MINUTE_RETENTION_DAYS always uses
+      the hour rollups (the step is widened to whole hours), since the
+      older minute rollups are gone
+    - at most TIMESERIES_MAX_POINTS buckets: a step that would give more
+      (or none given) becomes the smallest of _STEPS that doesn't, so a
+      90-day chart reads about as many rollup rows as a 1-hour one
+    - buckets start at multiples of step (from a Monday, UTC); the first may
+      begin before the window and the last is still filling. Buckets
+      without checks are included with total_checks 0
+    - p95_latency_ms is estimated from the merged latency histogram, like
+      the summary's median
+    """
+    since, now = _window_bounds(window)
+    step_delta = _series_step(
+        now - since,
+        _parse_step(step) if step is not None else None,
+        whole_hours=_before_minute_rollups(since, now),
+    )
+    model = CheckRollupHour if step_delta % HOUR == timedelta(0) else CheckRollupMinute
+
+    start = _BUCKET_ORIGIN + (since - _BUCKET_ORIGIN) // step_delta * step_delta
+    count = (now - start) // step_delta + 1
+    end = start + count * step_delta
+    aggs = {start + i * step_delta: _Agg() for i in range(count)}
+
+    bin_ = func.date_bin(literal(step_delta), model.bucket, literal(_BUCKET_ORIGIN)).label("bin")
+    in_window = (model.monitor_id == monitor_id, model.bucket >= start, model.bucket < end)
+
+    rows = db.execute(
+        select(
+            bin_,
+            func.sum(model.total_checks),
+            func.sum(model.success_checks),
+            func.sum(model.latency_count),
+            func.sum(model.latency_sum),
+            func.min(model.latency_min),
+            func.max(model.latency_max),
+        )
+        .where(*in_window)
+        .group_by(bin_)
+    )
+    for bucket, total, success, latency_count, latency_sum, latency_min, latency_max in rows:
+        agg = aggs[bucket]
+        agg.total, agg.success = int(total), int(success)
+        agg.latency_count, agg.latency_sum = int(latency_count), int(latency_sum)
+        agg.latency_min, agg.latency_max = latency_min, latency_max
+
+    # Histograms per bucket, for p95 (bucket numbers are 1-based, as in _summarize)
+    cells = func.unnest(model.latency_hist).table_valued("n", with_ordinality="i").render_derived()
+    rows = db.execute(
+        select(bin_, cells.c.i, func.sum(cells.c.n))
+        .join_from(model, cells, true())
+        .where(*in_window)
+        .group_by(bin_, cells.c.i)
+        .having(func.sum(cells.c.n) > 0)
+    )
+    for bucket, i, n in rows:
+        aggs[bucket].hist[i - 1] = int(n)
+
+    points = []
+    for bucket, agg in aggs.items():
+        points.append(
+            {
+                "bucket": bucket,
+                "total_checks": agg.total,
+                "uptime_percent": round(agg.success / agg.total * 100, 2) if agg.total else None,
+                "avg_latency_ms": round(agg.latency_sum / agg.latency_count, 2) if agg.latency_count else None,
+                "p95_latency_ms": agg.quantile(0.95),
+                "max_latency_ms": agg.latency_max,
+            }
+        )
+
+    return {
+        "monitor_id": str(monitor_id),
+        "window": window,
+        "step": _format_step(step_delta),
+        "points": points,
+    }
@@ -0,0 +1,306 @@
+"""
+Concurrency benchmark of the API's read routes.
+
+Seeds monitors, check results (with rollups) and incidents, starts the API
+under uvicorn (one process), and for each endpoint keeps --concurrency
+clients (one keep-alive connection each) requesting it back to back for
+--duration seconds. Reports requests/sec, p50/p99 latency and errors per
+endpoint; --out / --compare work like bench_pipeline.py. Needs a scratch
+database: it refuses to run if DATABASE_URL has active monitors, and
+deletes what it seeded.
+
+--app-dir runs the API from another checkout, e.g. a `git worktree` of the
+previous commit, so before/after numbers come from one seed and one client:
+
+    PYTHONPATH=. python scripts/bench_api.py --concurrency 500 --out after.json
+    PYTHONPATH=. python scripts/bench_api.py --concurrency 500 --app-dir ../shiptrack-before --compare after.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import delete, insert
+
+from app.core.config import settings
+from app.db.init_db import init_db
+from app.db.models import CheckResult, Incident, Monitor
+from app.db.session import SessionLocal
+from app.services.summary import rebuild_rollups
+from scripts.bench_common import compare, new_report, percentiles_ms, require_scratch_db, save_report
+
+NAME_PREFIX = "bench-api-"
+ENDPOINTS = ("monitors", "results", "summary", "fleet_summary", "incidents")
+
+# Compared by --compare: metric -> higher is better
+_HEADLINE = {
+    "requests_per_sec": True,
+    "latency_ms.p50": False,
+    "latency_ms.p99": False,
+}
+
+
+# ----------------------------
+# Seed data
+# ----------------------------
+def seed(monitors: int, results: int) -> list[uuid.UUID]:
+    """monitors with results each over the last day, rolled up, and an incident apiece."""
+    rnd = random.Random(42)
+    now = datetime.now(timezone.utc)
+    ids = [uuid.uuid4() for _ in range(monitors)]
+    db = SessionLocal()
+    try:
+        db.execute(
+            insert(Monitor.__table__),
+            [
+                {
+                    "id": monitor_id,
+                    "name": f"{NAME_PREFIX}{i}",
+                    "url": f"http://127.0.0.1:9/{i}",
+                    "method": "GET",
+                    "expected_status": 200,
+                    "interval_sec": 60,
+                    "timeout_ms": 3000,
+                    "max_attempts": 1,
+                    "retry_backoff_ms": 500,
+                    "is_active": True,
+                    "next_run_at": now + timedelta(days=1),
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i, monitor_id in enumerate(ids)
+            ],
+        )
+        step = timedelta(days=1) / results
+        for monitor_id in ids:
+            rows = []
+            for j in range(results):
+                success = rnd.random() > 0.02
+                rows.append(
+                    {
+                        "id": uuid.uuid4(),
+                        "monitor_id": monitor_id,
+                        "checked_at": now - step * j,
+                        "success": success,
+                        "status_code": 200 if success else 500,
+                        "latency_ms": rnd.randint(5, 400),
+                        "error_type": None if success else "HTTP_UNEXPECTED",
+                    }
+                )
+            db.execute(insert(CheckResult.__table__), rows)
+        db.execute(
+            insert(Incident.__table__),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "monitor_id": monitor_id,
+                    "status": "RESOLVED",
+                    "started_at": now - timedelta(hours=2),
+                    "last_failure_at": now - timedelta(hours=1, minutes=5),
+                    "resolved_at": now - timedelta(hours=1),
+                    "failure_count": 3,
+                }
+                for monitor_id in ids
+            ],
+        )
+        db.commit()
+        rebuild_rollups(db, now - timedelta(days=1, minutes=1))
+    finally:
+        db.close()
+    return ids
+
+
+def cleanup() -> None:
+    db = SessionLocal()
+    try:
+        db.execute(delete(Monitor).where(Monitor.name.startswith(NAME_PREFIX)))
+        db.commit()
+    finally:
+        db.close()
+
+
+# ----------------------------
+# Server
+# ----------------------------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_api(app_dir: Path, port: int) -> subprocess.Popen:
+    env = {**os.environ, "PYTHONPATH": str(app_dir), "LOG_LEVEL": "WARNING"}
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning",
+         "--no-access-log", "--backlog", "4096"],
+        cwd=app_dir,
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return api
+        except OSError:
+            time.sleep(0.2)
+    api.kill()
+    raise SystemExit("API didn't start")
+
+
+# ----------------------------
+# Load
+# ----------------------------
+class _Client:
+    """
+    One keep-alive HTTP/1.1 connection; cheap enough that the client isn't
+    what's measured. With revalidate it polls like a dashboard: each path's
+    last ETag goes back as If-None-Match.
+    """
+
+    def __init__(self, port: int, revalidate: bool = False) -> None:
+        self._port = port
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._etags: dict[str, str] | None = {} if revalidate else None
+
+    async def get(self, path: str) -> int:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection("127.0.0.1", self._port)
+        etag = self._etags.get(path) if self._etags is not None else None
+        conditional = f"If-None-Match: {etag}\r\n" if etag else ""
+        self._writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nX-API-Key: {settings.api_key}\r\n{conditional}\r\n".encode()
+        )
+        status = int((await self._reader.readline()).split()[1])
+        length = 0
+        while (line := await self._reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.partition(b":")
+            name = name.strip().lower()
+            if name == b"content-length":
+                length = int(value)
+            elif name == b"etag" and self._etags is not None:
+                self._etags[path] = value.strip().decode()
+        await self._reader.readexactly(length)
+        return status
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def _paths(endpoint: str, ids: list[uuid.UUID], rnd: random.Random) -> str:
+    monitor_id = rnd.choice(ids)
+    return {
+        "monitors": "/api/v1/monitors",
+        "results": f"/api/v1/monitors/{monitor_id}/results?limit=100",
+        "summary": f"/api/v1/monitors/{monitor_id}/summary?window=24h",
+        "fleet_summary": "/api/v1/summary?window=1h",
+        "incidents": "/api/v1/incidents?limit=100",
+    }[endpoint]
+
+
+async def _load(
+    port: int, endpoint: str, ids: list[uuid.UUID], concurrency: int, duration: float, revalidate: bool = False
+) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    not_modified = 0
+    deadline = time.perf_counter() + duration
+
+    async def client_loop(n: int) -> None:
+        nonlocal errors, not_modified
+        rnd = random.Random(n)
+        client = _Client(port, revalidate)
+        # A dashboard keeps polling the same monitor
+        choices = [ids[n % len(ids)]] if revalidate else ids
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    status = await asyncio.wait_for(client.get(_paths(endpoint, choices, rnd)), 60)
+                except (OSError, ValueError, IndexError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    errors += 1
+                    client.close()
+                    continue
+                if status in (200, 304):
+                    latencies.append(time.perf_counter() - started)
+                    not_modified += status == 304
+                else:
+                    errors += 1
+        finally:
+            client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "endpoint": endpoint,
+        "requests": len(latencies),
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "latency_ms": percentiles_ms(latencies),
+        "not_modified": not_modified,
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=500, help="clients, each with its own connection")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per endpoint")
+    parser.add_argument("--warmup", type=float, default=3.0, help="seconds per endpoint before measuring")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--monitors", type=int, default=200)
+    parser.add_argument("--results", type=int, default=500, help="check results per monitor")
+    parser.add_argument(
+        "--revalidate",
+        action="store_true",
+        help="poll like dashboards: one monitor per client, last ETag sent as If-None-Match (304s count as served)",
+    )
+    parser.add_argument("--app-dir", type=Path, default=Path.cwd(), help="checkout to run the API from")
+    parser.add_argument("--out", type=Path, help="write the report here (JSON)")
+    parser.add_argument("--compare", type=Path, help="earlier report to compare against")
+    args = parser.parse_args()
+
+    init_db()
+    require_scratch_db()
+    report = new_report(args)
+    ids = seed(args.monitors, args.results)
+    port = _free_port()
+    api = _start_api(args.app_dir.resolve(), port)
+    try:
+        for endpoint in args.endpoints:
+            asyncio.run(_load(port, endpoint, ids, min(args.concurrency, 50), args.warmup, args.revalidate))
+            run = asyncio.run(_load(port, endpoint, ids, args.concurrency, args.duration, args.revalidate))
+            report["runs"].append(run)
+            print(
+                f"{endpoint:<14} {run['requests_per_sec']:>8} req/s  "
+                f"p50/p99 {run['latency_ms']['p50']}/{run['latency_ms']['p99']} ms  "
+                f"{run['not_modified']} not modified  {run['errors']} errors"
+            )
+    finally:
+        api.terminate()
+        try:
+            api.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            # Still draining requests it can't finish
+            api.kill()
+            api.wait()
+        cleanup()
+
+    save_report(report, args.out)
+    if args.compare:
+        compare(report, args.compare, "endpoint", _HEADLINE)
+
+
+if __name__ == "__main__":
+    main()
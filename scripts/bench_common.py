@@ -0,0 +1,95 @@
+"""
+Reporting helpers shared by the bench_*.py scripts: percentiles, the JSON
+report (tagged with the git commit) and --compare against an earlier one.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import func, select
+
+from app.db.models import Monitor
+from app.db.session import SessionLocal
+
+
+def percentiles_ms(values: list[float]) -> dict[str, float | None]:
+    """p50/p99 of durations in seconds, as milliseconds."""
+    if not values:
+        return {"p50": None, "p99": None}
+    values = sorted(values)
+
+    def ms(q: float) -> float:
+        return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 2)
+
+    return {"p50": ms(0.50), "p99": ms(0.99)}
+
+
+def require_scratch_db() -> None:
+    """Benchmarks seed and delete their own data; refuse a database that has monitors in use."""
+    db = SessionLocal()
+    try:
+        active = db.scalar(select(func.count()).select_from(Monitor).where(Monitor.is_active.is_(True)))
+    finally:
+        db.close()
+    if active:
+        raise SystemExit(f"{active} active monitors in DATABASE_URL; point it at a scratch database")
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def new_report(args: argparse.Namespace) -> dict:
+    return {
+        "commit": _git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+        "runs": [],
+    }
+
+
+def save_report(report: dict, out: Path | None) -> None:
+    if out:
+        out.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Wrote {out}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+def _metric(run: dict, path: str) -> float | None:
+    value = run
+    for key in path.split("."):
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def compare(report: dict, baseline_path: Path, key: str, headline: dict[str, bool]) -> None:
+    """
+    Print each headline metric against the baseline's run with the same key;
+    headline maps metric path ("lag_ms.p99") -> higher is better. Changes
+    of 10% or more in the wrong direction are flagged.
+    """
+    baseline = json.loads(baseline_path.read_text())
+    print(f"\nvs {baseline.get('commit')} ({baseline.get('created_at')}):")
+    old_runs = {run[key]: run for run in baseline.get("runs", [])}
+    for run in report["runs"]:
+        old = old_runs.get(run[key])
+        if old is None:
+            print(f"  {run[key]}: not in baseline")
+            continue
+        for path, higher_is_better in headline.items():
+            new_value, old_value = _metric(run, path), _metric(old, path)
+            if new_value is None or not old_value:
+                continue
+            change = (new_value - old_value) / old_value * 100
+            worse = change < 0 if higher_is_better else change > 0
+            flag = "  <-- worse" if worse and abs(change) >= 10 else ""
+            print(f"  {run[key]:>8} {path:<16} {old_value:>10} -> {new_value:<10} {change:+6.1f}%{flag}")
@@ -0,0 +1,143 @@
+"""
+CheckResult ingestion throughput: per-row writes vs the batched ResultSink.
+
+Seeds throwaway monitors, writes the same synthetic results through each
+path against DATABASE_URL, prints rows/sec, then deletes everything it made.
+
+    PYTHONPATH=. python scripts/bench_ingest.py --rows 20000 --monitors 500
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import delete
+
+from app.db.init_db import init_db
+from app.db.models import CheckResult, Monitor
+from app.db.session import SessionLocal
+from app.services.incident import IncidentTracker, apply_incident_rules
+from app.services.result_sink import ResultSink
+
+
+def _seed_monitors(n: int) -> list[Monitor]:
+    db = SessionLocal()
+    try:
+        monitors = [
+            Monitor(name=f"bench-ingest-{i}", url="http://127.0.0.1:9/", interval_sec=60)
+            for i in range(n)
+        ]
+        db.add_all(monitors)
+        db.commit()
+        for m in monitors:
+            db.refresh(m)
+        db.expunge_all()
+        return monitors
+    finally:
+        db.close()
+
+
+def _cleanup(monitors: list[Monitor]) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(delete(Monitor).where(Monitor.id.in_([m.id for m in monitors])))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _results(monitors: list[Monitor], rows: int) -> list[tuple[Monitor, CheckResult]]:
+    rnd = random.Random(42)
+    out = []
+    for i in range(rows):
+        monitor = monitors[i % len(monitors)]
+        success = rnd.random() > 0.05
+        out.append(
+            (
+                monitor,
+                CheckResult(
+                    monitor_id=monitor.id,
+                    checked_at=datetime.now(timezone.utc),
+                    success=success,
+                    status_code=200 if success else 500,
+                    latency_ms=rnd.randint(5, 400),
+                    error_type=None if success else "HTTP_UNEXPECTED",
+                    error_message=None if success else "Expected 200 got 500",
+                ),
+            )
+        )
+    return out
+
+
+def bench_per_row_locked(items) -> float:
+    """check-now path: one transaction per row, state read under FOR UPDATE, refresh."""
+    start = time.perf_counter()
+    for _, result in items:
+        db = SessionLocal()
+        try:
+            apply_incident_rules(db, result)
+            db.refresh(result)
+        finally:
+            db.close()
+    return time.perf_counter() - start
+
+
+def bench_per_row_tracker(items) -> float:
+    """Worker without a sink: one transaction per row, in-memory incident state."""
+    tracker = IncidentTracker()
+    start = time.perf_counter()
+    for _, result in items:
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            tracker.record(db, result)
+        finally:
+            db.close()
+    return time.perf_counter() - start
+
+
+async def _sink_run(items, method: str, batch: int) -> float:
+    sink = ResultSink(method=method, max_batch=batch, max_pending=len(items) + 1)
+    start = time.perf_counter()
+    sink.start()
+    for monitor, result in items:
+        await sink.submit(monitor, result)
+    await sink.close()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--monitors", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--per-row-rows", type=int, default=2000, help="rows for the (slow) per-row paths")
+    args = parser.parse_args()
+
+    init_db()
+
+    report = {}
+    cases = [
+        ("per_row_check_now", args.per_row_rows, bench_per_row_locked),
+        ("per_row_tracker", args.per_row_rows, bench_per_row_tracker),
+        ("sink_insert", args.rows, lambda items: asyncio.run(_sink_run(items, "insert", args.batch))),
+        ("sink_copy", args.rows, lambda items: asyncio.run(_sink_run(items, "copy", args.batch))),
+    ]
+    for name, rows, fn in cases:
+        monitors = _seed_monitors(args.monitors)
+        try:
+            elapsed = fn(_results(monitors, rows))
+        finally:
+            _cleanup(monitors)
+        report[name] = {"rows": rows, "seconds": round(elapsed, 3), "rows_per_sec": round(rows / elapsed)}
+        print(f"{name:<20} {rows:>8} rows {elapsed:8.2f}s {rows / elapsed:>10.0f} rows/s")
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
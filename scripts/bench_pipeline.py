@@ -0,0 +1,256 @@
+"""
+Load test of the worker's check pipeline against a local stub target.
+
+For each --monitors size: starts scripts/stub_target.py, seeds that many
+monitors against it, runs Scheduler -> AsyncCheckExecutor -> ResultSink (as
+worker_main does) in a fresh process for --warmup + --duration seconds, and
+reports, over the --duration window:
+
+- checks/sec, and p50/p99 scheduling lag (start of the check vs its tick)
+- p50/p99 per-check overhead: check time (dispatch to handed to the sink)
+  minus the target's time to first byte, i.e. what the pipeline adds
+- check_results rows/sec actually written, over the whole run
+- peak RSS of the pipeline process
+
+Results go to --out as JSON (with the git commit); --compare prints the
+change against an earlier file. Needs a scratch database: it refuses to run
+if DATABASE_URL has active monitors, and deletes what it seeded.
+
+    PYTHONPATH=. python scripts/bench_pipeline.py --monitors 1000 10000 50000 --out bench.json
+    PYTHONPATH=. python scripts/bench_pipeline.py --monitors 1000 --compare bench.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import resource
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import delete, func, insert, select
+
+from app.core.config import settings
+from app.db.init_db import init_db
+from app.db.models import CheckResult, Monitor
+from app.db.session import SessionLocal
+from app.services.schedule_phase import PhasePlanner
+from scripts.bench_common import compare, new_report, percentiles_ms, require_scratch_db, save_report
+from scripts.stub_target import add_arguments as add_stub_arguments
+
+NAME_PREFIX = "bench-pipeline-"
+
+# Compared by --compare: metric -> higher is better
+_HEADLINE = {
+    "checks_per_sec": True,
+    "lag_ms.p50": False,
+    "lag_ms.p99": False,
+    "overhead_ms.p50": False,
+    "overhead_ms.p99": False,
+    "db_rows_per_sec": True,
+    "peak_rss_mb": False,
+}
+
+
+# ----------------------------
+# Stub target and seed data
+# ----------------------------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_stub(args: argparse.Namespace, port: int) -> subprocess.Popen:
+    script = Path(__file__).with_name("stub_target.py")
+    stub = subprocess.Popen(
+        [
+            sys.executable, str(script), "--port", str(port),
+            "--latency-ms", str(args.latency_ms), "--latency-sigma", str(args.latency_sigma),
+            "--error-rate", str(args.error_rate), "--timeout-rate", str(args.timeout_rate),
+            "--seed", str(args.seed),
+        ]
+    )
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return stub
+        except OSError:
+            time.sleep(0.1)
+    stub.kill()
+    raise SystemExit("stub target didn't start")
+
+
+def _seed(n: int, port: int, args: argparse.Namespace) -> None:
+    """n monitors, phased across the interval like ones created through the API."""
+    now = datetime.now(timezone.utc)
+    planner = PhasePlanner()
+    rows = []
+    for i in range(n):
+        monitor_id = uuid.uuid4()
+        rows.append(
+            {
+                "id": monitor_id,
+                "name": f"{NAME_PREFIX}{i}",
+                "url": f"http://127.0.0.1:{port}/m/{i}",
+                "method": "GET",
+                "expected_status": 200,
+                "interval_sec": args.interval,
+                "timeout_ms": args.timeout_ms,
+                "max_attempts": args.max_attempts,
+                "retry_backoff_ms": 500,
+                "is_active": True,
+                "next_run_at": planner.assign(monitor_id, args.interval, now),
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+    db = SessionLocal()
+    try:
+        for start in range(0, n, 5000):
+            db.execute(insert(Monitor.__table__), rows[start : start + 5000])
+        db.commit()
+    finally:
+        db.close()
+
+
+def _cleanup() -> None:
+    db = SessionLocal()
+    try:
+        db.execute(delete(Monitor).where(Monitor.name.startswith(NAME_PREFIX)))
+        db.commit()
+    finally:
+        db.close()
+
+
+# ----------------------------
+# Pipeline (runs in a fresh process per size)
+# ----------------------------
+async def _pipeline(args: argparse.Namespace) -> dict:
+    # Imported here: the parent never starts a pipeline
+    from app.services.checker import AsyncCheckExecutor
+    from app.services.result_sink import ResultSink
+    from app.services.scheduler import Scheduler
+
+    loop = asyncio.get_running_loop()
+    lags: list[float] = []
+    overheads: list[float] = []
+    outcomes: Counter[str] = Counter()
+
+    sink = ResultSink()
+    sink.start()
+    executor = AsyncCheckExecutor(max_inflight=args.concurrency, max_per_host=args.max_per_host, sink=sink)
+
+    started_at = datetime.now(timezone.utc)
+    window_start = loop.time() + args.warmup
+    window_end = window_start + args.duration
+
+    async def timed_check(monitor: Monitor) -> CheckResult:
+        started = loop.time()
+        due = monitor.next_run_at - timedelta(seconds=monitor.interval_sec)
+        lag = max(0.0, (datetime.now(timezone.utc) - due).total_seconds())
+        result = await executor.run(monitor)
+        if window_start <= started < window_end:
+            lags.append(lag)
+            outcomes[result.error_type or "OK"] += 1
+            if result.ttfb_ms is not None:
+                overheads.append(loop.time() - started - result.ttfb_ms / 1000.0)
+        return result
+
+    scheduler = Scheduler(timed_check)
+    run = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(args.warmup + args.duration)
+    scheduler.stop()
+    await run
+    await executor.aclose()
+    await sink.close()
+    elapsed = (datetime.now(timezone.utc) - started_at).total_seconds()
+
+    db = SessionLocal()
+    try:
+        rows = db.scalar(select(func.count()).select_from(CheckResult).where(CheckResult.checked_at >= started_at))
+    finally:
+        db.close()
+
+    checks = sum(outcomes.values())
+    return {
+        "checks": checks,
+        "checks_per_sec": round(checks / args.duration, 1),
+        "outcomes": dict(outcomes),
+        "lag_ms": percentiles_ms(lags),
+        "overhead_ms": percentiles_ms(overheads),
+        "db_rows": rows,
+        "db_rows_per_sec": round(rows / elapsed, 1),
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def _run_pipeline(args: argparse.Namespace) -> dict:
+    return asyncio.run(_pipeline(args))
+
+
+def _run_size(args: argparse.Namespace, n: int) -> dict:
+    port = _free_port()
+    stub = _start_stub(args, port)
+    try:
+        _seed(n, port, args)
+        # A fresh process per size, so peak RSS is this run's alone
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            report = pool.submit(_run_pipeline, args).result()
+    finally:
+        stub.terminate()
+        stub.wait()
+        _cleanup()
+    return {"monitors": n, **report}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--monitors", type=int, nargs="+", default=[1000], help="sizes to run, like 1000 10000 50000")
+    parser.add_argument("--duration", type=float, default=60.0, help="measured seconds per size")
+    parser.add_argument("--warmup", type=float, default=10.0, help="seconds run before measuring")
+    parser.add_argument("--interval", type=int, default=30, help="interval_sec of the seeded monitors")
+    parser.add_argument("--timeout-ms", type=int, default=2000)
+    parser.add_argument("--max-attempts", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=settings.check_max_inflight, help="as worker --concurrency")
+    parser.add_argument(
+        "--max-per-host",
+        type=int,
+        default=0,
+        help="per-origin cap; every seeded monitor shares the stub's origin, so off by default",
+    )
+    add_stub_arguments(parser)
+    parser.add_argument("--out", type=Path, help="write the report here (JSON)")
+    parser.add_argument("--compare", type=Path, help="earlier report to compare against")
+    args = parser.parse_args()
+
+    init_db()
+    require_scratch_db()
+
+    report = new_report(args)
+    for n in args.monitors:
+        run = _run_size(args, n)
+        report["runs"].append(run)
+        print(
+            f"{n:>6} monitors {run['checks_per_sec']:>8} checks/s  "
+            f"lag p50/p99 {run['lag_ms']['p50']}/{run['lag_ms']['p99']} ms  "
+            f"overhead p50/p99 {run['overhead_ms']['p50']}/{run['overhead_ms']['p99']} ms  "
+            f"{run['db_rows_per_sec']} rows/s  {run['peak_rss_mb']} MB"
+        )
+
+    save_report(report, args.out)
+    if args.compare:
+        compare(report, args.compare, "monitors", _HEADLINE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Micro-benchmark of the list endpoints' per-row cost: ORM objects validated
+through the response model (what FastAPI does with response_model) against
+crud's projected rows rendered by FastJSONResponse.
+
+Seeds like bench_api.py, then for each list query times fetch (query +
+building objects or rows) and serialize (to response bytes) separately,
+--repeat times in process, and reports medians per page and per row. No
+HTTP: these are the costs that grow with the page size.
+
+    PYTHONPATH=. python scripts/bench_serialize.py --rows 500 --out serialize.json
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+
+from app.api.responses import FastJSONResponse, row_dicts
+from app.db import crud
+from app.db.init_db import init_db
+from app.db.models import CheckResult, Incident, Monitor
+from app.db.session import SessionLocal
+from app.schemas.incident import IncidentOut
+from app.schemas.monitor import MonitorOut
+from app.schemas.result import CheckResultListOut
+from scripts.bench_api import cleanup, seed
+from scripts.bench_common import compare, new_report, require_scratch_db, save_report
+
+# Compared by --compare: metric -> higher is better
+_HEADLINE = {
+    "after_us_per_row.total": False,
+    "speedup": True,
+}
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    """Median seconds of fn() over repeat runs, and its last result."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times), result
+
+
+def _validated(adapter: TypeAdapter, content: Any) -> bytes:
+    """FastAPI's response_model path: validate from attributes, dump to JSON types, render."""
+    return JSONResponse(adapter.dump_python(adapter.validate_python(content, from_attributes=True), mode="json")).body
+
+
+def _case(
+    db: Session,
+    name: str,
+    projected: Select,
+    model,
+    adapter: TypeAdapter,
+    wrap: Callable[[list], Any],
+    repeat: int,
+) -> dict:
+    """
+    before: the same query selecting the ORM entity, validated through adapter
+    after: the projected query as rows, rendered by FastJSONResponse
+    """
+    entity = projected.with_only_columns(model)
+
+    def fetch_objects() -> list:
+        objects = list(db.scalars(entity))
+        db.expunge_all()  # a fresh identity map each run, as each request gets
+        return objects
+
+    fetch_before, objects = _time(fetch_objects, repeat)
+    serialize_before, body_before = _time(lambda: _validated(adapter, wrap(objects)), repeat)
+    fetch_after, rows = _time(lambda: list(db.execute(projected)), repeat)
+    serialize_after, body_after = _time(lambda: FastJSONResponse(wrap(row_dicts(rows))).body, repeat)
+    if body_before != body_after:
+        raise SystemExit(f"{name}: responses differ")
+
+    n = len(rows)
+
+    def per_row(fetch: float, serialize: float) -> dict[str, float]:
+        return {
+            "fetch": round(fetch / n * 1e6, 2),
+            "serialize": round(serialize / n * 1e6, 2),
+            "total": round((fetch + serialize) / n * 1e6, 2),
+        }
+
+    before_total, after_total = fetch_before + serialize_before, fetch_after + serialize_after
+    return {
+        "case": name,
+        "rows": n,
+        "before_ms_per_page": round(before_total * 1000, 2),
+        "after_ms_per_page": round(after_total * 1000, 2),
+        "before_us_per_row": per_row(fetch_before, serialize_before),
+        "after_us_per_row": per_row(fetch_after, serialize_after),
+        "speedup": round(before_total / after_total, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500, help="rows per page (results and incidents cap at 500)")
+    parser.add_argument("--repeat", type=int, default=30, help="runs per measurement; medians are reported")
+    parser.add_argument("--out", type=Path, help="write the report here (JSON)")
+    parser.add_argument("--compare", type=Path, help="earlier report to compare against")
+    args = parser.parse_args()
+
+    init_db()
+    require_scratch_db()
+    report = new_report(args)
+    ids = seed(args.rows, args.rows)
+    db = SessionLocal()
+    try:
+        results_q, limit = crud.results_query(ids[0], limit=args.rows)
+        cases = [
+            (
+                "results",
+                results_q.limit(limit),
+                CheckResult,
+                TypeAdapter(CheckResultListOut),
+                lambda items: {"results": items, "next_cursor": None},
+            ),
+            ("incidents", crud.incidents_query(limit=args.rows), Incident, TypeAdapter(list[IncidentOut]), list),
+            ("monitors", crud.monitors_query(), Monitor, TypeAdapter(list[MonitorOut]), list),
+        ]
+        for name, q, model, adapter, wrap in cases:
+            run = _case(db, name, q, model, adapter, wrap, args.repeat)
+            report["runs"].append(run)
+            before, after = run["before_us_per_row"], run["after_us_per_row"]
+            print(
+                f"{name:<10} {run['rows']:>5} rows  "
+                f"{run['before_ms_per_page']:>8} -> {run['after_ms_per_page']:<8} ms/page  "
+                f"per row fetch {before['fetch']} -> {after['fetch']} us, "
+                f"serialize {before['serialize']} -> {after['serialize']} us  ({run['speedup']}x)"
+            )
+    finally:
+        db.close()
+        cleanup()
+
+    save_report(report, args.out)
+    if args.compare:
+        compare(report, args.compare, "case", _HEADLINE)
+
+
+if __name__ == "__main__":
+    main()
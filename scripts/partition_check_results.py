@@ -0,0 +1,69 @@
+"""
+Convert an existing (unpartitioned) check_results table into the
+partitioned layout.
+
+The old table is renamed to check_results_legacy and attached as the
+partition for everything before the next partition boundary, so no rows
+are copied; new partitions are created after it. The legacy partition is
+dropped by the normal retention job once its upper bound expires.
+
+The old table's primary key is rebuilt as (id, checked_at) under an
+exclusive lock, which takes a while on a big table: stop the API and
+worker first.
+
+    PYTHONPATH=. python scripts/partition_check_results.py
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db import partitions
+from app.db.models import CheckResult
+from app.db.session import engine
+
+LEGACY = f"{partitions.PARENT}_legacy"
+
+
+def main() -> None:
+    with engine.begin() as conn:
+        partitions.lock(conn)
+        exists = conn.execute(text("SELECT to_regclass(:t) IS NOT NULL"), {"t": partitions.PARENT}).scalar()
+        if not exists or partitions.is_partitioned(conn):
+            print(f"{partitions.PARENT} is missing or already partitioned; nothing to do")
+            return
+
+        conn.execute(text(f"LOCK TABLE {partitions.PARENT} IN ACCESS EXCLUSIVE MODE"))
+        conn.execute(text(f"ALTER TABLE {partitions.PARENT} RENAME TO {LEGACY}"))
+
+        # Index names are schema-wide; free them up for the new parent
+        indexes = conn.execute(text("SELECT indexname FROM pg_indexes WHERE tablename = :t"), {"t": LEGACY}).scalars()
+        for name in list(indexes):
+            conn.execute(text(f"ALTER INDEX {name} RENAME TO {name}_legacy"))
+
+        # A partition's primary key has to include the partition key
+        pkey = conn.execute(
+            text("SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:t) AND contype = 'p'"), {"t": LEGACY}
+        ).scalar()
+        conn.execute(text(f"ALTER TABLE {LEGACY} DROP CONSTRAINT {pkey}"))
+        conn.execute(text(f"ALTER TABLE {LEGACY} ADD PRIMARY KEY (id, checked_at)"))
+
+        CheckResult.__table__.create(conn)
+
+        days = settings.results_partition_days
+        upper = partitions.partition_start(datetime.now(timezone.utc), days) + timedelta(days=days)
+        conn.execute(
+            text(
+                f"ALTER TABLE {partitions.PARENT} ATTACH PARTITION {LEGACY} "
+                f"FOR VALUES FROM (MINVALUE) TO ('{upper.isoformat()}')"
+            )
+        )
+        created = partitions.ensure_partitions(conn)
+
+    print(f"Attached {LEGACY} for checked_at < {upper.isoformat()}; created {', '.join(created) or 'no partitions'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Re-phase every active monitor across its interval.
+
+Monitors created before phase planning all started on their creation time,
+so a bulk import leaves them checking in the same second. This spreads them
+like new monitors are (services/schedule_phase.py); each one's next run
+moves by less than one interval. Safe to run with the worker up.
+
+    PYTHONPATH=. python scripts/rebalance_schedule.py
+"""
+from __future__ import annotations
+
+import argparse
+import math
+from collections import Counter
+from datetime import datetime, timezone
+
+from sqlalchemy import bindparam, select, update
+
+from app.db.init_db import init_db
+from app.db.models import Monitor
+from app.db.session import SessionLocal
+from app.services.monitor_cache import notify_changed
+from app.services.schedule_phase import PhasePlanner
+
+_table = Monitor.__table__
+
+
+def _busiest_second(rows: list[tuple[datetime, int]], horizon_sec: int) -> int:
+    """Most checks due in one second over the next horizon_sec, from (next_run_at, interval_sec)."""
+    now = datetime.now(timezone.utc).timestamp()
+    seconds: Counter[int] = Counter()
+    for next_run_at, interval_sec in rows:
+        t = next_run_at.timestamp()
+        if t < now:
+            t += math.ceil((now - t) / interval_sec) * interval_sec  # skipped ticks, as a claim would
+        while t < now + horizon_sec:
+            seconds[int(t)] += 1
+            t += interval_sec
+    return max(seconds.values(), default=0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="report the spread without writing")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        monitors = db.execute(
+            select(_table.c.id, _table.c.interval_sec, _table.c.next_run_at)
+            .where(_table.c.is_active.is_(True))
+            .order_by(_table.c.id)
+        ).all()
+
+        now = datetime.now(timezone.utc)
+        planner = PhasePlanner()
+        params = [
+            {"b_id": m.id, "b_next_run_at": planner.assign(m.id, m.interval_sec, now)}
+            for m in monitors
+        ]
+        # One full cycle of the longest interval, up to 10 minutes
+        horizon = min(max((m.interval_sec for m in monitors), default=0), 600)
+        before = _busiest_second([(m.next_run_at, m.interval_sec) for m in monitors], horizon)
+        after = _busiest_second([(p["b_next_run_at"], m.interval_sec) for p, m in zip(params, monitors)], horizon)
+
+        if not args.dry_run and params:
+            db.execute(
+                update(_table)
+                .where(_table.c.id == bindparam("b_id"))
+                .values(next_run_at=bindparam("b_next_run_at"), updated_at=_table.c.updated_at),
+                params,
+            )
+            notify_changed(db, None)
+            db.commit()
+    finally:
+        db.close()
+
+    verb = "Would re-phase" if args.dry_run else "Re-phased"
+    print(f"{verb} {len(params)} monitors; busiest second: {before} checks before, {after} after")
+
+
+if __name__ == "__main__":
+    main()
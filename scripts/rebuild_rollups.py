@@ -0,0 +1,37 @@
+"""
+Rebuild check_rollups_minute / check_rollups_hour from check_results.
+
+Use after upgrading (results written before rollups existed aren't in any
+bucket) or to repair them. Stop the worker first.
+
+    PYTHONPATH=. python scripts/rebuild_rollups.py --window 30d
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+
+from app.db.crud import _parse_window
+from app.db.init_db import init_db
+from app.db.session import SessionLocal
+from app.services.summary import rebuild_rollups
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--window", default="30d", help="how far back to rebuild, like 24h, 7d, 60m")
+    args = parser.parse_args()
+
+    init_db()
+    since = datetime.now(timezone.utc) - _parse_window(args.window)
+
+    db = SessionLocal()
+    try:
+        rows = rebuild_rollups(db, since)
+    finally:
+        db.close()
+    print(f"Rebuilt rollups from {rows} check results since {since.isoformat()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Local HTTP target for load tests (see bench_pipeline.py) and manual checks.
+
+Every request is answered after a log-normal delay around --latency-ms;
+--error-rate of requests get a 500, and --timeout-rate of the paths never
+answer (a down host: the same paths every run, so retries time out too).
+/status/<code> answers <code> right away. Keep-alive, HTTP/1.1 only.
+
+    PYTHONPATH=. python scripts/stub_target.py --port 18080 --latency-ms 50 --error-rate 0.02
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import math
+import random
+from dataclasses import dataclass
+
+_REASONS = {200: b"OK", 500: b"Internal Server Error"}
+
+
+@dataclass(frozen=True)
+class StubConfig:
+    latency_ms: float = 20.0  # median delay before answering
+    latency_sigma: float = 0.5  # log-normal spread; 0 = always latency_ms
+    error_rate: float = 0.0  # share of requests answered with a 500
+    timeout_rate: float = 0.0  # share of paths that never answer
+    hang_sec: float = 300.0  # how long a never-answering path holds the connection
+    seed: int = 42
+
+
+class StubTarget:
+    def __init__(self, config: StubConfig) -> None:
+        self.config = config
+        self._rnd = random.Random(config.seed)
+
+    def _hangs(self, path: str) -> bool:
+        digest = hashlib.md5(f"{self.config.seed}:{path}".encode()).digest()
+        return int.from_bytes(digest[:4], "big") / 2**32 < self.config.timeout_rate
+
+    def _plan(self, path: str) -> tuple[float, int | None]:
+        """(delay in seconds, status); status None never answers."""
+        if path.startswith("/status/"):
+            try:
+                return 0.0, int(path.split("/")[2])
+            except ValueError:
+                return 0.0, 400
+        if self._hangs(path):
+            return self.config.hang_sec, None
+
+        delay = 0.0
+        if self.config.latency_ms > 0:
+            delay = self._rnd.lognormvariate(math.log(self.config.latency_ms), self.config.latency_sigma) / 1000.0
+        status = 500 if self._rnd.random() < self.config.error_rate else 200
+        return delay, status
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                keep_alive = True
+                length = 0
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.partition(b":")
+                    name, value = name.strip().lower(), value.strip().lower()
+                    if name == b"connection" and value == b"close":
+                        keep_alive = False
+                    elif name == b"content-length":
+                        length = int(value)
+                if length:
+                    await reader.readexactly(length)
+
+                method, path, *_ = request_line.decode("latin-1").split()
+                delay, status = self._plan(path)
+                if delay:
+                    await asyncio.sleep(delay)
+                if status is None:
+                    break
+
+                body = b"" if method == "HEAD" else b"ok"
+                writer.write(
+                    b"HTTP/1.1 %d %s\r\nContent-Length: 2\r\nContent-Type: text/plain\r\n%s\r\n%s"
+                    % (status, _REASONS.get(status, b"Status"), b"" if keep_alive else b"Connection: close\r\n", body)
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(config: StubConfig, host: str, port: int) -> None:
+    server = await asyncio.start_server(StubTarget(config).handle, host, port, backlog=4096)
+    async with server:
+        await server.serve_forever()
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """The StubConfig options; bench_pipeline.py passes them through."""
+    defaults = StubConfig()
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms, help="median target delay")
+    parser.add_argument("--latency-sigma", type=float, default=defaults.latency_sigma, help="log-normal spread")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="share of 500 answers")
+    parser.add_argument("--timeout-rate", type=float, default=defaults.timeout_rate, help="share of paths that hang")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def config_from_args(args: argparse.Namespace) -> StubConfig:
+    return StubConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18080)
+    add_arguments(parser)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(config_from_args(args), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
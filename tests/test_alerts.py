@@ -0,0 +1,134 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+from sqlalchemy import insert, select
+
+from app.db.models import AlertOutbox
+from app.services import alerts
+from app.services.alerts import DEFAULT_RETRY_AFTER_SEC, AlertDispatcher, _claim, _retry_after_sec
+
+PAYLOAD = {
+    "check_id": "c",
+    "checked_at": None,
+    "status_code": None,
+    "latency_ms": None,
+    "error_type": "TIMEOUT",
+    "error_message": None,
+}
+
+
+def _queue(db, monitor, *, created_at: datetime, next_attempt_at: datetime) -> uuid.UUID:
+    alert_id = uuid.uuid4()
+    db.execute(
+        insert(AlertOutbox.__table__),
+        {
+            "id": alert_id,
+            "monitor_id": monitor.id,
+            "incident_id": uuid.uuid4(),
+            "transition": "OPENED",
+            "payload": PAYLOAD,
+            "status": alerts.STATUS_PENDING,
+            "attempts": 0,
+            "next_attempt_at": next_attempt_at,
+            "created_at": created_at,
+        },
+    )
+    db.commit()
+    return alert_id
+
+
+def _row(db, alert_id: uuid.UUID) -> AlertOutbox:
+    db.expire_all()
+    return db.scalars(select(AlertOutbox).where(AlertOutbox.id == alert_id)).one()
+
+
+# ----------------------------
+# Retry-After
+# ----------------------------
+def _response(retry_after: str | None) -> httpx.Response:
+    headers = {"Retry-After": retry_after} if retry_after is not None else {}
+    return httpx.Response(429, headers=headers)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("120", 120.0),
+        ("1.5", 1.5),
+        ("-3", 0.0),
+        (None, DEFAULT_RETRY_AFTER_SEC),
+        ("", DEFAULT_RETRY_AFTER_SEC),
+        ("soon", DEFAULT_RETRY_AFTER_SEC),
+    ],
+)
+def test_retry_after_seconds(value, expected):
+    assert _retry_after_sec(_response(value)) == expected
+
+
+def test_retry_after_http_date():
+    later = datetime.now(timezone.utc) + timedelta(seconds=90)
+    assert 85 <= _retry_after_sec(_response(format_datetime(later, usegmt=True))) <= 90
+
+    earlier = datetime.now(timezone.utc) - timedelta(minutes=5)
+    assert _retry_after_sec(_response(format_datetime(earlier, usegmt=True))) == 0.0
+
+
+# ----------------------------
+# Outbox claims
+# ----------------------------
+def test_claim_keeps_per_monitor_order(db, make_monitor):
+    retrying, other = make_monitor(), make_monitor()
+    now = datetime.now(timezone.utc)
+
+    # An earlier alert backing off holds back the monitor's later, due one
+    first = _queue(db, retrying, created_at=now - timedelta(minutes=2), next_attempt_at=now + timedelta(minutes=5))
+    second = _queue(db, retrying, created_at=now - timedelta(minutes=1), next_attempt_at=now - timedelta(minutes=1))
+    unrelated = _queue(db, other, created_at=now - timedelta(minutes=1), next_attempt_at=now - timedelta(minutes=1))
+
+    claimed = {a.id: a for a in _claim(1000)}
+    assert unrelated in claimed
+    assert first not in claimed and second not in claimed
+    assert claimed[unrelated].attempts == 1
+
+    # Leased: pushed past now, so a second claim doesn't see it
+    assert _row(db, unrelated).next_attempt_at > now
+    assert unrelated not in {a.id for a in _claim(1000)}
+
+
+def test_rate_limited_batch_is_rescheduled_without_an_attempt(db, make_monitor):
+    now = datetime.now(timezone.utc)
+    ids = [
+        _queue(db, make_monitor(), created_at=now - timedelta(minutes=3 - i), next_attempt_at=now - timedelta(minutes=1))
+        for i in range(3)
+    ]
+    claimed = [a for a in _claim(1000) if a.id in ids]
+    assert [a.id for a in claimed] == ids  # delivered in queue order
+
+    responses = iter([httpx.Response(200), httpx.Response(429, headers={"Retry-After": "60"})])
+    sent: list[httpx.Request] = []
+
+    def slack(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        return next(responses)
+
+    async def deliver() -> None:
+        dispatcher = AlertDispatcher()
+        dispatcher.stop()  # don't actually pause for Retry-After
+        dispatcher._client = httpx.AsyncClient(transport=httpx.MockTransport(slack))
+        async with dispatcher._client:
+            await dispatcher._deliver("https://hooks.slack.invalid/x", claimed)
+
+    asyncio.run(deliver())
+
+    assert len(sent) == 2  # the third never went out
+    assert _row(db, ids[0]).status == alerts.STATUS_SENT
+    for alert_id in ids[1:]:
+        row = _row(db, alert_id)
+        assert row.status == alerts.STATUS_PENDING
+        assert row.attempts == 0  # the claim's attempt was given back
+        assert row.last_error == "429 rate limited"
+        assert timedelta(seconds=55) < row.next_attempt_at - now < timedelta(seconds=65)
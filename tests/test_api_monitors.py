@@ -0,0 +1,211 @@
+import json
+import threading
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import delete, select
+
+from app.db.models import CheckResult, Monitor
+from app.services.incident import apply_incident_rules
+from app.services.response_cache import not_modified
+from app.services.schedule_phase import phase_of
+
+HEADERS = {"X-API-Key": "change-me"}
+
+
+def _check(db, monitor) -> None:
+    result = CheckResult(monitor_id=monitor.id, checked_at=datetime.now(timezone.utc), success=True, latency_ms=12)
+    apply_incident_rules(db, result)
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, False),
+        ('W/"abc-1"', True),
+        ('"abc-1"', True),  # weak comparison
+        ('W/"abc-0", W/"abc-1"', True),
+        ("*", True),
+        ('W/"abc-2"', False),
+    ],
+)
+def test_if_none_match(header, expected):
+    request = SimpleNamespace(headers={"if-none-match": header} if header else {})
+    assert not_modified(request, 'W/"abc-1"') is expected
+
+
+@pytest.mark.parametrize("path", ["results", "summary?window=1h"])
+def test_revalidation(client, db, make_monitor, path):
+    monitor = make_monitor()
+    _check(db, monitor)
+    url = f"/api/v1/monitors/{monitor.id}/{path}"
+
+    first = client.get(url, headers=HEADERS)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    again = client.get(url, headers={**HEADERS, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["ETag"] == etag
+
+    # A new result moves the version: the old tag no longer matches
+    _check(db, monitor)
+    changed = client.get(url, headers={**HEADERS, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json() != first.json()
+
+
+# ----------------------------
+# Bulk operations
+# ----------------------------
+@pytest.fixture
+def bulk(client, db):
+    """POSTs to /monitors/bulk; every monitor it created is deleted afterwards."""
+    created: list[uuid.UUID] = []
+
+    def post(body, ndjson: bool = False) -> dict:
+        if ndjson:
+            response = client.post(
+                "/api/v1/monitors/bulk",
+                content=body,
+                headers={**HEADERS, "Content-Type": "application/x-ndjson"},
+            )
+        else:
+            response = client.post("/api/v1/monitors/bulk", json=body, headers=HEADERS)
+        assert response.status_code == 200
+        out = response.json()
+        created.extend(uuid.UUID(r["id"]) for r in out["results"] if r["status"] == "created")
+        return out
+
+    yield post
+    db.execute(delete(Monitor).where(Monitor.id.in_(created)))
+    db.commit()
+
+
+def test_bulk_applies_items_in_order(bulk, db):
+    name = f"bulk-{uuid.uuid4()}"
+    url = "http://127.0.0.1:9/bulk"
+    out = bulk(
+        [
+            {"op": "create", "name": name, "url": url},
+            {"op": "upsert", "name": name, "url": url, "interval_sec": 120},  # sees the create above
+            {"op": "create", "name": name, "url": "not a url"},
+            {"op": "update", "id": str(uuid.uuid4()), "timeout_ms": 500},
+        ]
+    )
+    results = out["results"]
+    assert [r["status"] for r in results] == ["created", "updated", "error", "not_found"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert results[1]["id"] == results[0]["id"]
+    assert results[2]["error"].startswith("create.url:")
+    assert out["counts"] == {"created": 1, "updated": 1, "error": 1, "not_found": 1}
+
+    monitor = db.get(Monitor, uuid.UUID(results[0]["id"]))
+    assert monitor.interval_sec == 120
+
+    out = bulk([{"op": "deactivate", "id": results[0]["id"]}, {"op": "deactivate", "id": results[0]["id"]}])
+    assert [r["status"] for r in out["results"]] == ["deactivated", "unchanged"]
+    db.refresh(monitor)
+    assert monitor.is_active is False
+
+
+def test_bulk_ndjson_repush_only_writes_changes(bulk, db):
+    prefix = f"bulk-{uuid.uuid4()}"
+    inventory = [{"op": "upsert", "name": f"{prefix}-{i}", "url": f"http://127.0.0.1:9/{i}"} for i in range(3)]
+    body = "\n".join(json.dumps(item) for item in inventory) + "\n{not json\n\n"
+
+    first = bulk(body, ndjson=True)
+    assert [r["status"] for r in first["results"]] == ["created"] * 3 + ["error"]
+    assert first["results"][3]["error"].startswith("Invalid JSON")
+
+    inventory[1]["timeout_ms"] = 1500
+    again = bulk("\n".join(json.dumps(item) for item in inventory), ndjson=True)
+    assert [r["status"] for r in again["results"]] == ["unchanged", "updated", "unchanged"]
+    assert [r["id"] for r in again["results"]] == [r["id"] for r in first["results"][:3]]
+    assert db.get(Monitor, uuid.UUID(again["results"][1]["id"])).timeout_ms == 1500
+
+
+def test_bulk_spreads_new_monitors_over_the_interval(bulk, db):
+    prefix = f"bulk-{uuid.uuid4()}"
+    out = bulk(
+        [{"op": "create", "name": f"{prefix}-{i}", "url": "http://127.0.0.1:9/", "interval_sec": 3600} for i in range(5)]
+    )
+    ids = [uuid.UUID(r["id"]) for r in out["results"]]
+    phases = {phase_of(m.next_run_at, 3600) for m in db.scalars(select(Monitor).where(Monitor.id.in_(ids)))}
+    assert len(phases) == 5
+
+
+# ----------------------------
+# Batch check-now
+# ----------------------------
+class _Ok(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def target():
+    """URL of a local HTTP server answering 200."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Ok)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+def _check_now(client, body) -> list[dict]:
+    response = client.post("/api/v1/monitors/check-now", json=body, headers=HEADERS)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_batch_check_now_streams_saved_results(client, db, make_monitor, target):
+    up = make_monitor(url=target)
+    down = make_monitor(max_attempts=1)  # nothing listens on port 9
+    inactive = make_monitor(is_active=False)
+    missing = uuid.uuid4()
+
+    lines = _check_now(client, {"monitor_ids": [str(m) for m in (up.id, down.id, inactive.id, missing)]})
+
+    # Requested ids that can't run come first
+    assert lines[:2] == [
+        {"monitor_id": str(inactive.id), "error": "Monitor is inactive"},
+        {"monitor_id": str(missing), "error": "Monitor not found"},
+    ]
+    results = {line["monitor_id"]: line for line in lines[2:]}
+    assert set(results) == {str(up.id), str(down.id)}
+    assert (results[str(up.id)]["success"], results[str(up.id)]["status_code"]) == (True, 200)
+    assert (results[str(down.id)]["success"], results[str(down.id)]["error_type"]) == (False, "CONNECTION")
+
+    # Each line was saved before it was sent
+    stored = db.scalars(select(CheckResult.monitor_id).where(CheckResult.monitor_id.in_([up.id, down.id]))).all()
+    assert sorted(stored) == sorted([up.id, down.id])
+
+
+def test_batch_check_now_by_prefix(client, make_monitor, target):
+    prefix = f"batch-{uuid.uuid4()}"
+    monitors = [make_monitor(name=f"{prefix}-{i}", url=target) for i in range(3)]
+    make_monitor(name=f"other-{prefix}", url=target)
+
+    lines = _check_now(client, {"name_prefix": prefix})
+    assert sorted(line["monitor_id"] for line in lines) == sorted(str(m.id) for m in monitors)
+    assert all(line["success"] for line in lines)
+
+
+def test_batch_check_now_needs_a_selection(client):
+    response = client.post("/api/v1/monitors/check-now", json={}, headers=HEADERS)
+    assert response.status_code == 400
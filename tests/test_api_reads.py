@@ -0,0 +1,86 @@
+import inspect
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.routing import APIRoute
+
+from app.db.models import CheckResult
+from app.services.incident import apply_incident_rules
+
+HEADERS = {"X-API-Key": "change-me"}
+
+READ_ROUTES = [
+    "/api/v1/monitors",
+    "/api/v1/monitors/{monitor_id}",
+    "/api/v1/monitors/{monitor_id}/results",
+    "/api/v1/monitors/{monitor_id}/summary",
+    "/api/v1/monitors/{monitor_id}/incidents",
+    "/api/v1/incidents",
+    "/api/v1/summary",
+]
+
+
+def _fail(db, monitor, times: int) -> None:
+    now = datetime.now(timezone.utc)
+    for i in range(times):
+        apply_incident_rules(
+            db,
+            CheckResult(
+                monitor_id=monitor.id,
+                checked_at=now - timedelta(seconds=times - i),
+                success=False,
+                error_type="TIMEOUT",
+                error_message="timed out",
+            ),
+        )
+
+
+@pytest.mark.parametrize("path", READ_ROUTES)
+def test_read_routes_run_on_the_event_loop(client, path):
+    # async def endpoints: a request waiting on Postgres doesn't hold a threadpool thread
+    routes = [r for r in client.app.routes if isinstance(r, APIRoute) and r.path == path and "GET" in r.methods]
+    assert len(routes) == 1
+    assert inspect.iscoroutinefunction(routes[0].endpoint)
+
+
+def test_monitor_reads(client, make_monitor):
+    monitor = make_monitor(name="reads")
+
+    listed = client.get("/api/v1/monitors", headers=HEADERS)
+    assert listed.status_code == 200
+    assert str(monitor.id) in {m["id"] for m in listed.json()}
+
+    one = client.get(f"/api/v1/monitors/{monitor.id}", headers=HEADERS)
+    assert one.status_code == 200
+    assert (one.json()["id"], one.json()["name"]) == (str(monitor.id), "reads")
+
+
+@pytest.mark.parametrize("path", ["", "/results", "/summary", "/incidents"])
+def test_unknown_monitor_is_404(client, path):
+    response = client.get(f"/api/v1/monitors/{uuid.uuid4()}{path}", headers=HEADERS)
+    assert response.status_code == 404
+
+
+def test_incident_reads(client, db, make_monitor):
+    monitor = make_monitor()
+    _fail(db, monitor, 3)
+
+    incidents = client.get(f"/api/v1/monitors/{monitor.id}/incidents", headers=HEADERS).json()
+    assert [(i["status"], i["failure_count"]) for i in incidents] == [("OPEN", 3)]
+
+    open_ones = client.get("/api/v1/incidents?status=open&limit=500", headers=HEADERS).json()
+    assert incidents[0]["id"] in {i["id"] for i in open_ones}
+    assert client.get("/api/v1/incidents?status=closed", headers=HEADERS).status_code == 400
+
+
+def test_result_and_summary_reads(client, db, make_monitor):
+    monitor = make_monitor()
+    _fail(db, monitor, 2)
+
+    page = client.get(f"/api/v1/monitors/{monitor.id}/results?limit=1", headers=HEADERS).json()
+    assert len(page["results"]) == 1 and page["next_cursor"] is not None
+
+    summary = client.get(f"/api/v1/summary?monitor_id={monitor.id}", headers=HEADERS).json()
+    assert summary["count"] == 1
+    assert (summary["monitors"][0]["total_checks"], summary["monitors"][0]["current_status"]) == (2, "DOWN")
@@ -0,0 +1,215 @@
+import asyncio
+import time
+import uuid
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.services.checker import (
+    ERR_CONNECTION,
+    ERR_DNS,
+    ERR_HTTP_UNEXPECTED,
+    ERR_TIMEOUT,
+    AsyncCheckExecutor,
+    _retry_delay_sec,
+)
+from app.services.dns_cache import dns_cache
+from app.services.http_timing import PhaseTimer, async_transport
+
+
+def test_transport_errors_are_httpx_errors():
+    async def probe() -> None:
+        async with httpx.AsyncClient(transport=async_transport(httpx.Limits(max_connections=1))) as client:
+            # Nothing listens on the discard port
+            await client.get("http://127.0.0.1:9/")
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(probe())
+
+
+def test_check_now_measures_cold_by_default():
+    from app.core.config import settings
+    from app.services.checker import _latency_mode, _request_headers
+
+    mode = _latency_mode(settings.check_now_latency_mode)
+    assert mode == "cold"
+    monitor = SimpleNamespace(headers_json={"X-Probe": "1"})
+    assert _request_headers(monitor, mode) == {"X-Probe": "1", "Connection": "close"}
+
+
+# ----------------------------
+# Retries and the total budget
+# ----------------------------
+def _monitor(**fields) -> SimpleNamespace:
+    defaults = dict(
+        id=uuid.uuid4(),
+        url="http://target.invalid/health",
+        method="GET",
+        headers_json=None,
+        expected_status=200,
+        timeout_ms=3000,
+        max_attempts=3,
+        retry_backoff_ms=10,
+    )
+    return SimpleNamespace(**{**defaults, **fields})
+
+
+def _probe(monitor, handler, **executor_args):
+    """Runs executor.probe against handler; returns (result, requests sent)."""
+    sent: list[httpx.Request] = []
+
+    async def respond(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        return await handler(request, len(sent))
+
+    async def run():
+        executor = AsyncCheckExecutor(latency_mode="warm", **executor_args)
+        executor._client = httpx.AsyncClient(transport=httpx.MockTransport(respond))
+        try:
+            return await executor.probe(monitor)
+        finally:
+            await executor.aclose()
+
+    return asyncio.run(run()), sent
+
+
+def test_retry_delay_doubles():
+    monitor = _monitor(retry_backoff_ms=500)
+    assert [_retry_delay_sec(monitor, attempt) for attempt in range(4)] == [0.0, 0.5, 1.0, 2.0]
+
+
+def test_network_errors_are_retried():
+    async def flaky(request, n):
+        if n < 3:
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200)
+
+    result, sent = _probe(_monitor(), flaky)
+    assert len(sent) == 3
+    assert (result.success, result.status_code, result.error_type) == (True, 200, None)
+
+
+def test_attempts_run_out():
+    async def down(request, n):
+        raise httpx.ConnectError("refused", request=request)
+
+    result, sent = _probe(_monitor(max_attempts=2), down)
+    assert len(sent) == 2
+    assert (result.success, result.error_type) == (False, ERR_CONNECTION)
+
+
+def test_unexpected_status_is_not_retried():
+    async def error(request, n):
+        return httpx.Response(503)
+
+    result, sent = _probe(_monitor(), error)
+    assert len(sent) == 1
+    assert (result.success, result.status_code, result.error_type) == (False, 503, ERR_HTTP_UNEXPECTED)
+    assert result.error_message == "Expected 200 got 503"
+
+
+def test_budget_cancels_the_running_attempt():
+    async def hang(request, n):
+        await asyncio.sleep(5)
+        return httpx.Response(200)
+
+    started = time.monotonic()
+    result, sent = _probe(_monitor(), hang, max_total_sec=0.2)
+    assert time.monotonic() - started < 2
+    assert len(sent) == 1
+    assert (result.success, result.error_type) == (False, ERR_TIMEOUT)
+    assert result.error_message == "Check exceeded total budget of 0.2s"
+
+
+def test_no_retry_whose_backoff_would_outlast_the_budget():
+    async def down(request, n):
+        raise httpx.ConnectError("refused", request=request)
+
+    result, sent = _probe(_monitor(retry_backoff_ms=500), down, max_total_sec=0.3)
+    assert len(sent) == 1
+    assert result.error_type == ERR_CONNECTION
+
+
+# ----------------------------
+# Phase timings
+# ----------------------------
+def test_phase_timer_columns():
+    timer = PhaseTimer()
+    for step in ("connection.connect_tcp", "connection.start_tls", "http11.send_request_headers"):
+        timer.on_event(f"{step}.started", {})
+        if step != "http11.send_request_headers":
+            timer.on_event(f"{step}.complete", {})
+    timer.on_event("http11.receive_response_headers.complete", {})
+    timer.on_event("http11.receive_response_body.started", {})
+    timer.on_event("http11.receive_response_body.complete", {})
+
+    columns = timer.columns()
+    assert set(columns) == {"dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "body_ms"}
+    assert columns["dns_ms"] is None  # no lookup reported
+    assert all(columns[name] == 0 for name in ("connect_ms", "tls_ms", "ttfb_ms", "body_ms"))
+
+
+def test_dns_time_comes_out_of_connect():
+    timer = PhaseTimer()
+    timer.add("connect", 0.030)
+    timer.record_dns(0.010, ok=True)
+    assert (timer.columns()["dns_ms"], timer.columns()["connect_ms"]) == (10, 20)
+
+    failed = PhaseTimer()
+    failed.add("connect", 0.030)
+    failed.record_dns(0.030, ok=False)
+    # connect_tcp only ran the lookup
+    assert (failed.columns()["dns_ms"], failed.columns()["connect_ms"]) == (30, None)
+
+
+async def _serve_ok(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    # Keep-alive HTTP/1.1: answer every request on the connection
+    try:
+        while await reader.readuntil(b"\r\n\r\n"):
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def test_phases_of_cold_and_warm_probes():
+    dns_cache.clear()
+
+    async def run():
+        server = await asyncio.start_server(_serve_ok, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        executor = AsyncCheckExecutor(latency_mode="warm")
+        monitor = _monitor(url=f"http://localhost:{port}/")
+        try:
+            return await executor.probe(monitor), await executor.probe(monitor)
+        finally:
+            await executor.aclose()
+            server.close()
+
+    cold, warm = asyncio.run(run())
+    assert cold.success and warm.success
+    # First probe: resolved and connected; plain http, so no TLS
+    assert cold.dns_ms is not None and cold.connect_ms is not None
+    assert cold.ttfb_ms is not None and cold.body_ms is not None
+    assert cold.tls_ms is None
+    # Second: cached name, reused connection
+    assert (warm.dns_ms, warm.connect_ms, warm.tls_ms) == (None, None, None)
+    assert warm.ttfb_ms is not None
+
+
+def test_dns_failure_is_timed_and_classified():
+    dns_cache.clear()
+
+    async def run():
+        executor = AsyncCheckExecutor()
+        try:
+            return await executor.probe(_monitor(url="http://no-such-host.invalid/", max_attempts=1))
+        finally:
+            await executor.aclose()
+
+    result = asyncio.run(run())
+    assert (result.success, result.error_type) == (False, ERR_DNS)
+    assert result.dns_ms is not None and result.connect_ms is None
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from app.core import metrics
+
+
+def test_metric_kinds_must_implement_samples():
+    class Incomplete(metrics._Metric):
+        kind = "counter"
+
+        def _new_child(self):
+            return metrics._Value()
+
+    with pytest.raises(TypeError):
+        Incomplete("shiptrack_test_incomplete", "never registered")
+
+
+def test_worker_metrics_endpoint(monkeypatch):
+    monkeypatch.setattr(metrics, "REQUEST_READ_TIMEOUT_SEC", 0.2)
+
+    async def scenario() -> tuple[bytes, bytes, float]:
+        server = await metrics.serve("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /metrics HTTP/1.1\r\nHost: x\r\n\r\n")
+            scrape = await reader.read()
+            writer.close()
+
+            # Connects and never sends a request: dropped instead of held open
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            idle = await asyncio.wait_for(reader.read(), 2)
+            elapsed = loop.time() - started
+            writer.close()
+        return scrape, idle, elapsed
+
+    scrape, idle, elapsed = asyncio.run(scenario())
+    assert scrape.startswith(b"HTTP/1.1 200 OK")
+    assert b"# TYPE shiptrack_results_written_total counter" in scrape
+    assert idle == b""
+    assert elapsed < 1
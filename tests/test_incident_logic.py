@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event, select
+
+from app.db.models import CheckResult, Incident, MonitorState
+from app.services.incident import IncidentTracker, add_results, apply_incident_rules
+
+T0 = datetime(2026, 1, 5, 12, 0, tzinfo=timezone.utc)
+
+
+def _result(monitor, n: int, success: bool) -> CheckResult:
+    return CheckResult(
+        monitor_id=monitor.id,
+        checked_at=T0 + timedelta(minutes=n),
+        success=success,
+        status_code=200 if success else None,
+        latency_ms=5,
+        error_type=None if success else "TIMEOUT",
+        error_message=None if success else "timed out",
+    )
+
+
+@pytest.fixture
+def state_reads(db):
+    """SQL statements that read monitor_state, as executed."""
+    reads: list[str] = []
+
+    def watch(conn, cursor, statement, *_):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM monitor_state" in statement:
+            reads.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", watch)
+    yield reads
+    event.remove(engine, "before_cursor_execute", watch)
+
+
+def test_opens_and_resolves_after_thresholds(db, make_monitor):
+    monitor = make_monitor()
+    tracker = IncidentTracker()
+
+    events = tracker.record_batch(db, [_result(monitor, i, False) for i in range(3)], add_results)
+    assert [e["transition"] for e in events] == [None, "OPENED", None]
+    incident = db.get(Incident, events[1]["incident_id"])
+    assert incident.failure_count == 3
+
+    events = tracker.record_batch(db, [_result(monitor, 3, True), _result(monitor, 4, True)], add_results)
+    assert [e["transition"] for e in events] == [None, "RESOLVED"]
+    db.refresh(incident)
+    assert incident.status == "RESOLVED"
+
+
+def test_cached_monitors_skip_the_state_read(db, make_monitor, state_reads):
+    seen, new = make_monitor(), make_monitor()
+    tracker = IncidentTracker()
+
+    tracker.record_batch(db, [_result(seen, 0, False)], add_results)
+    state_reads.clear()
+    tracker.record_batch(db, [_result(seen, 1, False)], add_results)
+    assert state_reads == []
+    tracker.record_batch(db, [_result(seen, 2, False), _result(new, 0, False)], add_results)
+    assert len(state_reads) == 1
+
+
+def test_uncached_tracker_always_reads(db, make_monitor, state_reads):
+    monitor = make_monitor()
+    tracker = IncidentTracker(cache=False)
+
+    tracker.record_batch(db, [_result(monitor, 0, False)], add_results)
+    tracker.record_batch(db, [_result(monitor, 1, False)], add_results)
+    assert len(state_reads) == 2
+    assert len(tracker) == 0
+
+
+def test_stale_cache_is_reloaded(db, make_monitor):
+    monitor = make_monitor()
+    tracker = IncidentTracker()
+
+    tracker.record_batch(db, [_result(monitor, 0, False)], add_results)
+    # check-now writes behind the tracker's back: its cached fail streak of 1 is stale
+    assert apply_incident_rules(db, _result(monitor, 1, True))["transition"] is None
+
+    events = tracker.record_batch(db, [_result(monitor, 2, False)], add_results)
+    assert events[0]["transition"] is None  # one failure since the success, not two
+
+    state = db.scalars(select(MonitorState).where(MonitorState.monitor_id == monitor.id)).one()
+    db.refresh(state)
+    assert (state.fail_streak, state.success_streak, state.version) == (1, 0, 3)
@@ -0,0 +1,87 @@
+import threading
+import time
+import uuid
+
+import pytest
+from sqlalchemy import update
+
+from app.db.models import Monitor
+from app.services.monitor_cache import MonitorCache, notify_changed
+
+
+def _rename(db, monitor, name: str, notify: bool) -> None:
+    db.execute(update(Monitor).where(Monitor.id == monitor.id).values(name=name))
+    if notify:
+        notify_changed(db, monitor.id)
+    db.commit()
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def listening(database):
+    cache = MonitorCache(max_size=100, ttl_sec=300)
+    cache.start()
+    _wait_for(cache._listening.is_set)
+    yield cache
+    cache.stop()
+
+
+def test_reads_through_until_listening(db, make_monitor):
+    cache = MonitorCache()
+    monitor = make_monitor(name="before")
+    assert cache.get(db, monitor.id).name == "before"
+    _rename(db, monitor, "after", notify=False)
+    assert cache.get(db, monitor.id).name == "after"
+    assert cache.get(db, uuid.UUID(int=0)) is None
+
+
+def test_notifications_drop_entries(db, make_monitor, listening):
+    monitor = make_monitor(name="before")
+    changed = threading.Event()
+    listening.on_change(lambda monitor_id: monitor_id == monitor.id and changed.set())
+
+    assert listening.get(db, monitor.id).name == "before"
+    # Without a NOTIFY the cached copy is served
+    _rename(db, monitor, "unnotified", notify=False)
+    assert listening.get(db, monitor.id).name == "before"
+
+    _rename(db, monitor, "after", notify=True)
+    assert changed.wait(5.0)
+    assert listening.get(db, monitor.id).name == "after"
+
+
+def test_entries_expire(db, make_monitor, listening):
+    listening._ttl_sec = 0.05
+    monitor = make_monitor(name="before")
+    listening.get(db, monitor.id)
+    _rename(db, monitor, "after", notify=False)
+    time.sleep(0.1)
+    assert listening.get(db, monitor.id).name == "after"
+
+
+def test_a_fill_that_raced_an_invalidation_is_not_kept(db, make_monitor, listening):
+    monitor = make_monitor()
+    _, generation = listening._cached(monitor.id)
+    listening.invalidate(monitor.id)  # a change lands while the row is being read
+
+    listening._fill(monitor.id, db.get(Monitor, monitor.id), generation)
+    assert listening._cached(monitor.id)[0] is None
+
+
+def test_least_recently_used_is_evicted(db, make_monitor, listening):
+    listening._max_size = 2
+    first, second, third = make_monitor(), make_monitor(), make_monitor()
+    listening.get(db, first.id)
+    listening.get(db, second.id)
+    listening.get(db, first.id)  # second is now the oldest use
+    listening.get(db, third.id)
+
+    assert listening._cached(first.id)[0] is not None
+    assert listening._cached(second.id)[0] is None
+    assert listening._cached(third.id)[0] is not None
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db import partitions
+from app.db.models import CheckResult
+from app.db.session import engine
+from app.services import retention
+
+# Far enough ahead that no real partition covers it
+FUTURE = datetime(2091, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def test_partition_start():
+    # Daily slots start at midnight UTC, weekly ones on Mondays
+    assert partitions.partition_start(FUTURE, 1) == datetime(2091, 3, 1, tzinfo=timezone.utc)
+    assert partitions.partition_start(FUTURE, 7) == datetime(2091, 2, 26, tzinfo=timezone.utc)
+    assert partitions.partition_start(datetime(2091, 2, 26, tzinfo=timezone.utc), 7).weekday() == 0
+
+
+@pytest.fixture
+def future_partitions(database, monkeypatch):
+    """Partitions created in FUTURE's range; the only ones retention sees. Dropped afterwards."""
+    monkeypatch.setattr(settings, "results_partition_days", 1)
+    monkeypatch.setattr(settings, "results_partitions_ahead", 1)
+    list_all = partitions.list_partitions
+
+    def ours(conn):
+        return [p for p in list_all(conn) if p.start is not None and p.start >= FUTURE - timedelta(days=7)]
+
+    monkeypatch.setattr(retention.partitions, "list_partitions", ours)
+    yield ours
+    with engine.begin() as conn:
+        for partition in ours(conn):
+            partitions.drop_partition(conn, partition.name)
+
+
+def _partition_of(result_id) -> str | None:
+    # Own short transaction: a session left open would block the partition DDL
+    with engine.connect() as conn:
+        return conn.scalar(text("SELECT tableoid::regclass::text FROM check_results WHERE id = :id"), {"id": result_id})
+
+
+def test_ensure_creates_ahead_and_adopts_default_rows(db, make_monitor, future_partitions):
+    monitor = make_monitor()
+    early = CheckResult(monitor_id=monitor.id, checked_at=FUTURE + timedelta(hours=1), success=True)
+    db.add(early)
+    db.commit()
+    assert _partition_of(early.id) == partitions.DEFAULT_PARTITION
+
+    with engine.begin() as conn:
+        created = partitions.ensure_partitions(conn, FUTURE)
+    assert created == ["check_results_p20910301", "check_results_p20910302"]
+    # The row that landed in DEFAULT moved into its new partition
+    assert _partition_of(early.id) == "check_results_p20910301"
+
+    with engine.begin() as conn:
+        assert partitions.ensure_partitions(conn, FUTURE) == []
+        assert [p.name for p in future_partitions(conn)] == created
+
+
+def test_expired_partitions_are_dropped(db, make_monitor, future_partitions, monkeypatch):
+    monkeypatch.setattr(settings, "results_retention_days", 30)
+    monitor = make_monitor()
+    with engine.begin() as conn:
+        partitions.ensure_partitions(conn, FUTURE)
+    old = CheckResult(monitor_id=monitor.id, checked_at=FUTURE, success=True)
+    db.add(old)
+    db.commit()
+
+    # 30 days after the first partition ended: only that one is past retention
+    dropped = retention._expire_partitions(datetime(2091, 4, 1, 1, 0, tzinfo=timezone.utc))
+    assert dropped == ["check_results_p20910301"]
+    with engine.begin() as conn:
+        assert [p.name for p in future_partitions(conn)] == ["check_results_p20910302"]
+    assert _partition_of(old.id) is None
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+
+import orjson
+import pytest
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from app.api.responses import FastJSONResponse, csv_chunk, ndjson_chunk, row_dicts
+from app.db import crud
+from app.db.models import CheckResult, Incident, Monitor
+from app.schemas.incident import IncidentOut
+from app.schemas.monitor import MonitorOut
+from app.schemas.result import CheckResultOut
+from app.services.incident import apply_incident_rules
+
+T0 = datetime(2026, 1, 5, 12, 0, 0, 123456, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def history(db, make_monitor):
+    """A monitor with headers, three failed checks (one with a phase breakdown) and the incident they opened."""
+    monitor = make_monitor(headers_json={"X-Probe": "1"})
+    for i in range(3):
+        result = CheckResult(
+            monitor_id=monitor.id,
+            checked_at=T0 + timedelta(seconds=i),
+            success=False,
+            status_code=503,
+            latency_ms=40 + i,
+            error_type="HTTP_UNEXPECTED",
+            error_message="Expected 200 got 503",
+            connect_ms=3 if i == 0 else None,
+        )
+        apply_incident_rules(db, result)
+    return monitor
+
+
+def _rendered(rows) -> list:
+    return orjson.loads(FastJSONResponse(row_dicts(rows)).body)
+
+
+def _validated(schema, objects) -> list:
+    return [schema.model_validate(obj).model_dump(mode="json") for obj in objects]
+
+
+def test_projected_rows_render_like_the_response_models(db, history):
+    monitor_id = history.id
+
+    q, _ = crud.results_query(monitor_id)
+    orm = db.scalars(
+        select(CheckResult)
+        .where(CheckResult.monitor_id == monitor_id)
+        .order_by(CheckResult.checked_at.desc(), CheckResult.id.desc())
+    )
+    assert _rendered(db.execute(q)) == _validated(CheckResultOut, orm)
+
+    incidents = db.scalars(select(Incident).where(Incident.monitor_id == monitor_id))
+    assert _rendered(db.execute(crud.monitor_incidents_query(monitor_id))) == _validated(IncidentOut, incidents)
+
+    rows = [row for row in db.execute(crud.monitors_query()) if row.id == monitor_id]
+    assert _rendered(rows) == _validated(MonitorOut, [db.get(Monitor, monitor_id)])
+
+
+def test_datetimes_match_pydantic():
+    for at in (T0, T0.astimezone(timezone(timedelta(hours=2))), T0.replace(microsecond=0)):
+        body = FastJSONResponse({"at": at}).body
+        assert orjson.loads(body)["at"] == TypeAdapter(datetime).dump_python(at, mode="json")
+    assert FastJSONResponse({"at": T0}).body == b'{"at":"2026-01-05T12:00:00.123456Z"}'
+
+
+# ----------------------------
+# Streamed exports
+# ----------------------------
+def test_export_chunks(db, history):
+    rows = list(db.execute(crud.results_export_query(history.id)))
+
+    lines = ndjson_chunk(rows).decode().splitlines()
+    assert [orjson.loads(line) for line in lines] == _rendered(rows)
+
+    header, first, *_ = (csv_chunk([crud.RESULT_FIELDS]) + csv_chunk(rows)).decode().splitlines()
+    assert header.split(",") == list(CheckResultOut.model_fields)
+    values = dict(zip(header.split(","), first.split(",")))
+    assert values["checked_at"] == "2026-01-05T12:00:00.123456+00:00"
+    assert (values["success"], values["status_code"], values["connect_ms"], values["tls_ms"]) == ("False", "503", "3", "")
@@ -0,0 +1,89 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app.db.models import CheckResult
+from app.services.result_sink import SINK_COPY, SINK_INSERT, ResultSink
+
+T0 = datetime(2026, 1, 5, 12, 0, tzinfo=timezone.utc)
+
+
+def _result(monitor_id: uuid.UUID, n: int) -> CheckResult:
+    return CheckResult(
+        monitor_id=monitor_id,
+        checked_at=T0 + timedelta(seconds=n),
+        success=True,
+        status_code=200,
+        latency_ms=5,
+    )
+
+
+def _stored(db, monitor) -> int:
+    return db.scalar(select(func.count()).select_from(CheckResult).where(CheckResult.monitor_id == monitor.id))
+
+
+def _watch_writes(sink: ResultSink) -> list[int]:
+    """Sizes of the batches sink writes, as written."""
+    sizes: list[int] = []
+    write = sink._write_results
+
+    def counted(db, results):
+        sizes.append(len(results))
+        write(db, results)
+
+    sink._write_results = counted
+    return sizes
+
+
+@pytest.mark.parametrize("method", [SINK_INSERT, SINK_COPY])
+def test_results_are_written_in_batches(db, make_monitor, method):
+    monitors = [make_monitor(), make_monitor()]
+    sink = ResultSink(max_batch=3, flush_interval_sec=5, method=method)
+    sizes = _watch_writes(sink)
+
+    async def run() -> None:
+        sink.start()
+        for n in range(7):
+            monitor = monitors[n % 2]
+            await sink.submit(monitor, _result(monitor.id, n))
+        await sink.close()
+
+    asyncio.run(run())
+    assert sizes == [3, 3, 1]  # the last one is flushed by close()
+    assert [_stored(db, m) for m in monitors] == [4, 3]
+
+
+def test_a_partial_batch_is_flushed_after_the_interval(db, make_monitor):
+    monitor = make_monitor()
+    sink = ResultSink(max_batch=100, flush_interval_sec=0.05)
+
+    async def run() -> int:
+        sink.start()
+        await sink.submit(monitor, _result(monitor.id, 0))
+        await asyncio.sleep(0.5)
+        stored = _stored(db, monitor)
+        await sink.close()
+        return stored
+
+    assert asyncio.run(run()) == 1
+
+
+def test_a_bad_row_only_drops_itself(db, make_monitor):
+    monitor = make_monitor()
+    sink = ResultSink(max_batch=3, flush_interval_sec=5)
+    sizes = _watch_writes(sink)
+    # No such monitor: the foreign key fails the whole batch
+    results = [_result(monitor.id, 0), _result(uuid.uuid4(), 1), _result(monitor.id, 2)]
+
+    async def run() -> None:
+        sink.start()
+        for result in results:
+            await sink.submit(monitor, result)
+        await sink.close()
+
+    asyncio.run(run())
+    assert sizes == [3, 1, 1, 1]  # the batch, then row by row
+    assert _stored(db, monitor) == 2
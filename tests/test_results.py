@@ -0,0 +1,132 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.db import crud
+from app.db.models import CheckResult
+
+T0 = datetime(2026, 1, 5, 12, 0, tzinfo=timezone.utc)
+
+
+def _add_results(db, monitor, seconds: list[int]) -> list[CheckResult]:
+    results = [
+        CheckResult(monitor_id=monitor.id, checked_at=T0 + timedelta(seconds=s), success=True, latency_ms=s)
+        for s in seconds
+    ]
+    db.add_all(results)
+    db.commit()
+    return results
+
+
+def _pages(db, monitor, limit: int, **filters) -> list[list]:
+    pages, before = [], None
+    while True:
+        q, limit = crud.results_query(monitor.id, limit=limit, before=before, **filters)
+        page, before = crud.results_page(list(db.execute(q)), limit)
+        pages.append([row.id for row in page])
+        if before is None:
+            return pages
+
+
+# ----------------------------
+# Keyset pages
+# ----------------------------
+def test_pages_walk_back_without_gaps_or_repeats(db, make_monitor):
+    monitor = make_monitor()
+    # Three results share a timestamp: the id breaks the tie
+    results = _add_results(db, monitor, [0, 10, 10, 10, 20, 30, 40])
+    newest_first = [r.id for r in sorted(results, key=lambda r: (r.checked_at, r.id), reverse=True)]
+
+    pages = _pages(db, monitor, limit=2)
+    assert [len(page) for page in pages] == [2, 2, 2, 1]
+    assert [result_id for page in pages for result_id in page] == newest_first
+
+
+def test_time_range_filter(db, make_monitor):
+    monitor = make_monitor()
+    results = _add_results(db, monitor, [0, 10, 20, 30])
+
+    pages = _pages(db, monitor, limit=10, since=T0 + timedelta(seconds=10), until=T0 + timedelta(seconds=30))
+    assert pages == [[results[2].id, results[1].id]]
+
+
+def test_cursor_round_trip():
+    row = SimpleNamespace(
+        checked_at=datetime(2026, 1, 5, 13, 0, 1, 5, tzinfo=timezone(timedelta(hours=1))),
+        id=uuid.UUID(int=7),
+    )
+    cursor = crud._format_result_cursor(row)
+    assert cursor == "2026-01-05T12:00:01.000005Z,00000000-0000-0000-0000-000000000007"
+    assert crud._parse_result_cursor(cursor) == (datetime(2026, 1, 5, 12, 0, 1, 5, tzinfo=timezone.utc), row.id)
+
+    # An offset whose '+' arrived unescaped, as a space
+    parsed, _ = crud._parse_result_cursor("2026-01-05T13:00:01 01:00,00000000-0000-0000-0000-000000000007")
+    assert parsed == datetime(2026, 1, 5, 12, 0, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "nope",
+        "2026-01-05T12:00:00Z,not-a-uuid",
+        "2026-01-05T12:00:00,00000000-0000-0000-0000-000000000007",  # no timezone
+    ],
+)
+def test_bad_cursors_are_400s(cursor):
+    with pytest.raises(HTTPException) as exc:
+        crud._parse_result_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+# ----------------------------
+# Export
+# ----------------------------
+HEADERS = {"X-API-Key": "change-me"}
+
+
+def _export(client, monitor, **params):
+    return client.get(f"/api/v1/monitors/{monitor.id}/results/export", params=params, headers=HEADERS)
+
+
+def test_export_streams_every_row_oldest_first(client, db, make_monitor, monkeypatch):
+    monkeypatch.setattr(settings, "results_export_chunk_rows", 2)  # several fetches and chunks
+    monitor = make_monitor()
+    results = _add_results(db, monitor, [30, 0, 20, 10, 40])
+
+    response = _export(client, monitor)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.headers["content-disposition"] == f'attachment; filename="{monitor.id}-results.ndjson"'
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["latency_ms"] for row in rows] == [0, 10, 20, 30, 40]
+    assert {row["id"] for row in rows} == {str(r.id) for r in results}
+
+
+def test_export_csv_with_a_time_range(client, db, make_monitor):
+    monitor = make_monitor()
+    _add_results(db, monitor, [0, 10, 20, 30])
+
+    response = _export(
+        client,
+        monitor,
+        format="csv",
+        **{"from": (T0 + timedelta(seconds=10)).isoformat(), "to": (T0 + timedelta(seconds=30)).isoformat()},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    header, *lines = list(csv.reader(io.StringIO(response.text)))
+    assert header == crud.RESULT_FIELDS
+    assert [dict(zip(header, line))["latency_ms"] for line in lines] == ["10", "20"]
+
+
+def test_export_errors(client, make_monitor):
+    monitor = make_monitor()
+    assert _export(client, monitor, format="xml").status_code == 400
+    assert client.get(f"/api/v1/monitors/{uuid.uuid4()}/results/export", headers=HEADERS).status_code == 404
@@ -0,0 +1,77 @@
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from app.services.schedule_phase import PhasePlanner, PlannerCache, next_tick, phase_of
+
+NOW = datetime(2026, 1, 5, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def test_phase_and_next_tick():
+    assert phase_of(NOW + timedelta(seconds=17.5), 60) == 17
+    assert next_tick(17, 60, NOW) == NOW + timedelta(seconds=17)
+    assert next_tick(17, 60, NOW + timedelta(seconds=17)) == NOW + timedelta(seconds=17)
+    assert next_tick(17, 60, NOW + timedelta(seconds=18)) == NOW + timedelta(seconds=77)
+
+
+def test_one_interval_fills_every_phase_once():
+    planner = PhasePlanner()
+    ticks = [planner.assign(uuid.uuid4(), 10, NOW) for _ in range(10)]
+    assert sorted(phase_of(t, 10) for t in ticks) == list(range(10))
+    assert all(NOW <= t < NOW + timedelta(seconds=10) for t in ticks)
+
+
+def test_other_intervals_count_where_they_coincide():
+    # A 30s monitor on phase 0 also fires at second 30 of every minute
+    planner = PhasePlanner(Counter({(30, 0): 1}))
+    phases = {phase_of(planner.assign(uuid.uuid4(), 60, NOW), 60) for _ in range(58)}
+    assert phases == set(range(60)) - {0, 30}
+
+
+def test_release_frees_the_phase():
+    planner = PhasePlanner()
+    monitor_id = uuid.uuid4()
+    first = planner.assign(monitor_id, 60, NOW)
+    planner.release(60, first)
+    assert planner.assign(monitor_id, 60, NOW) == first
+
+
+def test_load_counts_active_monitors(db, make_monitor):
+    # An interval nothing else uses
+    interval = 7919
+    make_monitor(interval_sec=interval, next_run_at=NOW + timedelta(seconds=5))
+    make_monitor(interval_sec=interval, next_run_at=NOW + timedelta(seconds=5 + interval))
+    make_monitor(interval_sec=interval, next_run_at=NOW + timedelta(seconds=9), is_active=False)
+
+    counts = {key: n for key, n in PhasePlanner.load(db)._counts.items() if key[0] == interval}
+    assert counts == {(interval, phase_of(NOW, interval) + 5): 2}
+
+
+def test_planner_cache_reuses_its_counts(monkeypatch):
+    loads = []
+    monkeypatch.setattr(PhasePlanner, "load", classmethod(lambda cls, db: loads.append(db) or cls()))
+    cache = PlannerCache(max_age_sec=60)
+    monitor_id = uuid.uuid4()
+
+    first = cache.assign("db", monitor_id, 60, NOW)
+    second = cache.assign("db", monitor_id, 60, NOW)
+    assert len(loads) == 1
+    assert phase_of(second, 60) != phase_of(first, 60)  # the first pick is counted
+
+    # Moving a monitor off its phase frees it
+    assert cache.assign("db", monitor_id, 60, NOW, replaces=(60, first)) == first
+    assert len(loads) == 1
+
+    cache.clear()
+    cache.assign("db", monitor_id, 60, NOW)
+    assert len(loads) == 2
+
+
+def test_planner_cache_reloads_when_old(monkeypatch):
+    loads = []
+    monkeypatch.setattr(PhasePlanner, "load", classmethod(lambda cls, db: loads.append(db) or cls()))
+    cache = PlannerCache(max_age_sec=0)
+
+    cache.assign("db", uuid.uuid4(), 60, NOW)
+    cache.assign("db", uuid.uuid4(), 60, NOW)
+    assert len(loads) == 2
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from app.db.models import Monitor
+from app.services.scheduler import _claim_due
+
+LEASE_SEC = 90.0
+
+
+def _claim(worker_id: str, monitors, limit: int = 100, release=()):
+    # Only the test's monitors: the database may hold others that are due
+    return _claim_due(worker_id, limit, list(release), LEASE_SEC, Monitor.id.in_([m.id for m in monitors]))
+
+
+def _row(db, monitor) -> Monitor:
+    db.expire_all()
+    return db.scalars(select(Monitor).where(Monitor.id == monitor.id)).one()
+
+
+def test_claim_skips_missed_ticks_and_leases(db, make_monitor):
+    now = datetime.now(timezone.utc)
+    due = now - timedelta(seconds=150)
+    monitor = make_monitor(interval_sec=60, next_run_at=due)
+    updated_at = _row(db, monitor).updated_at
+
+    claimed = _claim("w1", [monitor])
+    assert [m.id for m in claimed.monitors] == [monitor.id]
+
+    row = _row(db, monitor)
+    # Three ticks had come due (-150s, -90s, -30s); they run once, the next is at +30s
+    assert row.next_run_at == due + timedelta(seconds=180)
+    assert row.leased_by == "w1"
+    assert timedelta(seconds=85) < row.leased_until - now < timedelta(seconds=95)
+    assert row.updated_at == updated_at  # a claim isn't an edit
+    assert claimed.next_due == row.next_run_at
+
+    # Leased: nobody else gets it, even once its next tick is due
+    row.next_run_at = now - timedelta(seconds=1)
+    db.commit()
+    assert _claim("w2", [monitor]).monitors == []
+
+
+def test_release_is_only_by_the_holder(db, make_monitor):
+    monitor = make_monitor(next_run_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+    _claim("w1", [monitor])
+
+    assert _claim("w2", [monitor], limit=0, release=[monitor.id]).released == 0
+    assert _row(db, monitor).leased_by == "w1"
+
+    assert _claim("w1", [monitor], limit=0, release=[monitor.id]).released == 1
+    row = _row(db, monitor)
+    assert (row.leased_by, row.leased_until) == (None, None)
+
+
+def test_expired_lease_is_claimed_by_another_worker(db, make_monitor):
+    now = datetime.now(timezone.utc)
+    monitor = make_monitor(
+        next_run_at=now - timedelta(seconds=5),
+        leased_by="crashed",
+        leased_until=now - timedelta(seconds=1),
+    )
+
+    assert [m.id for m in _claim("w2", [monitor]).monitors] == [monitor.id]
+    assert _row(db, monitor).leased_by == "w2"
+
+    # The crashed worker's late release doesn't drop the new lease
+    assert _claim("crashed", [monitor], limit=0, release=[monitor.id]).released == 0
+
+
+def test_claims_oldest_due_first_up_to_limit(db, make_monitor):
+    now = datetime.now(timezone.utc)
+    later = make_monitor(next_run_at=now - timedelta(seconds=10))
+    oldest = make_monitor(next_run_at=now - timedelta(seconds=30))
+    inactive = make_monitor(next_run_at=now - timedelta(seconds=60), is_active=False)
+    future = make_monitor(next_run_at=now + timedelta(seconds=20))
+    monitors = [later, oldest, inactive, future]
+
+    assert [m.id for m in _claim("w1", monitors, limit=1).monitors] == [oldest.id]
+    claimed = _claim("w1", monitors)
+    assert [m.id for m in claimed.monitors] == [later.id]
+    assert claimed.next_due == future.next_run_at
@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy import select
+
+from app.db.models import Monitor
+from app.services.sharding import SHARD_KEYS, HashRing, Shard, shard_key
+
+
+def test_shards_split_every_key_once():
+    shards = [Shard(i, 3) for i in range(3)]
+    assert sum(len(s.keys) for s in shards) == SHARD_KEYS
+    assert frozenset().union(*(s.keys for s in shards)) == frozenset(range(SHARD_KEYS))
+    # Roughly even with the default vnodes
+    assert all(SHARD_KEYS / 3 * 0.7 < len(s.keys) < SHARD_KEYS / 3 * 1.3 for s in shards)
+
+
+def test_another_process_only_takes_its_share():
+    before = {key: i for i in range(3) for key in Shard(i, 3).keys}
+    after = {key: i for i in range(4) for key in Shard(i, 4).keys}
+    moved = [key for key in before if before[key] != after[key]]
+    # Everything that moved went to the new process
+    assert {after[key] for key in moved} == {3}
+    assert len(moved) < SHARD_KEYS / 4 * 1.3
+
+
+def test_ring_needs_a_node():
+    with pytest.raises(ValueError):
+        HashRing([])
+
+
+def test_filter_matches_the_stored_shard_key(db, make_monitor):
+    monitors = [make_monitor() for _ in range(20)]
+    ids = [m.id for m in monitors]
+
+    stored = dict(db.execute(select(Monitor.id, Monitor.shard_key).where(Monitor.id.in_(ids))).all())
+    assert stored == {m.id: shard_key(m.id) for m in monitors}
+
+    owners: dict = {}
+    for i in range(3):
+        shard = Shard(i, 3)
+        q = select(Monitor.id).where(Monitor.id.in_(ids)).where(shard.filter(Monitor.shard_key))
+        for monitor_id in db.scalars(q):
+            assert shard_key(monitor_id) in shard.keys
+            owners.setdefault(monitor_id, []).append(i)
+    assert sorted(owners) == sorted(ids)
+    assert all(len(shards) == 1 for shards in owners.values())
@@ -0,0 +1,190 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.models import CheckResult, CheckRollupHour, CheckRollupMinute
+from app.services.http_timing import PHASES
+from app.services.incident import apply_incident_rules
+from app.services.summary import (
+    _Agg,
+    _before_minute_rollups,
+    _format_step,
+    _plan,
+    _series_step,
+    get_fleet_summary,
+    get_monitor_summary,
+    record_rollups,
+)
+
+M = timedelta(minutes=1)
+H = timedelta(hours=1)
+D = timedelta(days=1)
+
+
+@pytest.mark.parametrize(
+    "window, step, expected",
+    [
+        (H, None, "1m"),  # finest step that fits
+        (D, None, "5m"),  # 24h / 299 points is 4.8m
+        (D, 1 * M, "5m"),  # too fine: widened along the ladder
+        (D, 7 * M, "7m"),  # fits: kept as given
+        (90 * D, None, "12h"),
+        (5 * 365 * D, None, "7d"),
+        (100 * 365 * D, None, "123d"),  # past the ladder: whole days
+    ],
+)
+def test_series_step(window, step, expected):
+    assert _format_step(_series_step(window, step)) == expected
+
+
+def test_step_is_whole_hours_past_minute_retention():
+    assert _format_step(_series_step(31 * D, 150 * M)) == "150m"
+    assert _format_step(_series_step(31 * D, 150 * M, whole_hours=True)) == "3h"
+    assert _format_step(_series_step(31 * D, 4 * H, whole_hours=True)) == "4h"
+
+
+def test_whole_hours_with_many_points(monkeypatch):
+    monkeypatch.setattr(settings, "timeseries_max_points", 10000)
+    assert _format_step(_series_step(40 * D, 5 * M)) == "10m"
+    assert _format_step(_series_step(40 * D, 5 * M, whole_hours=True)) == "1h"
+    assert _format_step(_series_step(40 * D, None, whole_hours=True)) == "1h"
+
+
+def test_before_minute_rollups(monkeypatch):
+    now = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    monkeypatch.setattr(settings, "rollup_minute_retention_days", 30)
+    assert not _before_minute_rollups(now - 30 * D, now)
+    assert _before_minute_rollups(now - 31 * D, now)
+    monkeypatch.setattr(settings, "rollup_minute_retention_days", 0)  # kept forever
+    assert not _before_minute_rollups(now - 3650 * D, now)
+
+
+def test_plan_splits_the_edges():
+    now = datetime(2026, 3, 1, 12, 30, 15, tzinfo=timezone.utc)
+    since = now - D
+    hours, minutes, raw = _plan(since, now)
+    assert hours == [(datetime(2026, 2, 28, 13, tzinfo=timezone.utc), datetime(2026, 3, 1, 12, tzinfo=timezone.utc))]
+    assert minutes == [
+        (datetime(2026, 2, 28, 12, 31, tzinfo=timezone.utc), datetime(2026, 2, 28, 13, tzinfo=timezone.utc)),
+        (datetime(2026, 3, 1, 12, tzinfo=timezone.utc), datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)),
+    ]
+    assert raw == [(since, datetime(2026, 2, 28, 12, 31, tzinfo=timezone.utc)), (minutes[1][1], None)]
+
+
+@pytest.mark.parametrize("setting", ["rollup_minute_retention_days", "results_retention_days"])
+def test_plan_starts_on_a_whole_hour_past_retention(monkeypatch, setting):
+    monkeypatch.setattr(settings, "rollup_minute_retention_days", 0)
+    monkeypatch.setattr(settings, "results_retention_days", 0)
+    monkeypatch.setattr(settings, setting, 30)
+    now = datetime(2026, 3, 1, 12, 30, 15, tzinfo=timezone.utc)
+
+    hours, minutes, raw = _plan(now - 31 * D, now)
+    # The trimmed partial hour isn't read from minutes or raw results
+    assert hours == [(datetime(2026, 1, 29, 12, tzinfo=timezone.utc), datetime(2026, 3, 1, 12, tzinfo=timezone.utc))]
+    assert minutes == [(datetime(2026, 3, 1, 12, tzinfo=timezone.utc), datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc))]
+    assert raw == [(datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc), None)]
+
+    # Inside retention the edge is still exact
+    assert _plan(now - 29 * D, now)[2][0] == (now - 29 * D, datetime(2026, 1, 31, 12, 31, tzinfo=timezone.utc))
+
+
+# ----------------------------
+# Rollups
+# ----------------------------
+def test_quantile_is_clamped_to_observed_range():
+    agg = _Agg()
+    for ms in (100, 110, 120, 130, 900):
+        agg.add(True, ms)
+    assert agg.latency_min == 100 and agg.latency_max == 900
+    assert 100 <= agg.median() <= 150
+    assert agg.quantile(1.0) == 900
+    assert _Agg().quantile(0.95) is None
+
+
+def test_rollup_batches_merge_like_one(db, make_monitor):
+    monitor = make_monitor()
+    minute = datetime(2026, 1, 5, 12, 7, tzinfo=timezone.utc)
+    checks = [
+        (True, None, 10),  # no latency: counted, not in the latency columns
+        (True, 42, 20),
+        (False, 3000, 30),
+        (True, 7, 40),
+        (True, 250, 50),
+    ]
+    results = [
+        CheckResult(
+            monitor_id=monitor.id,
+            checked_at=minute + timedelta(seconds=sec),
+            success=success,
+            latency_ms=latency,
+            connect_ms=None if latency is None else 1,
+        )
+        for success, latency, sec in checks
+    ]
+    # Three batches into the same minute and hour buckets: the upsert must add up
+    for batch in (results[:1], results[1:3], results[3:]):
+        record_rollups(db, batch)
+        db.commit()
+
+    expected = _Agg()
+    for r in results:
+        expected.add(r.success, r.latency_ms, [getattr(r, f"{p}_ms") for p in PHASES])
+
+    for model, bucket in ((CheckRollupMinute, minute), (CheckRollupHour, minute.replace(minute=0))):
+        row = db.scalars(select(model).where(model.monitor_id == monitor.id)).one()
+        stored = {c: getattr(row, c) for c in expected.as_row(monitor.id, bucket)}
+        assert stored == expected.as_row(monitor.id, bucket)
+
+
+# ----------------------------
+# Fleet summary
+# ----------------------------
+def _checks(db, monitor, checks) -> None:
+    """(minutes ago, success, latency_ms) checks through the write path, oldest first."""
+    now = datetime.now(timezone.utc)
+    for minutes_ago, success, latency_ms in checks:
+        result = CheckResult(
+            monitor_id=monitor.id,
+            checked_at=now - minutes_ago * M,
+            success=success,
+            status_code=200 if success else 500,
+            latency_ms=latency_ms,
+            error_type=None if success else "HTTP_UNEXPECTED",
+        )
+        apply_incident_rules(db, result)
+
+
+def test_fleet_summary_matches_per_monitor_summaries(db, make_monitor):
+    up, down, idle = make_monitor(name="up"), make_monitor(name="down"), make_monitor(name="idle")
+    # Old enough to come from the hour rollups, plus minutes and the raw edge
+    _checks(db, up, [(150, True, 20), (90, False, 900), (30, True, 40), (0, True, 60)])
+    _checks(db, down, [(100, True, 10), (0, False, 30)])
+    ids = [up.id, down.id, idle.id]
+
+    fleet = get_fleet_summary(db, window="24h", monitor_ids=ids)
+    assert fleet["count"] == 3
+    by_name = {m.pop("name"): m for m in fleet["monitors"]}
+    for monitor in (up, down, idle):
+        assert by_name[monitor.name] == get_monitor_summary(db, monitor.id, window="24h")
+
+    assert by_name["up"]["total_checks"] == 4
+    assert by_name["up"]["uptime_percent"] == 75.0
+    assert by_name["up"]["avg_latency_ms"] == 255.0
+    assert by_name["down"]["current_status"] == "DOWN"
+    assert by_name["idle"]["total_checks"] == 0
+    assert by_name["idle"]["current_status"] == "UP"
+
+
+def test_fleet_summary_filters(db, make_monitor):
+    active, paused = make_monitor(), make_monitor(is_active=False)
+    ids = [active.id, paused.id]
+
+    only_paused = get_fleet_summary(db, monitor_ids=ids, is_active=False)
+    assert [m["monitor_id"] for m in only_paused["monitors"]] == [str(paused.id)]
+
+    with pytest.raises(HTTPException) as exc:
+        get_fleet_summary(db, window="a while", monitor_ids=ids)
+    assert exc.value.status_code == 400
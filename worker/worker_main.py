@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+
+from app.core.config import settings
+from app.core.logging import configure_logging
+from app.core.metrics import serve as serve_metrics
+from app.db.init_db import init_db
+from app.services.alerts import AlertDispatcher
+from app.services.checker import AsyncCheckExecutor
+from app.services.monitor_cache import monitor_cache
+from app.services.result_sink import ResultSink
+from app.services.retention import maintenance_loop
+from app.services.scheduler import Scheduler
+from app.services.sharding import Shard
+
+logger = logging.getLogger(__name__)
+
+# A child that dies sooner than this after starting is crash-looping: back off
+CHILD_MIN_UPTIME_SEC = 10.0
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ShipTrack check worker")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.check_max_inflight,
+        help="max HTTP probes in flight at once (per process)",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="worker processes; monitors are split between them by consistent hashing",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=settings.worker_metrics_port,
+        help="serve Prometheus metrics on this port (0 = off); child i of --processes uses port + i",
+    )
+    return parser.parse_args(argv)
+
+
+async def _start_metrics(port: int) -> asyncio.AbstractServer | None:
+    if not port:
+        return None
+    try:
+        return await serve_metrics(settings.worker_metrics_host, port)
+    except OSError as exc:
+        # Not worth dying over: checks matter more than their metrics
+        logger.warning("Metrics port %d unavailable (%s); running without /metrics", port, exc)
+        return None
+
+
+async def _run(concurrency: int, shard: Shard | None = None, metrics_port: int = 0) -> None:
+    loop = asyncio.get_running_loop()
+    metrics = await _start_metrics(metrics_port)
+
+    sink = ResultSink()
+    sink.start()
+    executor = AsyncCheckExecutor(max_inflight=concurrency, sink=sink)
+    scheduler = Scheduler(executor.run, shard=shard)
+    dispatcher = AlertDispatcher()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, scheduler.stop)
+
+    # Notifications arrive on the cache's listener thread
+    monitor_cache.on_change(lambda _: loop.call_soon_threadsafe(scheduler.wake))
+    monitor_cache.start()
+
+    # One copy of the housekeeping per worker host is plenty
+    housekeeping = shard is None or shard.index == 0
+
+    maintenance = asyncio.create_task(maintenance_loop()) if housekeeping else None
+    alerts = asyncio.create_task(dispatcher.run()) if housekeeping else None
+    try:
+        await scheduler.run()
+    finally:
+        if maintenance is not None:
+            maintenance.cancel()
+        await executor.aclose()
+        await sink.close()
+        # After the sink: alerts from its last batch go out before exit
+        if alerts is not None:
+            dispatcher.stop()
+            await alerts
+        if metrics is not None:
+            metrics.close()
+        monitor_cache.stop()
+
+
+def _child_main(shard: Shard, concurrency: int, metrics_port: int) -> None:
+    configure_logging()
+    asyncio.run(_run(concurrency, shard, metrics_port))
+
+
+class Supervisor:
+    """
+    Parent process for --processes N.
+
+    - child i runs the usual worker loop on Shard(i, N), so each monitor is
+      always checked by the same process (its connections stay warm there)
+    - a child that exits is restarted on the same shard; if it died within
+      CHILD_MIN_UPTIME_SEC, the restart waits 1, 2, 4, ... seconds (up to
+      worker_restart_backoff_max_sec) so a crash loop doesn't spin
+    - while a shard's process is down, its monitors are picked up by other
+      hosts once their leases expire, like after any worker crash
+    - SIGINT/SIGTERM: children get SIGTERM and worker_stop_timeout_sec to
+      finish in-flight checks and flush results, then SIGKILL
+    """
+
+    def __init__(self, processes: int, concurrency: int, metrics_port: int = 0) -> None:
+        self._processes = processes
+        self._concurrency = concurrency
+        self._metrics_port = metrics_port
+        self._ctx = multiprocessing.get_context("spawn")
+
+        self._children: list[multiprocessing.Process | None] = [None] * processes
+        self._started_at = [0.0] * processes
+        self._restart_at = [0.0] * processes
+        self._failures = [0] * processes
+
+        self._stopping = threading.Event()
+
+    def _spawn(self, index: int) -> None:
+        shard = Shard(index, self._processes)
+        proc = self._ctx.Process(
+            target=_child_main,
+            args=(shard, self._concurrency, self._metrics_port + index if self._metrics_port else 0),
+            name=f"shiptrack-worker-{index}",
+        )
+        proc.start()
+        self._children[index] = proc
+        self._started_at[index] = time.monotonic()
+        logger.info("Started worker %d/%d: pid=%s", index, self._processes, proc.pid)
+
+    def _reap(self, index: int, now: float) -> None:
+        proc = self._children[index]
+        self._children[index] = None
+
+        if now - self._started_at[index] < CHILD_MIN_UPTIME_SEC:
+            self._failures[index] += 1
+        else:
+            self._failures[index] = 0
+
+        delay = 0.0
+        if self._failures[index]:
+            delay = min(2.0 ** (self._failures[index] - 1), settings.worker_restart_backoff_max_sec)
+        self._restart_at[index] = now + delay
+        logger.warning(
+            "Worker %d exited: pid=%s exitcode=%s; restarting in %.0fs", index, proc.pid, proc.exitcode, delay
+        )
+
+    def _shutdown(self) -> None:
+        alive = [p for p in self._children if p is not None and p.is_alive()]
+        logger.info("Stopping %d worker processes", len(alive))
+        for proc in alive:
+            proc.terminate()
+
+        deadline = time.monotonic() + settings.worker_stop_timeout_sec
+        for proc in alive:
+            proc.join(max(0.0, deadline - time.monotonic()))
+            if proc.is_alive():
+                logger.warning("Worker pid=%s did not stop in time; killing it", proc.pid)
+                proc.kill()
+                proc.join()
+
+    def run(self) -> None:
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        try:
+            while not self._stopping.is_set():
+                now = time.monotonic()
+                for index, proc in enumerate(self._children):
+                    if proc is not None and not proc.is_alive():
+                        self._reap(index, now)
+                    elif proc is None and now >= self._restart_at[index]:
+                        self._spawn(index)
+                self._stopping.wait(0.5)
+        finally:
+            self._shutdown()
+
+    def stop(self, *_) -> None:
+        self._stopping.set()
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    configure_logging()
+    init_db()
+    if args.processes > 1:
+        Supervisor(args.processes, args.concurrency, args.metrics_port).run()
+    else:
+        asyncio.run(_run(args.concurrency, metrics_port=args.metrics_port))
+
+
+if __name__ == "__main__":
+    main()